@@ -0,0 +1,74 @@
+"""Save/load benchmark: file size versus latency for each save compression setting.
+
+Usage: python bench_saves.py [NPC count] [repeats]
+
+Builds a synthetic world with the given number of NPCs (default 20000), writes and reads it as a
+binary save with every compression setting and prints size, ratio and median save/load times.
+"""
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+from rsc_engine.save_format import JSON_SUFFIX, encode_json, read_save, write_binary
+
+SETTINGS = [("none", 0), ("zlib", 1), ("zlib", 6), ("zlib", 9), ("lzma", 0), ("lzma", 6)]
+
+
+def make_world(npc_count: int) -> dict:
+    npc_states = []
+    for i in range(npc_count):
+        npc = {"entity_id": f"npc_{i}", "name": "Goblin" if i % 3 else "Old Man", "ix": i % 500, "iy": i // 500,
+               "hp": 20 - i % 20, "max_hp": 20, "is_alive": i % 7 != 0, "level": 1 + i % 10,
+               "type": "HostileNPC" if i % 3 else "FriendlyNPC"}
+        if i % 3:
+            npc["show_hp_bar"] = i % 2 == 0
+            npc["is_chasing"] = False
+        npc_states.append(npc)
+    return {"player_data": {"name": "Bench", "level": 12, "start_ix": 5, "start_iy": 5, "max_hp": 100,
+                            "current_hp": 80, "xp": 1234, "map_id": "map"},
+            "npc_states": npc_states,
+            "inventory": [{"row": r, "col": c, "item_id": "BONES001", "quantity": r * 5 + c + 1}
+                          for r in range(4) for c in range(5)],
+            "current_map_id": "map", "timestamp": 0, "game_version": "0.1.1"}
+
+
+def _median_ms(fn, repeats: int) -> float:
+    times = []
+    for _ in range(repeats):
+        started = time.perf_counter()
+        fn()
+        times.append(time.perf_counter() - started)
+    return statistics.median(times) * 1000
+
+
+def main(argv: list[str]) -> int:
+    npc_count = int(argv[0]) if argv else 20000
+    repeats = int(argv[1]) if len(argv) > 1 else 5
+    data = make_world(npc_count)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        json_path = Path(tmp) / f"world{JSON_SUFFIX}"
+        json_path.write_bytes(encode_json(data))
+        raw_size = json_path.stat().st_size
+        print(f"World: {npc_count} NPCs, legacy JSON save {raw_size / 1024:.1f} KiB, "
+              f"load {_median_ms(lambda: read_save(json_path), repeats):.1f} ms\n")
+        print(f"{'compression':<12}{'level':>6}{'size KiB':>11}{'vs JSON':>9}{'save ms':>10}{'load ms':>10}")
+
+        for compression, level in SETTINGS:
+            path = Path(tmp) / f"world_{compression}_{level}.sav"
+
+            def save():
+                with open(path, "wb") as f:
+                    write_binary(data, f, compression, level)
+
+            save_ms = _median_ms(save, repeats)
+            load_ms = _median_ms(lambda: read_save(path), repeats)
+            size = path.stat().st_size
+            print(f"{compression:<12}{level:>6}{size / 1024:>11.1f}{size / raw_size:>9.1%}{save_ms:>10.1f}{load_ms:>10.1f}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
@@ -0,0 +1,27 @@
+"""Validate every JSON data table under rsc_engine/data and rebuild the compiled data cache.
+
+Usage: python compile_data.py
+
+Exits with 1 if a file is not valid JSON or a table fails validation, so it can run in CI.
+The game rebuilds the cache by itself when a source changes; this only does it up front.
+"""
+import sys
+
+from rsc_engine.data_cache import DataCache
+
+
+def main(argv: list[str]) -> int:
+    if argv:
+        print("Usage: python compile_data.py")
+        return 2
+    cache = DataCache().load(force_rebuild=True)
+    if cache.errors or cache.problems:
+        problem_count = sum(len(problems) for problems in cache.problems.values())
+        print(f"[ERROR] {len(cache.errors)} unreadable file(s), {problem_count} validation problem(s)")
+        return 1
+    print(f"[INFO] {len(cache.documents)} data file(s) OK -> {cache.cache_path}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
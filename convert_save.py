@@ -0,0 +1,27 @@
+"""Convert a save file between the binary (.sav) and legacy JSON (.json) formats.
+
+Usage: python convert_save.py <input save> <output save>
+"""
+import sys
+from pathlib import Path
+
+from rsc_engine.save_format import convert, SaveFormatError, BINARY_SUFFIX, JSON_SUFFIX
+
+
+def main(argv: list[str]) -> int:
+    if len(argv) != 2:
+        print("Usage: python convert_save.py <input save> <output save>")
+        print(f"  The output format is JSON for '{JSON_SUFFIX}' files and binary otherwise ('{BINARY_SUFFIX}').")
+        return 2
+    src, dst = Path(argv[0]), Path(argv[1])
+    try:
+        convert(src, dst)
+    except (OSError, SaveFormatError) as e:
+        print(f"[ERROR] Could not convert {src}: {e}")
+        return 1
+    print(f"[INFO] Converted {src} ({src.stat().st_size} bytes) -> {dst} ({dst.stat().st_size} bytes)")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
@@ -0,0 +1,78 @@
+# rsc_engine/autosave.py
+"""Autosave scheduler: saves on an interval and on gameplay events (level-up, map change)."""
+from typing import TYPE_CHECKING, Optional, Any
+
+from rsc_engine import constants as C
+
+if TYPE_CHECKING:
+    from rsc_engine.game import Game
+
+
+class AutosaveScheduler:
+    """Decides when to autosave; `Game.save_game` does the work.
+
+    `update()` is called by GameplayState at the end of its update, so the snapshot is always taken
+    at a tick boundary. Capturing re-reads only the records the game reports as changed since the
+    previous save: live NPCs, parked NPCs whose state changed and the inventory if its version moved
+    (see `SaveRecordCache`). Serialization runs on the SaveWriter thread, so an autosave costs the
+    frame little even in a large world. While a save of the autosave slot is still in flight, a due autosave
+    waits for the next tick instead of queueing another one.
+    """
+
+    def __init__(self, game: "Game", slot: int = C.AUTOSAVE_SLOT, interval: float = C.AUTOSAVE_INTERVAL,
+                 min_gap: float = C.AUTOSAVE_MIN_GAP, enabled: bool = C.AUTOSAVE_ENABLED):
+        self.game = game
+        self.slot = slot
+        self.interval = interval
+        self.min_gap = min_gap
+        self.enabled = enabled
+
+        self.time_since_save = 0.0
+        self.pending_reason: Optional[str] = None
+        self._last_level: Optional[int] = None
+        self._last_map_id: Optional[Any] = None
+
+    def reset(self):
+        """Start counting from now and remember the watched values (call when gameplay starts)."""
+        self.time_since_save = 0.0
+        self.pending_reason = None
+        self._last_level = self.game.player.level if self.game.player else None
+        self._last_map_id = getattr(self.game.tilemap, 'id', None)
+
+    def request(self, reason: str):
+        """Ask for an autosave at the next tick boundary (subject to `min_gap`)."""
+        if self.pending_reason is None:
+            self.pending_reason = reason
+
+    def _check_events(self):
+        player = self.game.player
+        if player is not None:
+            if self._last_level is not None and player.level > self._last_level:
+                self.request(f"level up ({player.level})")
+            self._last_level = player.level
+        map_id = getattr(self.game.tilemap, 'id', None)
+        if map_id != self._last_map_id:
+            if self._last_map_id is not None:
+                self.request(f"map change ({map_id})")
+            self._last_map_id = map_id
+
+    def update(self, dt: float):
+        if not self.enabled: return
+        self.time_since_save += dt
+        self._check_events()
+
+        if self.time_since_save >= self.interval:
+            reason = self.pending_reason or "interval"
+        elif self.pending_reason is not None and self.time_since_save >= self.min_gap:
+            reason = self.pending_reason
+        else:
+            return
+        if self.game.is_save_in_flight(self.slot):
+            return
+        if self.game.player is None or not self.game.player.is_alive:
+            return
+
+        print(f"[INFO] Autosave: {reason}")
+        if self.game.save_game(self.slot, announce=False):
+            self.time_since_save = 0.0
+            self.pending_reason = None
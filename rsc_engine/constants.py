@@ -10,6 +10,58 @@ DEV_SKIP_MENU_AND_CREATOR = True
 
 # Stałe przeniesione z game.py
 ASSETS = Path(__file__).resolve().parent / "assets" # Ta ścieżka będzie wskazywać na rsc_engine/assets
+DATA = Path(__file__).resolve().parent / "data"  # rsc_engine/data (items.json, npc_spawns.json, ...)
+DATA_CACHE_PATH = DATA / ".compiled_data.bin"  # skompilowane tabele danych (data_cache.py), odbudowywane po zmianie źródeł
+FONT_PATHS_CACHE = DATA / ".font_paths.json"  # rodzina czcionki -> plik, żeby nie wyliczać czcionek systemowych przy każdym starcie
 TARGET_CHAR_HEIGHT = int(TILE_HEIGHT * 2.2)
 TARGET_SPLAT_ICON_WIDTH = 28
-TARGET_SPLAT_ICON_HEIGHT = 28
\ No newline at end of file
+TARGET_SPLAT_ICON_HEIGHT = 28
+DAMAGE_SPLAT_LIFETIME = 1.2  # sekundy gry
+DAMAGE_SPLAT_FADE_STEPS = 16  # tyle wersji ikony o malejącej przezroczystości renderujemy z góry
+SHADOW_COLOR = (0, 0, 0, 100)
+TARGET_HIGHLIGHT_COLOR = (255, 0, 0, 100)
+HP_BAR_WIDTH = int(TILE_WIDTH * 0.6)
+HP_BAR_HEIGHT = 6
+HP_BAR_BUCKETS = 20  # pasek HP jest gotowym spritem dla każdego 5% wypełnienia
+
+# Spawny NPC: mapa dzielona jest na kwadratowe regiony (w kafelkach).
+# NPC powstają dopiero, gdy ich region znajdzie się w promieniu aktywacji od gracza/kamery.
+SPAWN_REGION_SIZE = 16
+SPAWN_ACTIVATION_RADIUS = 1  # w regionach
+
+# Zapisy: tryb dziennika dopisuje tylko zmienione rekordy; po przekroczeniu progu dziennik jest kompaktowany
+SAVE_JOURNALED = True
+SAVE_JOURNAL_COMPACT_BYTES = 64 * 1024
+SAVE_COMPRESSION = "zlib"  # "none", "zlib" albo "lzma" (pliki .sav; dziennik zapisów nie jest kompresowany)
+SAVE_COMPRESSION_LEVEL = 1  # poziom zlib / preset lzma, 0-9 (bench_saves.py pokazuje rozmiar vs czas)
+SAVE_SLOT_COUNT = 10  # sloty widoczne na liście zapisów (więcej, jeśli indeks zna dalsze)
+
+# Autozapis
+AUTOSAVE_ENABLED = True
+AUTOSAVE_SLOT = 0  # osobny slot, nie nadpisuje ręcznych zapisów
+AUTOSAVE_INTERVAL = 300.0  # sekundy gry między autozapisami
+AUTOSAVE_MIN_GAP = 10.0  # zdarzenia (awans, zmiana mapy) nie zapisują częściej niż co tyle sekund
+PROFILER_WINDOW = 240  # klatek w oknie nakładki profilera
+PROFILER_REFRESH = 0.25  # sekundy między odświeżeniami nakładki
+METRICS_INTERVAL = 1.0  # sekundy między rekordami pliku metryk (--metrics)
+METRICS_DEFAULT_BOUNDS = (1, 2, 4, 8, 16, 32, 64, 128)
+FRAME_TIME_BOUNDS_MS = (2, 4, 8, 12, 16.7, 20, 33.3, 50, 100)
+
+# Ekwipunek: ikony przedmiotów są skalowane raz do rozmiaru komórki atlasu i pakowane w strony atlasu
+INVENTORY_SLOT_SIZE = 40
+ITEM_ICON_SIZE = 36  # komórka atlasu, wyśrodkowana w slocie
+ICON_ATLAS_PAGE_CELLS = 16  # strona atlasu ma 16x16 komórek
+
+# Interfejs: wyrenderowane napisy są trzymane w pamięci podręcznej LRU (text_cache.py) do tego limitu
+TEXT_CACHE_BYTES = 4 * 1024 * 1024
+
+# Zegar gry: koło timerów (timers.py); poziom 0 ma 2**BITS slotów po jednym ticku
+TIMER_RESOLUTION = 1.0 / FPS
+TIMER_WHEEL_BITS = 6
+TIMER_WHEEL_LEVELS = 4  # 2**24 ticków, ok. 77 godzin gry; dalsze terminy czekają na najwyższym poziomie
+
+# Przedmioty na ziemi: stosy per kafelek, znikają po czasie (timer na kole, nie odliczanie per przedmiot)
+GROUND_ITEM_DESPAWN = 180.0  # sekundy gry od upuszczenia (ponowne upuszczenie na stos odświeża licznik)
+GROUND_PILE_MAX_STACKS = 16  # powyżej tego najstarszy stos na kafelku znika
+NPC_DEFAULT_DROPS = (("BONES001", 1),)  # co zostawia pokonany wrogi NPC
+NPC_RESPAWN_TIME = 60.0  # sekundy gry od śmierci NPC do odrodzenia (w tabeli spawnów: "respawn_time")
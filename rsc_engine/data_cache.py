@@ -0,0 +1,208 @@
+# rsc_engine/data_cache.py
+"""Compiled cache of the JSON data tables under `C.DATA` (items, spawn tables, ...).
+
+Every `*.json` file under the data directory is parsed and validated once and the results are
+written to a single binary cache file (`C.DATA_CACHE_PATH`, Python's `marshal` format). The cache
+remembers the mtime, size and SHA-1 of each source file:
+
+  * all stats unchanged -> the cache is loaded as is, no JSON is parsed;
+  * a stat changed but the content hash did not (e.g. `touch`) -> the old parse is reused;
+  * otherwise only the changed files are re-parsed and the cache is rewritten.
+
+Run `python compile_data.py` to rebuild the cache and validate every table up front.
+"""
+import hashlib
+import json
+import marshal
+import sys
+import time
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from rsc_engine import constants as C
+from rsc_engine.saves import write_atomic
+
+CACHE_FORMAT = 1
+# marshal zależy od wersji Pythona, więc wchodzi ona do klucza pamięci podręcznej
+_CACHE_KEY = (CACHE_FORMAT, marshal.version, sys.version_info[:2])
+
+
+class DataError(ValueError):
+    """A data file could not be parsed or does not have the expected shape."""
+
+
+def _validate_items(data: Any) -> List[str]:
+    from rsc_engine.items_manager import ItemDefinition
+    if not isinstance(data, dict):
+        return ["must map item IDs to definitions"]
+    problems = []
+    for item_id, raw in data.items():
+        _, errors = ItemDefinition.compile(item_id, raw)
+        problems.extend(f"item '{item_id}': {error}" for error in errors)
+    return problems
+
+
+def _validate_spawns(data: Any) -> List[str]:
+    from rsc_engine.spawns import NPC_CLASSES
+    if not isinstance(data, dict):
+        return ["must map map IDs to lists of spawn definitions"]
+    problems = []
+    for map_id, spawn_defs in data.items():
+        if not isinstance(spawn_defs, list):
+            problems.append(f"map '{map_id}': spawn table must be a list")
+            continue
+        for i, spawn_def in enumerate(spawn_defs):
+            where = f"map '{map_id}', spawn #{i}"
+            if not isinstance(spawn_def, dict):
+                problems.append(f"{where}: must be an object")
+                continue
+            if not spawn_def.get("entity_id"):
+                problems.append(f"{where}: missing 'entity_id'")
+            if spawn_def.get("type") not in NPC_CLASSES:
+                problems.append(f"{where}: 'type' must be one of {sorted(NPC_CLASSES)}")
+            for key in ("ix", "iy"):
+                if not isinstance(spawn_def.get(key), int):
+                    problems.append(f"{where}: '{key}' must be an integer")
+    return problems
+
+
+# Walidatory konkretnych tabel (ścieżka względem katalogu danych); pozostałe pliki muszą być tylko poprawnym JSON-em
+VALIDATORS: Dict[str, Callable[[Any], List[str]]] = {
+    "items.json": _validate_items,
+    "npc_spawns.json": _validate_spawns,
+}
+
+
+class DataCache:
+    """Parsed data tables, loaded from the compiled cache when the sources have not changed."""
+
+    def __init__(self, data_dir: Path = C.DATA, cache_path: Path = C.DATA_CACHE_PATH):
+        self.data_dir = Path(data_dir)
+        self.cache_path = Path(cache_path)
+        self.documents: Optional[Dict[str, Any]] = None
+        self.errors: Dict[str, str] = {}  # plik -> błąd parsowania
+        self.problems: Dict[str, List[str]] = {}  # plik -> błędy walidacji (plik da się wczytać)
+        self.reparsed: List[str] = []  # pliki sparsowane od nowa przy ostatnim load()
+
+    def _sources(self) -> Dict[str, Path]:
+        # Pliki ukryte (np. .font_paths.json) to pamięć podręczna, nie dane
+        return {path.relative_to(self.data_dir).as_posix(): path for path in sorted(self.data_dir.rglob("*.json"))
+                if not path.name.startswith(".")}
+
+    def _read_cache(self) -> Optional[Dict[str, Any]]:
+        try:
+            with open(self.cache_path, "rb") as f:
+                cache = marshal.loads(f.read())  # marshal.load(f) czyta plik małymi kawałkami, wielokrotnie wolniej
+        except FileNotFoundError:
+            return None
+        except (OSError, EOFError, ValueError, TypeError) as e:
+            print(f"[WARNING] DataCache: Ignoring unreadable cache {self.cache_path}: {e}")
+            return None
+        if not isinstance(cache, dict) or cache.get("key") != _CACHE_KEY:
+            return None
+        return cache
+
+    @staticmethod
+    def _parse(name: str, raw: bytes) -> Tuple[Any, Optional[str], List[str]]:
+        try:
+            data = json.loads(raw.decode("utf-8"))
+        except (UnicodeDecodeError, json.JSONDecodeError) as e:
+            return None, str(e), []
+        validator = VALIDATORS.get(name)
+        return data, None, validator(data) if validator else []
+
+    def load(self, force_rebuild: bool = False) -> "DataCache":
+        """Load every table, from the cache if possible. Safe to call again (no-op once loaded)."""
+        if self.documents is not None and not force_rebuild:
+            return self
+        started = time.perf_counter()
+        sources = self._sources()
+        stats = {}
+        for name, path in sources.items():
+            st = path.stat()
+            stats[name] = (st.st_mtime_ns, st.st_size)
+
+        cache = None if force_rebuild else self._read_cache()
+        cached_files: Dict[str, Dict[str, Any]] = cache["files"] if cache else {}
+        if cache and set(cached_files) == set(sources) and all(
+                (entry["mtime_ns"], entry["size"]) == stats[name] for name, entry in cached_files.items()):
+            self._use(cached_files)
+            self.reparsed = []
+            elapsed = time.perf_counter() - started
+            parse_time = sum(entry["parse_seconds"] for entry in cached_files.values())
+            print(f"[INFO] DataCache: Loaded {len(sources)} data file(s) from {self.cache_path.name} in "
+                  f"{elapsed * 1000:.2f} ms (parsing and validating took {parse_time * 1000:.2f} ms, "
+                  f"saved {max(0.0, parse_time - elapsed) * 1000:.2f} ms)")
+            return self
+
+        files = {}
+        reparsed = self.reparsed = []
+        for name, path in sources.items():
+            raw = path.read_bytes()
+            digest = hashlib.sha1(raw).hexdigest()
+            entry = cached_files.get(name)
+            if entry is None or entry["sha1"] != digest:
+                parse_started = time.perf_counter()
+                data, error, problems = self._parse(name, raw)
+                entry = {"data": data, "error": error, "problems": problems,
+                         "parse_seconds": time.perf_counter() - parse_started}
+                reparsed.append(name)
+            entry = dict(entry, sha1=digest, mtime_ns=stats[name][0], size=stats[name][1])
+            files[name] = entry
+        self._use(files)
+
+        try:
+            write_atomic(self.cache_path, marshal.dumps({"key": _CACHE_KEY, "files": files}))
+        except OSError as e:
+            print(f"[WARNING] DataCache: Could not write {self.cache_path}: {e}")
+        print(f"[INFO] DataCache: Compiled {len(sources)} data file(s) ({len(reparsed)} re-parsed) in "
+              f"{(time.perf_counter() - started) * 1000:.2f} ms -> {self.cache_path.name}")
+        for name, error in self.errors.items():
+            print(f"[ERROR] DataCache: {name}: {error}")
+        for name, problems in self.problems.items():
+            for problem in problems:
+                print(f"[WARNING] DataCache: {name}: {problem}")
+        return self
+
+    def _use(self, files: Dict[str, Dict[str, Any]]):
+        self.documents = {name: entry["data"] for name, entry in files.items() if entry["error"] is None}
+        self.errors = {name: entry["error"] for name, entry in files.items() if entry["error"] is not None}
+        self.problems = {name: entry["problems"] for name, entry in files.items() if entry["problems"]}
+
+    def get(self, path: Path) -> Any:
+        """Parsed content of data file `path` (absolute or relative to the data directory).
+
+        Raises FileNotFoundError if there is no such file and DataError if it is not valid JSON.
+        Files outside the data directory are simply read and parsed.
+        """
+        path = Path(path)
+        try:
+            name = (path.relative_to(self.data_dir) if path.is_absolute() else path).as_posix()
+        except ValueError:
+            try:
+                with open(path, "r", encoding="utf-8") as f:
+                    return json.load(f)
+            except json.JSONDecodeError as e:
+                raise DataError(str(e)) from e
+        self.load()
+        if name in self.errors:
+            raise DataError(self.errors[name])
+        if name not in self.documents:
+            raise FileNotFoundError(self.data_dir / name)
+        return self.documents[name]
+
+
+_default_cache: Optional[DataCache] = None
+
+
+def get_data_cache() -> DataCache:
+    """The process-wide cache of `C.DATA`."""
+    global _default_cache
+    if _default_cache is None:
+        _default_cache = DataCache()
+    return _default_cache
+
+
+def load_data(path: Path) -> Any:
+    """Shortcut for `get_data_cache().get(path)`."""
+    return get_data_cache().get(path)
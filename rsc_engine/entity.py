@@ -1,12 +1,17 @@
 from __future__ import annotations
 import pygame
+from rsc_engine import constants as C
 from rsc_engine.utils import iso_to_screen
+from rsc_engine.metrics import metrics
 from typing import TYPE_CHECKING, Optional, List, Dict, Any, Callable
 
 if TYPE_CHECKING:
     from rsc_engine.tilemap import TileMap
     from rsc_engine.game import Game
 
+_paths_computed = metrics.counter("paths_computed")
+_path_length = metrics.histogram("path_length")
+
 
 def bresenham(x0: int, y0: int, x1: int, y1: int) -> list[tuple[int, int]]:
     dx, dy = abs(x1 - x0), abs(y1 - y0)
@@ -27,6 +32,8 @@ def bresenham(x0: int, y0: int, x1: int, y1: int) -> list[tuple[int, int]]:
         if e2 < dx:
             err += dx
             y += sy
+    _paths_computed.inc()
+    _path_length.observe(len(path))
     return path
 
 
@@ -64,7 +71,7 @@ class Entity(pygame.sprite.Sprite):
         self.in_combat: bool = False
         self.combat_target: Optional[Entity] = None
         self.attack_speed: float = attack_speed
-        self.attack_cooldown_timer: float = 0.0
+        self.attack_ready_at: float = 0.0  # czas gry (game.timers.now), od którego może znów zaatakować
         self.show_hp_bar: bool = False
 
         self.update_rect()
@@ -143,7 +150,7 @@ class Entity(pygame.sprite.Sprite):
             self.action_after_reaching_target = None
             self.target_entity_for_action = None
 
-        self.attack_cooldown_timer = 0.0
+        self.attack_ready_at = self.game.timers.now
 
         if isinstance(self, HostileNPC):
             self.show_hp_bar = True
@@ -189,8 +196,6 @@ class Entity(pygame.sprite.Sprite):
             self.leave_combat()
             return
 
-        self.attack_cooldown_timer = max(0.0, self.attack_cooldown_timer - dt)
-
         dx = abs(self.ix - self.combat_target.ix)
         dy = abs(self.iy - self.combat_target.iy)
         distance_to_target = max(dx, dy)
@@ -204,9 +209,10 @@ class Entity(pygame.sprite.Sprite):
 
             self.current_action = "fighting"
 
-            if self.attack_cooldown_timer == 0.0:
+            now = self.game.timers.now
+            if now >= self.attack_ready_at:
                 self.attack(self.combat_target)
-                self.attack_cooldown_timer = self.attack_speed
+                self.attack_ready_at = now + self.attack_speed
         else:
             if self.current_action == "fighting":
                 self.current_action = "idle"
@@ -251,7 +257,7 @@ class Player(Entity):
         super().__init__(game, name, ix, iy, image, entity_id, level, max_hp,
                          attack_power, defense, attack_speed)
         self.move_cooldown_max = 0.15
-        self.move_cooldown = 0.0
+        self.next_move_at = 0.0  # czas gry następnego możliwego kroku
         self.path: list[tuple[int, int]] = []
         self.target_tile_coords: tuple[int, int] | None = None
 
@@ -350,7 +356,7 @@ class Player(Entity):
         if not self.is_alive:
             return
 
-        self.move_cooldown = max(0.0, self.move_cooldown - dt)
+        now = self.game.timers.now
 
         is_fighting_in_melee_range = False
         if self.in_combat and self.combat_target and self.combat_target.is_alive:
@@ -364,7 +370,7 @@ class Player(Entity):
                     self.target_tile_coords = None
                 self.current_action = "fighting"
 
-        if self.path and self.move_cooldown == 0.0 and not is_fighting_in_melee_range:
+        if self.path and now >= self.next_move_at and not is_fighting_in_melee_range:
             self.current_action = "walking"
             if not self.path: self.current_action = "idle"; return
 
@@ -415,7 +421,7 @@ class Player(Entity):
                 self.path.pop(0);
                 self.ix, self.iy = nx, ny;
                 self.update_rect();
-                self.move_cooldown = self.move_cooldown_max
+                self.next_move_at = now + self.move_cooldown_max
 
             if not self.path:
                 self.target_tile_coords = None
@@ -466,11 +472,18 @@ class NPC(Entity):
         self.current_patrol_point_idx: int = 0
         self.path: list[tuple[int, int]] = []
         self.move_cooldown_max = 0.3
-        self.move_cooldown = 0.0
+        self.next_move_at = 0.0
 
     def update_ai(self, dt: float, tilemap: "TileMap", player: Player, all_entities: pygame.sprite.Group):
         pass
 
+    def die(self):
+        was_alive = self.is_alive
+        super().die()
+        spawn_manager = getattr(self.game, 'spawn_manager', None)
+        if was_alive and spawn_manager is not None:
+            spawn_manager.schedule_respawn(self.entity_id)
+
     def update(self, dt: float, tilemap: "TileMap", all_entities: pygame.sprite.Group):
         super().update(dt, tilemap, all_entities)
         if not self.is_alive:
@@ -491,9 +504,9 @@ class NPC(Entity):
             if not is_fighting_in_melee_range or isinstance(self, HostileNPC):
                 self.update_ai(dt, tilemap, player_ref, all_entities)
 
-        self.move_cooldown = max(0.0, self.move_cooldown - dt)
+        now = self.game.timers.now
 
-        if self.path and self.move_cooldown == 0.0 and not is_fighting_in_melee_range:
+        if self.path and now >= self.next_move_at and not is_fighting_in_melee_range:
             self.current_action = "walking"
             if not self.path: self.current_action = "idle"; return
 
@@ -524,7 +537,7 @@ class NPC(Entity):
                 self.path.pop(0);
                 self.ix, self.iy = nx, ny;
                 self.update_rect();
-                self.move_cooldown = self.move_cooldown_max
+                self.next_move_at = now + self.move_cooldown_max
 
             if not self.path:
                 if not is_fighting_in_melee_range:
@@ -590,10 +603,18 @@ class HostileNPC(NPC):
                          attack_power, defense, movement_pattern="stationary",
                          dialogue=None, attack_speed=attack_speed)
         self.aggro_radius = aggro_radius
-        self.attack_cooldown_timer = self.attack_speed
+        self.attack_ready_at = game.timers.now + self.attack_speed
         self.is_chasing = False
         self.start_ix, self.start_iy = ix, iy
 
+    def die(self):
+        was_alive = self.is_alive
+        super().die()
+        ground_items = getattr(self.game, 'ground_items', None)
+        if was_alive and ground_items is not None:
+            for item_id, quantity in C.NPC_DEFAULT_DROPS:
+                ground_items.drop(self.ix, self.iy, item_id, quantity)
+
     def get_context_menu_options(self, interactor: "Entity") -> List[Dict[str, Any]]:
         options = super().get_context_menu_options(interactor)
         if self.is_alive and isinstance(interactor, Player):
@@ -0,0 +1,108 @@
+# rsc_engine/fonts.py
+"""Process-wide font registry: shared `pygame.font.Font` objects keyed by (family, size, bold).
+
+`pygame.font.SysFont` enumerates the system fonts on first use (fc-list on Linux, the registry on
+Windows), which is slow, and every call builds a new Font even for a size that already exists.
+The registry resolves each (family, bold) to a font file once, remembers the answers in
+`C.FONT_PATHS_CACHE` so later runs skip the enumeration entirely, and hands out one Font per
+(family, size, bold) to every state and widget.
+
+Fonts are shared: callers must not change their style (`set_bold`, `set_underline`, ...).
+"""
+import json
+from pathlib import Path
+from typing import Dict, Optional, Tuple
+
+import pygame
+
+from rsc_engine import constants as C
+from rsc_engine.saves import write_atomic
+
+FontKey = Tuple[str, int, bool]
+
+
+class FontRegistry:
+    def __init__(self, cache_path: Optional[Path] = C.FONT_PATHS_CACHE):
+        self.cache_path = Path(cache_path) if cache_path is not None else None
+        # "rodzina|bold" -> (ścieżka pliku albo None = domyślna czcionka pygame, sztuczne pogrubienie)
+        self._paths: Dict[str, Tuple[Optional[str], bool]] = {}
+        self._fonts: Dict[FontKey, pygame.font.Font] = {}
+        self._load_paths()
+
+    @staticmethod
+    def _path_key(family: str, bold: bool) -> str:
+        return f"{family.lower()}|{int(bold)}"
+
+    def _load_paths(self):
+        if self.cache_path is None: return
+        paths = {}
+        try:
+            with open(self.cache_path, "r", encoding="utf-8") as f:
+                cached = json.load(f)
+            # Poprawny JSON o złym kształcie (lista, {"x": 1}, ...) też jest tylko nieaktualną pamięcią podręczną
+            for key, (path, fake_bold) in cached.items():
+                if path is not None and not isinstance(path, str):
+                    raise TypeError(f"font path for '{key}' is not a string")
+                if path is None or Path(path).exists():  # czcionka odinstalowana - rozwiążemy ją od nowa
+                    paths[key] = (path, bool(fake_bold))
+        except FileNotFoundError:
+            return
+        except (OSError, ValueError, AttributeError, TypeError) as e:
+            print(f"[WARNING] FontRegistry: Ignoring unreadable font cache {self.cache_path}: {e}")
+            return
+        self._paths.update(paths)
+
+    def _save_paths(self):
+        if self.cache_path is None: return
+        try:
+            data = json.dumps(self._paths, indent=1, sort_keys=True).encode("utf-8")
+            write_atomic(self.cache_path, data)
+        except OSError as e:
+            print(f"[WARNING] FontRegistry: Could not write font cache {self.cache_path}: {e}")
+
+    def resolve(self, family: str, bold: bool = False) -> Tuple[Optional[str], bool]:
+        """Font file for `family` and whether bold has to be synthesized (like SysFont does)."""
+        key = self._path_key(family, bold)
+        resolved = self._paths.get(key)
+        if resolved is None:
+            # match_font przy pierwszym wywołaniu wylicza czcionki systemowe - to jest ten wolny krok
+            path = pygame.font.match_font(family, bold=bold)
+            fake_bold = False
+            if bold and path is not None and path == pygame.font.match_font(family):
+                fake_bold = True  # brak osobnego kroju pogrubionego
+            if path is None:
+                fake_bold = bold
+            resolved = self._paths[key] = (path, fake_bold)
+            self._save_paths()
+        return resolved
+
+    def get(self, family: str, size: int, bold: bool = False) -> pygame.font.Font:
+        key = (family.lower(), size, bold)
+        font = self._fonts.get(key)
+        if font is None:
+            path, fake_bold = self.resolve(family, bold)
+            try:
+                font = pygame.font.Font(path, size)
+            except (OSError, pygame.error) as e:
+                print(f"[WARNING] FontRegistry: Could not open font '{path}' for {family}: {e}. Using default font.")
+                font = pygame.font.Font(None, size)
+                fake_bold = bold
+            if fake_bold:
+                font.set_bold(True)
+            self._fonts[key] = font
+        return font
+
+
+_registry: Optional[FontRegistry] = None
+
+
+def get_registry() -> FontRegistry:
+    global _registry
+    if _registry is None:
+        _registry = FontRegistry()
+    return _registry
+
+
+def get_font(family: str, size: int, bold: bool = False) -> pygame.font.Font:
+    """Shared Font for (family, size, bold); drop-in replacement for `pygame.font.SysFont`."""
+    return get_registry().get(family, size, bold)
@@ -3,21 +3,38 @@ from pathlib import Path
 import pygame
 import json
 import os
+import random
+import time
 from rsc_engine.items_manager import ItemManager
 from rsc_engine import constants as C
+from rsc_engine.fonts import get_font
 from rsc_engine.states import GameStateManager, BaseState, PlayerData
 from rsc_engine.game_states import MenuState, CharacterCreationState, GameplayState, PauseMenuState, LoadGameState
 
 from rsc_engine.camera import Camera
 from rsc_engine.tilemap import TileMap
-from rsc_engine.entity import Player, FriendlyNPC, HostileNPC, Entity
+from rsc_engine.entity import Player, FriendlyNPC, Entity
 from rsc_engine.utils import screen_to_iso, iso_to_screen
-from rsc_engine.ui import UI, ContextMenu, DamageSplat
+from rsc_engine.ui import UI, ContextMenu, DamageSplatPool
 from rsc_engine.inventory import Inventory, Item
-from typing import Tuple, Callable, Optional, List, Dict, Any
+from rsc_engine.spawns import SpawnManager
+from rsc_engine.ground_items import GroundItems
+from rsc_engine.timers import TimerWheel
+from rsc_engine.snapshot import WorldSnapshot
+from rsc_engine.replay import ReplayRecorder, ReplayPlayer, FrameTimingDump
+from rsc_engine.profiler import FrameProfiler
+from rsc_engine.metrics import metrics, MetricsWriter
+from rsc_engine.saves import SaveSnapshot, SaveRecordCache, SaveWriter, SaveResult, SaveSlotIndex
+from rsc_engine.save_format import read_save, file_crc32, SaveFormatError, BINARY_SUFFIX, JSON_SUFFIX
+from rsc_engine.save_journal import SaveJournal, read_save_with_journal, journal_path_for
+from typing import Tuple, Callable, Optional, List, Dict, Any, Set
 
 SAVE_DIR = Path(".") / "saves"
 
+_occupancy_queries = metrics.counter("occupancy_queries")
+_frames = metrics.counter("frames")
+_frame_time = metrics.histogram("frame_ms", C.FRAME_TIME_BOUNDS_MS)
+
 
 class Game:
     def __init__(self,
@@ -30,6 +47,9 @@ class Game:
         self.logical_screen = pygame.Surface((C.SCREEN_WIDTH, C.SCREEN_HEIGHT))
         self.clock = pygame.time.Clock()
         self.running = True
+        # Pozycja myszy próbkowana raz na klatkę (przy odtwarzaniu - nagrana)
+        self._mouse_pos: Tuple[int, int] = (0, 0)
+        self._logical_mouse_pos: Optional[Tuple[int, int]] = None
 
         self.player: Optional[Player] = None
         self.entities: Optional[pygame.sprite.Group] = pygame.sprite.Group()
@@ -38,7 +58,11 @@ class Game:
         self.ui: Optional[UI] = None
         self.context_menu: Optional[ContextMenu] = None
         self.inventory: Optional[Inventory] = None
-        self.damage_splats: List[DamageSplat] = []
+        self.damage_splats = DamageSplatPool()
+        self.spawn_manager: Optional[SpawnManager] = None
+        self.ground_items: Optional[GroundItems] = None
+        self.timers = TimerWheel()  # zegar gry; przesuwa go GameplayState.update
+        self.profiler = FrameProfiler()  # nakładka F3 w GameplayState
 
         self.damage_icon_image = None
         self.damage_font = None
@@ -50,10 +74,18 @@ class Game:
         }
 
         SAVE_DIR.mkdir(parents=True, exist_ok=True)
+        self.save_writer = SaveWriter()
+        self.save_journals: Dict[int, SaveJournal] = {}
+        self.save_index = SaveSlotIndex(SAVE_DIR)
+        self._saves_in_flight: Set[int] = set()
+        self._pending_saves: Dict[int, Tuple[bool, bool]] = {}  # slot -> (journaled, announce)
+        self._save_records = SaveRecordCache()  # zamrożone rekordy ostatniego zapisu, odświeżane tylko po zmianach
+        # Zapis sparsowany przy budowaniu listy slotów, ważny dopóki pliki slotu się nie zmienią
+        self._save_payload_cache: Dict[int, Tuple[List[List[int]], Dict[str, Any]]] = {}
 
         self.state_manager = GameStateManager(None, self)
         self._register_states()
-        self.item_manager: Optional[Item] = None
+        self.item_manager = ItemManager()
 
         initial_state_key = "GAMEPLAY" if C.DEV_SKIP_MENU_AND_CREATOR else "MENU"
         initial_data = None
@@ -86,14 +118,70 @@ class Game:
         self.state_manager.register_state("LOAD_GAME", LoadGameState(self))
 
     def get_save_file_path(self, slot_number: int) -> Path:
-        return SAVE_DIR / f"save_slot_{slot_number}.json"
+        return SAVE_DIR / f"save_slot_{slot_number}{BINARY_SUFFIX}"
+
+    def find_save_file(self, slot_number: int) -> Optional[Path]:
+        """Existing save of a slot: the binary file, or a legacy JSON one if no binary save exists yet."""
+        for path in (self.get_save_file_path(slot_number), SAVE_DIR / f"save_slot_{slot_number}{JSON_SUFFIX}"):
+            if path.exists():
+                return path
+        return None
+
+    def _read_slot_file(self, save_path: Path) -> Dict[str, Any]:
+        if save_path.suffix == BINARY_SUFFIX:
+            return read_save_with_journal(save_path)
+        return read_save(save_path)
+
+    def _slot_stamp(self, save_path: Path) -> List[List[int]]:
+        """Size and mtime of a slot's files; a save changes the stamp, so it tells stale metadata apart."""
+        stamp = []
+        paths = [save_path, journal_path_for(save_path)] if save_path.suffix == BINARY_SUFFIX else [save_path]
+        for path in paths:
+            try:
+                st = path.stat()
+                stamp.append([st.st_size, st.st_mtime_ns])
+            except OSError:
+                stamp.append([0, 0])
+        return stamp
+
+    def load_save_data(self, slot_number: int) -> Optional[Dict[str, Any]]:
+        save_path = self.find_save_file(slot_number)
+        if save_path is None:
+            print(f"[ERROR] Save slot {slot_number} not found in {SAVE_DIR}")
+            return None
+        cached = self._save_payload_cache.pop(slot_number, None)
+        if cached is not None and cached[0] == self._slot_stamp(save_path):
+            return cached[1]
+        try:
+            return self._read_slot_file(save_path)
+        except (OSError, SaveFormatError) as e:
+            print(f"[ERROR] Could not load save slot {slot_number} from {save_path}: {e}")
+            return None
+
+    def get_save_journal(self, slot_number: int) -> SaveJournal:
+        journal = self.save_journals.get(slot_number)
+        if journal is None:
+            journal = SaveJournal(self.get_save_file_path(slot_number))
+            self.save_journals[slot_number] = journal
+        return journal
+
+    def is_save_in_flight(self, slot_number: int) -> bool:
+        return slot_number in self._saves_in_flight
 
-    def save_game(self, slot_number: int):
-        if self.state_manager.active_state_key != "GAMEPLAY" or not self.player:
+    def save_game(self, slot_number: int, journaled: bool = C.SAVE_JOURNALED, announce: bool = True) -> bool:
+        """Snapshot the game and save it to a slot in the background. Returns False if nothing was queued.
+
+        At most one save per slot is in flight; a save requested meanwhile is deferred until the
+        running one finishes and then captures the state of that moment.
+        """
+        if not self.state_manager.is_state_loaded("GAMEPLAY") or not self.player:
             print("[ERROR] Cannot save game: Not in GameplayState or Player not initialized.")
-            if self.ui and hasattr(self.ui, 'show_dialogue'):
+            if announce and self.ui and hasattr(self.ui, 'show_dialogue'):
                 self.ui.show_dialogue("System", ["Error: Cannot save game state now."])
-            return
+            return False
+        if slot_number in self._saves_in_flight:
+            self._pending_saves[slot_number] = (journaled, announce)
+            return True
 
         current_map_id = "default_map"
         if self.tilemap and hasattr(self.tilemap, 'map_id'):
@@ -111,122 +199,243 @@ class Game:
             xp=getattr(self.player, 'xp', 0),
             map_id=current_map_id
         )
-        npc_states = []
-        if self.entities:  # Upewnij się, że self.entities (z GameplayState) jest dostępne
-            for entity in self.entities:
-                if isinstance(entity, (FriendlyNPC, HostileNPC)):  # Zapisuj tylko NPC
-                    if not hasattr(entity, 'entity_id'):
-                        print(f"[WARNING] NPC {entity.name} ma no entity_id, skipping save for this NPC.")
-                        continue
-
-                    npc_data = {
-                        "entity_id": entity.entity_id,
-                        "name": entity.name,  # Można pominąć, jeśli ID wystarczy do odtworzenia
-                        "ix": entity.ix,
-                        "iy": entity.iy,
-                        "hp": entity.hp,
-                        "max_hp": entity.max_hp,  # Dla referencji lub jeśli może się zmieniać
-                        "is_alive": entity.is_alive,
-                        "level": entity.level,  # Jeśli NPC mają poziomy
-                        # Możesz dodać więcej specyficznych danych, np. czy jest 'is_chasing' dla HostileNPC
-                        "type": entity.__class__.__name__  # np. "HostileNPC", "FriendlyNPC"
-                    }
-                    # Jeśli to HostileNPC, zapisz jego show_hp_bar
-                    if isinstance(entity, HostileNPC):
-                        npc_data["show_hp_bar"] = entity.show_hp_bar
-                        npc_data["is_chasing"] = entity.is_chasing  # Można zapisać stan AI
-
-                    npc_states.append(npc_data)
-        game_state_to_save = {
-            "player_data": player_data_to_save.to_dict(),
-            "npc_states": npc_states,  # <<< DODAJ npc_states DO ZAPISU
-            "current_map_id": getattr(self.tilemap, 'id', player_data_to_save.map_id),  # Zapisz ID aktualnej mapy
-            "timestamp": pygame.time.get_ticks(),
-            "game_version": "0.1.1"  # Zwiększ wersję, jeśli format zapisu się zmienia
+        records = self._save_records
+        if self.spawn_manager:
+            reset, npc_changes = self.spawn_manager.take_npc_changes()
+            records.update_npcs(npc_changes, reset=reset)
+        else:
+            records.update_npcs({}, reset=True)
+        if self.inventory:
+            records.update_inventory((id(self.inventory), self.inventory.version), self.inventory.get_save_data)
+        else:
+            records.update_inventory(None, list)
+        snapshot = records.snapshot(
+            slot_number=slot_number,
+            path=self.get_save_file_path(slot_number),
+            player_data=player_data_to_save.to_dict(),
+            current_map_id=getattr(self.tilemap, 'id', player_data_to_save.map_id),  # Zapisz ID aktualnej mapy
+            timestamp=pygame.time.get_ticks()
+        )
+        # Serializacja i zapis na dysk odbywają się w tle; wynik wraca przez _on_save_finished
+        journal = self.get_save_journal(slot_number)
+        self._saves_in_flight.add(slot_number)
+        self.save_writer.submit(snapshot, lambda result: self._on_save_finished(result, announce),
+                                write=lambda snap: self._write_slot(snap, journal, journaled))
+        return True
+
+    def _write_slot(self, snapshot: SaveSnapshot, journal: SaveJournal, journaled: bool):
+        """Runs on the SaveWriter thread: write the slot, then refresh its entry in the slot index."""
+        if journaled:
+            journal.append(snapshot)
+        else:
+            journal.write_full(snapshot)
+        try:
+            self.save_index.update(snapshot.slot_number,
+                                   self._slot_index_entry(snapshot.path, snapshot.player_data, journal.base_crc))
+        except OSError as e:
+            # Sam zapis się udał; nieaktualny wpis zostanie odbudowany przy następnym listowaniu slotów
+            print(f"[WARNING] Could not update save slot index: {e}")
+
+    def _slot_index_entry(self, save_path: Path, player_data: Dict[str, Any], checksum: int) -> Dict[str, Any]:
+        stamp = self._slot_stamp(save_path)
+        return {
+            "file": save_path.name,
+            "player_name": player_data.get("name", "N/A"),
+            "level": player_data.get("level", "N/A"),
+            "map_id": player_data.get("map_id", "N/A"),
+            "saved_at": time.time(),
+            "size": sum(size for size, _ in stamp),
+            "checksum": checksum,
+            "stamp": stamp
         }
 
-        save_path = self.get_save_file_path(slot_number)
-        try:
-            with open(save_path, 'w') as f:
-                json.dump(game_state_to_save, f, indent=4, ensure_ascii=False)
-            print(f"[INFO] Game saved to slot {slot_number} ({save_path})")
-            if self.ui and hasattr(self.ui, 'show_dialogue'):
-                self.ui.show_dialogue("System", [f"Game saved to slot {slot_number}."])
-        except Exception as e:
-            print(f"[ERROR] Could not save game to slot {slot_number}: {e}")
+    def _on_save_finished(self, result: SaveResult, announce: bool = True):
+        self._saves_in_flight.discard(result.slot_number)
+        if result.ok:
+            print(f"[INFO] Game saved to slot {result.slot_number} ({result.path}) in {result.elapsed * 1000:.1f} ms")
+            if announce and self.ui and hasattr(self.ui, 'show_dialogue'):
+                self.ui.show_dialogue("System", [f"Game saved to slot {result.slot_number}."])
+        else:
+            print(f"[ERROR] Could not save game to slot {result.slot_number}: {result.error}")
             if self.ui and hasattr(self.ui, 'show_dialogue'):
-                self.ui.show_dialogue("System", [f"Error saving game: {e}"])
+                self.ui.show_dialogue("System", [f"Error saving game: {result.error}"])
+
+        pending = self._pending_saves.pop(result.slot_number, None)
+        if pending is not None:
+            self.save_game(result.slot_number, *pending)
 
     def load_game_data_from_slot(self, slot_number: int) -> Optional[PlayerData]:
-        save_path = self.get_save_file_path(slot_number)
-        if not save_path.exists():
-            print(f"[ERROR] Save slot {slot_number} not found at {save_path}")
+        game_state_loaded = self.load_save_data(slot_number)
+        if game_state_loaded is None:
             return None
 
-        try:
-            with open(save_path, 'r') as f:
-                game_state_loaded = json.load(f)
-            if "player_data" not in game_state_loaded:
-                print(f"[ERROR] Save slot {slot_number} is corrupted or has old format (missing 'player_data').")
-                return None
-
-            player_data = PlayerData.from_dict(game_state_loaded["player_data"])
-            print(f"[INFO] Loaded game data from slot {slot_number}: {player_data}")
-            self.shared_game_data["current_save_slot"] = slot_number
-            return player_data
-        except Exception as e:
-            print(f"[ERROR] Could not load game from slot {slot_number}: {e}")
+        player_data = PlayerData.from_dict(game_state_loaded["player_data"])
+        print(f"[INFO] Loaded game data from slot {slot_number}: {player_data}")
+        self.shared_game_data["current_save_slot"] = slot_number
+        return player_data
+
+    def capture_world_snapshot(self) -> Optional[WorldSnapshot]:
+        """In-memory copy of the running world (entities, inventory, camera, tilemap), see WorldSnapshot."""
+        if not self.state_manager.is_state_loaded("GAMEPLAY") or not self.player or self.entities is None:
+            print("[ERROR] Cannot capture world snapshot: Not in GameplayState.")
             return None
+        started = time.perf_counter()
+        snapshot = WorldSnapshot.capture(self)
+        print(f"[INFO] World snapshot captured ({len(snapshot.entities)} entities) "
+              f"in {(time.perf_counter() - started) * 1000:.2f} ms")
+        return snapshot
+
+    def restore_world_snapshot(self, snapshot: WorldSnapshot) -> bool:
+        if not snapshot.is_valid_for(self):
+            print("[ERROR] Cannot restore world snapshot: it belongs to a previous gameplay session.")
+            return False
+        started = time.perf_counter()
+        snapshot.restore(self)
+        if self.context_menu: self.context_menu.hide()
+        print(f"[INFO] World snapshot restored in {(time.perf_counter() - started) * 1000:.2f} ms")
+        return True
 
     def get_save_slot_info(self) -> List[Dict[str, Any]]:
+        """Slot list for the Load Game screen, built from the slot index.
+
+        A save payload is only parsed when its index entry is missing or stale (older saves, files
+        changed outside the game); the parsed payload is then kept for `load_save_data` and the
+        index entry is rebuilt.
+        """
         save_infos = []
-        for i in range(1, 4):
-            path = self.get_save_file_path(i)
-            info = {"slot": i, "exists": False, "player_name": "Empty", "level": "-", "map_id": "-"}
-            if path.exists():
-                try:
-                    with open(path, 'r') as f:
-                        data = json.load(f)
-                    if "player_data" in data:
-                        info["exists"] = True
-                        pd = data["player_data"]
-                        info["player_name"] = pd.get("name", "N/A")
-                        info["level"] = pd.get("level", "N/A")
-                        info["map_id"] = pd.get("map_id", "N/A")
-                except Exception as e:
-                    print(f"[WARNING] Could not parse save slot {i} info: {e}")
+        slots = set(range(1, C.SAVE_SLOT_COUNT + 1)) | set(self.save_index.slots())
+        if self.find_save_file(C.AUTOSAVE_SLOT) is not None:
+            slots.add(C.AUTOSAVE_SLOT)
+        for i in sorted(slots):
+            path = self.find_save_file(i)
+            info = {"slot": i, "exists": False, "player_name": "Empty", "level": "-", "map_id": "-", "saved_at": None}
+            if path is not None:
+                entry = self.save_index.get(i)
+                if entry is None or entry.get("file") != path.name or entry.get("stamp") != self._slot_stamp(path):
+                    entry = self._rebuild_slot_index_entry(i, path)
+                if entry is not None:
+                    info.update(exists=True, player_name=entry["player_name"], level=entry["level"],
+                                map_id=entry["map_id"], saved_at=entry.get("saved_at"))
+                else:
                     info["player_name"] = "Corrupted"
             save_infos.append(info)
         return save_infos
 
-    def run(self):
+    def _rebuild_slot_index_entry(self, slot_number: int, save_path: Path) -> Optional[Dict[str, Any]]:
+        stamp = self._slot_stamp(save_path)
+        try:
+            data = self._read_slot_file(save_path)
+            checksum = file_crc32(save_path)
+        except (OSError, SaveFormatError) as e:
+            print(f"[WARNING] Could not parse save slot {slot_number} info: {e}")
+            return None
+        self._save_payload_cache[slot_number] = (stamp, data)
+        entry = self._slot_index_entry(save_path, data["player_data"], checksum)
+        entry["saved_at"] = save_path.stat().st_mtime
+        try:
+            self.save_index.update(slot_number, entry)
+        except OSError as e:
+            print(f"[WARNING] Could not update save slot index: {e}")
+        return entry
+
+    def run(self, record_path: Optional[Path] = None, replay_path: Optional[Path] = None,
+            headless: bool = False, timing_dump_path: Optional[Path] = None, metrics_path: Optional[Path] = None):
+        """Main loop.
+
+        `record_path` records every frame's events, mouse position and dt (see rsc_engine.replay).
+        `replay_path` plays such a recording back instead of reading live input; with `headless`
+        the replay runs as fast as possible without presenting frames, and `timing_dump_path`
+        writes per-frame phase timings of the replay. `metrics_path` appends one JSON Lines record
+        of the performance counters (rsc_engine.metrics) per second.
+        """
+        recorder: Optional[ReplayRecorder] = None
+        replay: Optional[ReplayPlayer] = None
+        timings = FrameTimingDump(timing_dump_path) if timing_dump_path else None
+        metrics_writer = MetricsWriter(metrics_path) if metrics_path else None
+        if replay_path:
+            replay = ReplayPlayer(replay_path)
+            random.seed(replay.seed)
+            if self.window_screen.get_size() != replay.window_size:
+                self.window_screen = pygame.display.set_mode(replay.window_size, pygame.RESIZABLE)
+            print(f"[INFO] Replay: Playing {replay.path} (seed {replay.seed}{', headless' if headless else ''})")
+        else:
+            seed = random.randrange(2 ** 32)
+            random.seed(seed)
+            if record_path:
+                recorder = ReplayRecorder(record_path, seed, self.window_screen.get_size(), C.FPS)
+
         while self.running:
-            dt = self.clock.tick(C.FPS) / 1000.0
-            events = pygame.event.get()
+            tick_start = time.perf_counter()
+            if replay:
+                self.clock.tick() if headless else self.clock.tick(replay.fps)
+                frame_start = time.perf_counter()  # bez czasu czekania ogranicznika klatek
+                frame = replay.next_frame()
+                if frame is None:
+                    print(f"[INFO] Replay: Finished after {replay.frames} frames")
+                    break
+                dt, events = frame.dt, frame.events
+                self._mouse_pos, self._logical_mouse_pos = frame.mouse_pos, frame.logical_mouse_pos
+                if any(event.type == pygame.QUIT for event in pygame.event.get()): self.running = False
+            else:
+                dt = self.clock.tick(C.FPS) / 1000.0
+                frame_start = time.perf_counter()
+                events = pygame.event.get()
+                self._mouse_pos = pygame.mouse.get_pos()
+                self._logical_mouse_pos = None
+                if recorder:
+                    recorder.record_frame(dt, events, self._mouse_pos, self.get_logical_mouse_pos())
             for event in events:
                 if event.type == pygame.QUIT: self.running = False
                 if event.type == pygame.VIDEORESIZE:
                     self.window_screen = pygame.display.set_mode(event.size, pygame.RESIZABLE)
             if not self.running: break
 
+            self.save_writer.poll()
             self.state_manager.handle_events(events)
+            events_done = time.perf_counter()
             self.state_manager.update(dt)
+            update_done = time.perf_counter()
 
             if self.state_manager.active_state:
                 self.state_manager.draw(self.logical_screen)
             else:
                 self.logical_screen.fill((0, 0, 0))
-
-            scaled_surface = pygame.transform.scale(self.logical_screen, self.window_screen.get_size())
-            self.window_screen.blit(scaled_surface, (0, 0))
-
-            # Rysuj ContextMenu na window_screen tylko jeśli jest aktywne i należy do GameplayState
-            # (Zakładamy, że self.context_menu jest ustawiane w Game przez GameplayState.on_enter)
-            if self.state_manager.active_state_key == "GAMEPLAY" and \
-                    self.context_menu and self.context_menu.is_visible:  # Dodano sprawdzenie self.context_menu
-                self.context_menu.draw(self.window_screen)
-
-            pygame.display.flip()
+            draw_done = time.perf_counter()
+            profiler = self.profiler if self.profiler.enabled else None
+            if profiler:
+                profiler.add_idle(frame_start - tick_start)
+                profiler.add("events", events_done - frame_start)
+                profiler.add("update", update_done - events_done)
+
+            if not (replay and headless):
+                scaled_surface = pygame.transform.scale(self.logical_screen, self.window_screen.get_size())
+                self.window_screen.blit(scaled_surface, (0, 0))
+
+                # Rysuj ContextMenu na window_screen tylko jeśli jest aktywne i należy do GameplayState
+                # (Zakładamy, że self.context_menu jest ustawiane w Game przez GameplayState.on_enter)
+                if self.state_manager.active_state_key == "GAMEPLAY" and \
+                        self.context_menu and self.context_menu.is_visible:  # Dodano sprawdzenie self.context_menu
+                    self.context_menu.draw(self.window_screen)
+
+                if profiler:
+                    scale_done = time.perf_counter()
+                    profiler.add("scale", scale_done - draw_done)
+                pygame.display.flip()
+                if profiler: profiler.add("flip", time.perf_counter() - scale_done)
+            if profiler: profiler.end_frame()
+            _frames.inc()
+            _frame_time.observe((time.perf_counter() - frame_start) * 1000)
+            if metrics_writer: metrics_writer.poll()
+            if timings:
+                timings.add(dt, len(events), {"events": events_done - frame_start, "update": update_done - events_done,
+                                              "draw": draw_done - update_done,
+                                              "present": time.perf_counter() - draw_done})
+
+        if recorder: recorder.close()
+        if replay: replay.close()
+        if timings: timings.write()
+        if metrics_writer: metrics_writer.close()
+        self.save_writer.shutdown()
         pygame.quit()
 
     def _process_events(self):
@@ -239,6 +448,16 @@ class Game:
             self):  # Ta metoda jest teraz PUSTA, bo całe rysowanie odbywa się w GameplayState.draw() i potem jest skalowane
         pass
 
+    def get_mouse_pos(self) -> Tuple[int, int]:
+        """Window mouse position of the current frame (the recorded one during a replay)."""
+        return self._mouse_pos
+
+    def get_logical_mouse_pos(self) -> Tuple[int, int]:
+        """Mouse position of the current frame in logical screen coordinates."""
+        if self._logical_mouse_pos is not None:
+            return self._logical_mouse_pos
+        return self.get_scaled_mouse_pos(self._mouse_pos)
+
     def get_scaled_mouse_pos(self, physical_mouse_pos: Tuple[int, int]) -> Tuple[int, int]:
         window_w, window_h = self.window_screen.get_size()
         logical_w, logical_h = self.logical_screen.get_size()
@@ -264,6 +483,7 @@ class Game:
         return pygame.transform.smoothscale(image, (target_width, target_height))
 
     def is_tile_occupied_by_entity(self, ix: int, iy: int, excluding_entity: Optional[Entity] = None) -> bool:
+        _occupancy_queries.inc()
         if not self.entities: return False
         for entity in self.entities:
             if entity == excluding_entity: continue
@@ -315,11 +535,8 @@ class Game:
             self.damage_icon_image = pygame.Surface((C.TARGET_SPLAT_ICON_WIDTH, C.TARGET_SPLAT_ICON_HEIGHT),
                                                     pygame.SRCALPHA)
             self.damage_icon_image.fill((200, 0, 0, 150))
-        try:
-            self.damage_font = pygame.font.SysFont("Arial Black", 14, bold=True)
-        except Exception as e:
-            print(f"Could not load damage font: {e}. Using default system font.")
-            self.damage_font = pygame.font.SysFont(pygame.font.get_default_font(), 14, bold=True)
+        self.damage_font = get_font("Arial Black", 14, bold=True)  # rejestr sam wraca do domyślnej czcionki
+        self.damage_splats.set_assets(self.damage_icon_image, self.damage_font)
 
     def create_damage_splat(self, value: int, target_entity: Entity):
         if not self.damage_font or not self.damage_icon_image:
@@ -334,5 +551,5 @@ class Game:
         center_x = logical_entity_rect_on_cam.centerx
         top_y = logical_entity_rect_on_cam.top
 
-        splat = DamageSplat(value, center_x, top_y, self.damage_icon_image, self.damage_font, self.camera)
-        self.damage_splats.append(splat)
\ No newline at end of file
+        splat = self.damage_splats.spawn(value, center_x, top_y, self.timers.now)
+        self.timers.schedule(self.damage_splats.lifetime, self.damage_splats.release, splat, splat.generation)
@@ -1,8 +1,10 @@
 # rsc_engine/game_states.py
 import pygame
-import json
+import time
 from rsc_engine.states import BaseState, PlayerData
 from rsc_engine import constants as C
+from rsc_engine.fonts import get_font
+from rsc_engine.text_cache import render_text
 from pathlib import Path  # <<< POPRAWIONY IMPORT
 
 # Importuj klasy gry potrzebne dla GameplayState
@@ -11,16 +13,25 @@ from rsc_engine.tilemap import TileMap
 from rsc_engine.entity import Player, FriendlyNPC, HostileNPC
 from rsc_engine.ui import UI, ContextMenu
 from rsc_engine.inventory import Inventory, Item
+from rsc_engine.spawns import SpawnManager
+from rsc_engine.ground_items import GroundItems
+from rsc_engine.autosave import AutosaveScheduler
+from rsc_engine import render_queue as RQ
+from rsc_engine.overlay_sprites import OverlaySprites
+from rsc_engine.metrics import metrics
 from rsc_engine.utils import screen_to_iso, iso_to_screen
 
 from typing import Tuple, Callable, Optional, List, Any, Dict
 
 
+_entities_updated = metrics.counter("entities_updated")
+
+
 class MenuState(BaseState):
     def __init__(self, game: "Game"):
         super().__init__(game)
-        self.font_large = pygame.font.SysFont("Consolas", 56, bold=True)
-        self.font_buttons = pygame.font.SysFont("Consolas", 36)
+        self.font_large = get_font("Consolas", 56, bold=True)
+        self.font_buttons = get_font("Consolas", 36)
         self.options = ["New Game", "Load Game", "Options (N/A)", "Quit"]
         self.buttons: List[Tuple[Optional[pygame.Surface], pygame.Rect, str]] = []
         self.selected_option_index = 0
@@ -85,9 +96,7 @@ class MenuState(BaseState):
             self.game.state_manager.set_state("CHARACTER_CREATION")
         elif selected_action == "Load Game":
             print("[DEBUG] MenuState: Transitioning to LOAD_GAME state.")
-            if hasattr(self.game.state_manager, 'previous_active_state_key_for_load_game'):
-                self.game.state_manager.previous_active_state_key_for_load_game = "MENU"
-            self.game.state_manager.set_state("LOAD_GAME")
+            self.game.state_manager.push_state("LOAD_GAME")
         elif selected_action == "Options (N/A)":
             print("Options - Not implemented yet")
         elif selected_action == "Quit":
@@ -100,7 +109,7 @@ class MenuState(BaseState):
         surface.fill((25, 20, 35))
 
         caption_text = "RSC Clone Adventure"
-        title_surf = self.font_large.render(caption_text, True, (230, 220, 255))
+        title_surf = render_text(self.font_large, caption_text, True, (230, 220, 255))
         title_rect = title_surf.get_rect(center=(C.SCREEN_WIDTH // 2, C.SCREEN_HEIGHT // 4 - 30))
         surface.blit(title_surf, title_rect)
 
@@ -115,7 +124,7 @@ class MenuState(BaseState):
             pygame.draw.rect(surface, current_button_color, rect, border_radius=8)
             pygame.draw.rect(surface, current_border_color, rect, border_thickness, border_radius=8)
 
-            text_surf = self.font_buttons.render(option_text, True, current_text_color)
+            text_surf = render_text(self.font_buttons, option_text, True, current_text_color)
             text_rect = text_surf.get_rect(center=rect.center)
             surface.blit(text_surf, text_rect)
 
@@ -123,10 +132,10 @@ class MenuState(BaseState):
 class CharacterCreationState(BaseState):
     def __init__(self, game: "Game"):
         super().__init__(game)
-        self.font_title = pygame.font.SysFont("Consolas", 40, bold=True)
-        self.font_prompt = pygame.font.SysFont("Consolas", 28)
-        self.font_input = pygame.font.SysFont("Consolas", 32)
-        self.font_button = pygame.font.SysFont("Consolas", 30)
+        self.font_title = get_font("Consolas", 40, bold=True)
+        self.font_prompt = get_font("Consolas", 28)
+        self.font_input = get_font("Consolas", 32)
+        self.font_button = get_font("Consolas", 30)
 
         self.player_name = ""
         self.input_rect_width = 400;
@@ -187,16 +196,16 @@ class CharacterCreationState(BaseState):
 
     def draw(self, surface: pygame.Surface):
         surface.fill((25, 30, 35));
-        ts = self.font_title.render("Create Your Hero", True, self.text_color);
+        ts = render_text(self.font_title, "Create Your Hero", True, self.text_color);
         tr = ts.get_rect(center=(C.SCREEN_WIDTH // 2, C.SCREEN_HEIGHT // 4 - 20));
         surface.blit(ts, tr)
-        ps = self.font_prompt.render(self.prompt_text, True, self.text_color);
+        ps = render_text(self.font_prompt, self.prompt_text, True, self.text_color);
         pr = ps.get_rect(center=(C.SCREEN_WIDTH // 2, self.input_rect.top - 40));
         surface.blit(ps, pr)
         ibg = self.input_bg_color_active if self.active_input else self.input_bg_color_inactive;
         pygame.draw.rect(surface, ibg, self.input_rect, 0, 5);
         pygame.draw.rect(surface, self.input_border_color, self.input_rect, 2, 5)
-        ns = self.font_input.render(self.player_name, True, self.input_text_color);
+        ns = render_text(self.font_input, self.player_name, True, self.input_text_color);
         nsr = ns.get_rect(left=self.input_rect.left + 10, centery=self.input_rect.centery);
         surface.blit(ns, nsr)
         if self.active_input and (pygame.time.get_ticks() // 400) % 2 == 0:
@@ -208,7 +217,7 @@ class CharacterCreationState(BaseState):
             pygame.draw.line(surface, self.input_text_color, (cursor_x, cursor_y_start), (cursor_x, cursor_y_end), 2)
         pygame.draw.rect(surface, self.button_color, self.start_button_rect, 0, 8);
         pygame.draw.rect(surface, self.button_border_color, self.start_button_rect, 3, 8);
-        sts = self.font_button.render(self.start_button_text, True, self.button_text_color);
+        sts = render_text(self.font_button, self.start_button_text, True, self.button_text_color);
         strr = sts.get_rect(center=self.start_button_rect.center);
         surface.blit(sts, strr)
 
@@ -223,12 +232,21 @@ class GameplayState(BaseState):
         self.ui: Optional[UI] = None
         self.context_menu: Optional[ContextMenu] = None
         self.inventory: Optional[Inventory] = None
+        self.spawn_manager = SpawnManager(game)
+        self.ground_items = GroundItems(game)
+        self.autosave = AutosaveScheduler(game)
+        self.render_queue = RQ.RenderQueue()
+        self.overlay_sprites = OverlaySprites()
+        # Migawka świata w pamięci: F5 zapisuje, F9 przywraca; wejście w walkę robi migawkę automatycznie
+        self.world_snapshot = None
+        self._player_was_in_combat = False
         # print("[DEBUG] GameplayState initialized (attributes will be set in on_enter)")
 
     def on_enter(self, loaded_game_or_player_data: Optional[Any] = None):
         super().on_enter(loaded_game_or_player_data)
         current_player_data: Optional[PlayerData] = None
         loaded_npc_states: Optional[List[Dict[str, Any]]] = None
+        loaded_inventory: List[Dict[str, Any]] = []
         current_map_id = "default_map"
 
         if isinstance(loaded_game_or_player_data, PlayerData):
@@ -237,6 +255,7 @@ class GameplayState(BaseState):
         elif isinstance(loaded_game_or_player_data, dict) and "player_data" in loaded_game_or_player_data:
             current_player_data = PlayerData.from_dict(loaded_game_or_player_data["player_data"])
             loaded_npc_states = loaded_game_or_player_data.get("npc_states", [])
+            loaded_inventory = loaded_game_or_player_data.get("inventory", [])
             current_map_id = loaded_game_or_player_data.get("current_map_id", current_map_id)
             print(
                 f"[INFO] GameplayState entered from Load Game with: {current_player_data} and {len(loaded_npc_states or [])} NPC states.")
@@ -269,6 +288,8 @@ class GameplayState(BaseState):
 
         self.entities = pygame.sprite.Group();
         self.game.entities = self.entities
+        self.ground_items.clear()
+        self.game.ground_items = self.ground_items
 
         player_original_image = self.game._load_image("player.png")
         scaled_player_image = self.game._scale_image_proportionally(player_original_image, C.TARGET_CHAR_HEIGHT)
@@ -283,90 +304,10 @@ class GameplayState(BaseState):
         self.entities.add(self.player);
         self.game.player = self.player
 
-        def_fn_ix, def_fn_iy = 8, 8;
-        def_gn_ix, def_gn_iy = 12, 12
-        default_npc_definitions = {
-            f"friendly_oldman_{def_fn_ix}_{def_fn_iy}": {"type": FriendlyNPC, "name": "Old Man", "ix": def_fn_ix,
-                                                         "iy": def_fn_iy, "image_file": "friendly_npc.png",
-                                                         "dialogue": ["Witaj w GameplayState!", "To jest test."],
-                                                         "max_hp": 30, "attack_speed": 9999,
-                                                         "entity_id": f"friendly_oldman_{def_fn_ix}_{def_fn_iy}"},
-            f"hostile_goblin_{def_gn_ix}_{def_gn_iy}": {"type": HostileNPC, "name": "Goblin Scout", "ix": def_gn_ix,
-                                                        "iy": def_gn_iy, "image_file": "hostile_npc.png", "max_hp": 30,
-                                                        "attack_speed": 1.8, "level": 1, "attack_power": 5,
-                                                        "defense": 1, "aggro_radius": 5,
-                                                        "entity_id": f"hostile_goblin_{def_gn_ix}_{def_gn_iy}"}
-        }
-
-        processed_npc_ids = set()
-        if loaded_npc_states:
-            for npc_data in loaded_npc_states:
-                entity_id = npc_data.get("entity_id");
-                if not entity_id: continue;
-                processed_npc_ids.add(entity_id);
-                npc_class_name = npc_data.get("type");
-                npc_class = None;
-                image_file_for_npc = default_npc_definitions.get(entity_id, {}).get("image_file", "hostile_npc.png")
-                if npc_class_name == "FriendlyNPC":
-                    npc_class = FriendlyNPC
-                elif npc_class_name == "HostileNPC":
-                    npc_class = HostileNPC
-
-                if npc_class and npc_data.get("is_alive", True):
-                    # print(f"[INFO] Loading NPC from save: {entity_id}")
-                    try:
-                        img_orig = self.game._load_image(
-                            image_file_for_npc); img = self.game._scale_image_proportionally(img_orig,
-                                                                                             C.TARGET_CHAR_HEIGHT)
-                    except:
-                        img = pygame.Surface((C.TARGET_CHAR_HEIGHT, C.TARGET_CHAR_HEIGHT), pygame.SRCALPHA); img.fill(
-                            (100, 100, 100, 150))
-
-                    base_def = default_npc_definitions.get(entity_id, {})
-                    npc_args = {"game": self.game, "name": npc_data.get("name", base_def.get("name")),
-                                "ix": npc_data.get("ix"), "iy": npc_data.get("iy"), "image": img,
-                                "entity_id": entity_id, "level": npc_data.get("level", base_def.get("level", 1)),
-                                "max_hp": npc_data.get("max_hp", base_def.get("max_hp")),
-                                "attack_speed": npc_data.get("attack_speed", base_def.get("attack_speed", 2.0))}
-                    if npc_class == FriendlyNPC:
-                        npc_args["dialogue"] = npc_data.get("dialogue", base_def.get("dialogue"))
-                    elif npc_class == HostileNPC:
-                        npc_args["attack_power"] = npc_data.get("attack_power", base_def.get("attack_power", 5))
-                        npc_args["defense"] = npc_data.get("defense", base_def.get("defense", 1))
-                        npc_args["aggro_radius"] = npc_data.get("aggro_radius", base_def.get("aggro_radius", 5))
-
-                    npc_instance = npc_class(**npc_args);
-                    npc_instance.hp = npc_data.get("hp");
-                    npc_instance.is_alive = npc_data.get("is_alive", True)
-                    if isinstance(npc_instance, HostileNPC): npc_instance.show_hp_bar = npc_data.get("show_hp_bar",
-                                                                                                     False); npc_instance.is_chasing = npc_data.get(
-                        "is_chasing", False); npc_instance.start_ix, npc_instance.start_iy = npc_data.get(
-                        "ix"), npc_data.get("iy")
-                    if npc_instance.is_alive: self.entities.add(npc_instance)
-                # elif not npc_data.get("is_alive", True): print(f"[INFO] NPC {entity_id} was dead in save, not creating.")
-        for entity_id, def_data in default_npc_definitions.items():
-            if entity_id not in processed_npc_ids:
-                # print(f"[INFO] Creating default NPC: {entity_id}")
-                npc_class = def_data["type"]
-                try:
-                    img_orig = self.game._load_image(
-                        def_data["image_file"]); img = self.game._scale_image_proportionally(img_orig,
-                                                                                             C.TARGET_CHAR_HEIGHT)
-                except:
-                    img = pygame.Surface((C.TARGET_CHAR_HEIGHT, C.TARGET_CHAR_HEIGHT), pygame.SRCALPHA); img.fill(
-                        (100, 100, 100, 150))
-                npc_args = {"game": self.game, "name": def_data["name"], "ix": def_data["ix"], "iy": def_data["iy"],
-                            "image": img, "entity_id": entity_id, "level": def_data.get("level", 1),
-                            "max_hp": def_data["max_hp"], "attack_speed": def_data.get("attack_speed", 2.0)}
-                if npc_class == FriendlyNPC:
-                    npc_args["dialogue"] = def_data.get("dialogue")
-                elif npc_class == HostileNPC:
-                    npc_args["attack_power"] = def_data.get("attack_power", 5); npc_args["defense"] = def_data.get(
-                        "defense", 1); npc_args["aggro_radius"] = def_data.get("aggro_radius", 5)
-                npc_instance = npc_class(**npc_args)
-                if isinstance(npc_instance, HostileNPC): npc_instance.start_ix, npc_instance.start_iy = def_data["ix"], \
-                def_data["iy"]
-                self.entities.add(npc_instance)
+        self.spawn_manager.load_map(self.tilemap.id, loaded_npc_states)
+        self.game.spawn_manager = self.spawn_manager
+        self.camera.update(self.player.rect)
+        self.spawn_manager.update()
 
         self.ui = UI(self.game);
         self.game.ui = self.ui
@@ -374,27 +315,33 @@ class GameplayState(BaseState):
         self.game.context_menu = self.context_menu
         self.inventory = Inventory(self.game, rows=4, cols=5);
         self.game.inventory = self.inventory
-        icon_path = C.ASSETS / "item_icon.png";
-        ico = pygame.Surface((32, 32), pygame.SRCALPHA);
-        ico.fill((255, 215, 0, 200))
-        if icon_path.exists():
-            try:
-                ico_original = self.game._load_image("item_icon.png"); ico = ico_original
-            except:
-                print(f"Could not load item_icon.png in GameplayState on_enter")
+        for slot in loaded_inventory:
+            self.inventory.place_item(slot["row"], slot["col"], slot["item_id"], slot["quantity"])
+        self.game.item_manager.preload_icons()  # wszystkie ikony do atlasu od razu, nie przy pierwszym rysowaniu
         # self.inventory.add_item("MISC001", 1) # Na razie zakomentowane
-        self.game.damage_splats = []
+        self.game.damage_splats.clear()
+        self.autosave.reset()
+        self.world_snapshot = None
+        self._player_was_in_combat = False
 
     def handle_events(self, events: list[pygame.event.Event]):
         mouse_pos_physical = None;
         scaled_mouse_pos_for_logic = None
         for event in events:
             if event.type == pygame.KEYDOWN and event.key == pygame.K_ESCAPE:
-                print("[DEBUG] Escape pressed in GameplayState, switching to PAUSE_MENU")
-                if hasattr(self.game.state_manager, 'previous_active_state_key_for_load_game'):
-                    self.game.state_manager.previous_active_state_key_for_load_game = "GAMEPLAY"
-                self.game.state_manager.set_state("PAUSE_MENU")
+                print("[DEBUG] Escape pressed in GameplayState, pushing PAUSE_MENU")
+                self.game.state_manager.push_state("PAUSE_MENU")
                 return
+            if event.type == pygame.KEYDOWN and event.key == pygame.K_F3:
+                self.game.profiler.toggle()
+                continue
+            if event.type == pygame.KEYDOWN and event.key == pygame.K_F5:
+                self.world_snapshot = self.game.capture_world_snapshot()
+                continue
+            if event.type == pygame.KEYDOWN and event.key == pygame.K_F9:
+                if self.world_snapshot is not None and self.game.restore_world_snapshot(self.world_snapshot):
+                    self._player_was_in_combat = self.player.in_combat
+                continue
 
             if event.type == pygame.MOUSEBUTTONDOWN or event.type == pygame.MOUSEMOTION:
                 mouse_pos_physical = event.pos
@@ -466,6 +413,8 @@ class GameplayState(BaseState):
                     if clicked_entity_for_menu:
                         options = clicked_entity_for_menu.get_context_menu_options(self.player)
                     else:
+                        options.extend(self.ground_items.get_context_menu_options(tx_iso_menu, ty_iso_menu,
+                                                                                  self.player))
                         options.append({"text": "Walk here",
                                         "action": lambda ig: self.player.set_path(tx_iso_menu, ty_iso_menu,
                                                                                   self.tilemap,
@@ -478,15 +427,17 @@ class GameplayState(BaseState):
 
     def update(self, dt: float):
         if not self.player or not self.entities or not self.tilemap or not self.camera: return
+        if self.player.in_combat and not self._player_was_in_combat:
+            self.world_snapshot = self.game.capture_world_snapshot()  # punkt "retry fight"
+        self._player_was_in_combat = self.player.in_combat
+        self.game.timers.advance(dt)  # najpierw zegar gry: odrodzenia, znikanie przedmiotów i splatów
         self.entities.update(dt, self.tilemap, self.entities)
-        active_splats = [];
-        if hasattr(self.game, 'damage_splats') and isinstance(self.game.damage_splats, list):
-            for splat in self.game.damage_splats:
-                if splat.update(dt): active_splats.append(splat)
-            self.game.damage_splats = active_splats
+        _entities_updated.inc(len(self.entities))
 
         if self.player and not self.player.is_alive and self.game.running: print("GAME OVER - Player is dead")
         if self.player: self.camera.update(self.player.rect)
+        self.spawn_manager.update()
+        self.autosave.update(dt)
 
     def draw(self, surface: pygame.Surface):
         if not self.player or not self.tilemap or not self.camera or not self.ui or not self.entities or not hasattr(
@@ -494,60 +445,71 @@ class GameplayState(BaseState):
             surface.fill((10, 0, 0))
             return
 
+        profiler = self.game.profiler if self.game.profiler.enabled else None
+        if profiler: started = time.perf_counter()
         surface.fill((48, 48, 64))
-        self.tilemap.draw(surface, self.camera)
-
+        queue = self.render_queue
+        queue.extend(RQ.LAYER_TERRAIN, self.tilemap.draw_commands(self.camera))
+        queue.extend(RQ.LAYER_TERRAIN, self.ground_items.draw_commands(self.camera))
+        if profiler: terrain_done = time.perf_counter()
+
+        sprites = self.overlay_sprites
+        shadow = sprites.shadow
+        shadow_dx = self.camera.rect.x + C.TILE_WIDTH // 4
+        shadow_dy = self.camera.rect.y + C.TILE_HEIGHT // 2 + C.TILE_HEIGHT // 4
         for entity in self.entities:
             if entity.is_alive:
                 sx, sy = iso_to_screen(entity.ix, entity.iy)
-                sx -= self.camera.rect.x;
-                sy -= self.camera.rect.y + C.TILE_HEIGHT // 2
-                shadow_rect = pygame.Rect(sx - C.TILE_WIDTH // 4, sy - C.TILE_HEIGHT // 4, C.TILE_WIDTH // 2,
-                                          C.TILE_HEIGHT // 2)
-                pygame.draw.ellipse(surface, (0, 0, 0, 100), shadow_rect)
+                queue.add(RQ.LAYER_SHADOWS, shadow, (sx - shadow_dx, sy - shadow_dy))
 
         if self.player.is_alive and self.player.target_tile_coords:
             tx, ty = self.player.target_tile_coords
             screen_x_center, screen_y_center = iso_to_screen(tx, ty)
             screen_x_center -= self.camera.rect.x;
             screen_y_center -= self.camera.rect.y
-            points = [(screen_x_center, screen_y_center - C.TILE_HEIGHT // 2),
-                      (screen_x_center + C.TILE_WIDTH // 2, screen_y_center),
-                      (screen_x_center, screen_y_center + C.TILE_HEIGHT // 2),
-                      (screen_x_center - C.TILE_WIDTH // 2, screen_y_center)]
-            highlight_color = (255, 0, 0, 100)
-            tile_surf_size = (C.TILE_WIDTH, C.TILE_HEIGHT);
-            poly_surface = pygame.Surface(tile_surf_size, pygame.SRCALPHA)
-            local_points = [(tile_surf_size[0] // 2, 0), (tile_surf_size[0], tile_surf_size[1] // 2),
-                            (tile_surf_size[0] // 2, tile_surf_size[1]), (0, tile_surf_size[1] // 2)]
-            pygame.draw.polygon(poly_surface, highlight_color, local_points)
-            surface.blit(poly_surface, (screen_x_center - C.TILE_WIDTH // 2, screen_y_center - C.TILE_HEIGHT // 2))
-
-        for entity in self.entities:
-            if isinstance(entity, HostileNPC) and entity.is_alive and entity.show_hp_bar:
-                if entity.max_hp > 0:
-                    bar_w = C.TILE_WIDTH * 0.6;
-                    bar_h = 6
-                    log_rect = self.camera.apply(entity.rect)
-                    bar_x = log_rect.centerx - bar_w // 2;
-                    bar_y = log_rect.top - bar_h - 4
-                    pygame.draw.rect(surface, (50, 50, 50), (bar_x, bar_y, bar_w, bar_h))
-                    fill_w = int(bar_w * (entity.hp / entity.max_hp))
-                    pygame.draw.rect(surface, (200, 0, 0), (bar_x, bar_y, fill_w, bar_h))
-                    pygame.draw.rect(surface, (180, 180, 180), (bar_x, bar_y, bar_w, bar_h), 1)
+            queue.add(RQ.LAYER_HIGHLIGHTS, sprites.tile_highlight,
+                      (screen_x_center - C.TILE_WIDTH // 2, screen_y_center - C.TILE_HEIGHT // 2))
 
         sorted_entities = sorted(list(self.entities), key=lambda x: (x.rect.centery, x.rect.centerx))
         for entity in sorted_entities:
             if entity.is_alive:
-                surface.blit(entity.image, self.camera.apply(entity.rect))
+                queue.add(RQ.LAYER_ENTITIES, entity.image, self.camera.apply(entity.rect))
             elif hasattr(entity, 'corpse_image') and entity.corpse_image:
-                surface.blit(entity.corpse_image, self.camera.apply(entity.rect))
+                queue.add(RQ.LAYER_ENTITIES, entity.corpse_image, self.camera.apply(entity.rect))
 
-        if hasattr(self.game, 'damage_splats') and isinstance(self.game.damage_splats, list):
-            for splat in self.game.damage_splats:
-                splat.draw(surface)
+        # Paski HP to nakładka - idą po postaciach, więc żaden sprite ich nie zasłoni
+        for entity in self.entities:
+            if isinstance(entity, HostileNPC) and entity.is_alive and entity.show_hp_bar:
+                if entity.max_hp > 0:
+                    log_rect = self.camera.apply(entity.rect)
+                    queue.add(RQ.LAYER_OVERLAYS, sprites.hp_bar(entity.hp, entity.max_hp),
+                              (log_rect.centerx - C.HP_BAR_WIDTH // 2, log_rect.top - C.HP_BAR_HEIGHT - 4))
+
+        queue.extend(RQ.LAYER_OVERLAYS, self.game.damage_splats.draw_commands(self.game.timers.now))
+        if profiler: world_done = time.perf_counter()
+        queue.extend(RQ.LAYER_UI, self.ui.draw_commands())
+        if not profiler:
+            queue.flush(surface)
+            return
 
-        self.ui.draw(surface)
+        ui_done = time.perf_counter()
+        layer_times = profiler.layer_times
+        queue.flush(surface, layer_times)
+        # Czas fazy = zbieranie komend + wysłanie jej warstw
+        profiler.add("tilemap", terrain_done - started + layer_times[RQ.LAYER_TERRAIN])
+        profiler.add("entities", world_done - terrain_done + sum(layer_times[RQ.LAYER_SHADOWS:RQ.LAYER_UI]))
+        profiler.add("ui", ui_done - world_done + layer_times[RQ.LAYER_UI])
+        profiler.set_count("entities", len(self.entities))
+        profiler.set_count("alive", sum(1 for entity in self.entities if entity.is_alive))
+        profiler.set_count("splats", len(self.game.damage_splats))
+        profiler.set_count("blits", queue.blits)
+        profiler.set_count("draw calls", queue.draw_calls)
+        profiler.draw(surface)
+
+    def on_pause(self):
+        super().on_pause()
+        # Świat zostaje w pamięci pod nakładką; chowamy tylko menu kontekstowe
+        if self.context_menu: self.context_menu.hide()
 
     def on_exit(self):
         super().on_exit()
@@ -570,9 +532,9 @@ class GameplayState(BaseState):
 class PauseMenuState(BaseState):
     def __init__(self, game: "Game"):
         super().__init__(game);
-        self.font_title = pygame.font.SysFont("Consolas", 50, bold=True);
-        self.font_options = pygame.font.SysFont("Consolas", 30);
-        self.options = ["Resume Game", "Save to Slot 1", "Save to Slot 2", "Save to Slot 3", "Load Game", "Main Menu"];
+        self.font_title = get_font("Consolas", 50, bold=True);
+        self.font_options = get_font("Consolas", 30);
+        self.options = ["Resume Game", "Save Game", "Load Game", "Main Menu"];
         self.selected_option_index = 0;
         self.buttons: List[Tuple[Optional[pygame.Surface], pygame.Rect, str]] = [];
         self.gameplay_snapshot = None
@@ -609,7 +571,7 @@ class PauseMenuState(BaseState):
         for event in events:
             if event.type == pygame.KEYDOWN:
                 if event.key == pygame.K_ESCAPE:
-                    self.game.state_manager.set_state("GAMEPLAY")
+                    self.game.state_manager.pop_state()
                 elif event.key == pygame.K_UP:
                     self.selected_option_index = (self.selected_option_index - 1 + len(self.options)) % len(
                         self.options)
@@ -630,26 +592,14 @@ class PauseMenuState(BaseState):
         action = self.options[self.selected_option_index];
         print(f"[DEBUG] PauseMenu: selected '{action}'")
         if action == "Resume Game":
-            self.game.state_manager.set_state("GAMEPLAY")
-        elif action == "Save Game (Slot 1)":
-            if self.game.player and self.game.tilemap:
-                self.game.save_game(1)
-            else:
-                print("[ERROR] PauseMenu: Cannot save, player or tilemap not found on game object!")
-        elif action == "Save Game (Slot 2)":
+            self.game.state_manager.pop_state()
+        elif action == "Save Game":
             if self.game.player and self.game.tilemap:
-                self.game.save_game(2)
-            else:
-                print("[ERROR] PauseMenu: Cannot save, player or tilemap not found on game object!")
-        elif action == "Save Game (Slot 3)":
-            if self.game.player and self.game.tilemap:
-                self.game.save_game(3)
+                self.game.state_manager.push_state("LOAD_GAME", {"mode": "save"})
             else:
                 print("[ERROR] PauseMenu: Cannot save, player or tilemap not found on game object!")
         elif action == "Load Game":
-            if hasattr(self.game.state_manager,
-                       'previous_active_state_key_for_load_game'): self.game.state_manager.previous_active_state_key_for_load_game = "PAUSE_MENU"
-            self.game.state_manager.set_state("LOAD_GAME")
+            self.game.state_manager.push_state("LOAD_GAME")
         elif action == "Main Menu":
             self.game.state_manager.set_state("MENU")
 
@@ -661,7 +611,7 @@ class PauseMenuState(BaseState):
             surface.blit(self.gameplay_snapshot, (0, 0))
         else:
             surface.fill((10, 10, 20, 180))
-        ts = self.font_title.render("Game Paused", True, (230, 230, 250));
+        ts = render_text(self.font_title, "Game Paused", True, (230, 230, 250));
         tr = ts.get_rect(center=(C.SCREEN_WIDTH // 2, C.SCREEN_HEIGHT // 4));
         surface.blit(ts, tr)
         for i, (_, rect, opt_text) in enumerate(self.buttons):
@@ -672,23 +622,34 @@ class PauseMenuState(BaseState):
             bt = 3 if is_sel else 2
             pygame.draw.rect(surface, bc, rect, 0, 6);
             pygame.draw.rect(surface, brc, rect, bt, 6);
-            ts = self.font_options.render(opt_text, True, tc);
+            ts = render_text(self.font_options, opt_text, True, tc);
             tr = ts.get_rect(center=rect.center);
             surface.blit(ts, tr)
 
 
 class LoadGameState(BaseState):
+    """Slot list, used for loading and (pushed with {"mode": "save"}) for saving to any slot.
+
+    Slot metadata comes from the slot index (`Game.get_save_slot_info`), so the list stays fast no
+    matter how many slots there are; only `visible_rows` slots are laid out and drawn at a time.
+    """
     def __init__(self, game: "Game"):
         super().__init__(game);
-        self.font_title = pygame.font.SysFont("Consolas", 40, bold=True);
-        self.font_slots = pygame.font.SysFont("Consolas", 26);
+        self.font_title = get_font("Consolas", 40, bold=True);
+        self.font_slots = get_font("Consolas", 26);
+        self.font_small = get_font("Consolas", 16);
         self.save_slots_info: List[Dict[str, Any]] = [];
         self.slot_rects: List[pygame.Rect] = [];
         self.selected_slot_index = 0
+        self.scroll_offset = 0
+        self.save_mode = False
         self.slot_height = 55;
         self.slot_padding = 12;
         self.slot_width = C.SCREEN_WIDTH - 150;
+        self.list_top = C.SCREEN_HEIGHT // 5 + 50
         self.back_button_rect = pygame.Rect(C.SCREEN_WIDTH // 2 - 75, C.SCREEN_HEIGHT - 80, 150, 45)
+        self.visible_rows = max(1, (self.back_button_rect.top - 20 - self.list_top + self.slot_padding)
+                                // (self.slot_height + self.slot_padding))
         self.text_color = (200, 200, 220);
         self.highlight_text_color = (255, 255, 200);
         self.slot_bg_color = (40, 40, 70);
@@ -698,62 +659,88 @@ class LoadGameState(BaseState):
 
     def on_enter(self, previous_state_data=None):
         super().on_enter(previous_state_data);
+        self.save_mode = isinstance(previous_state_data, dict) and previous_state_data.get("mode") == "save"
         self.save_slots_info = self.game.get_save_slot_info();
-        self.slot_rects = []
-        num_slots = len(self.save_slots_info);
-        total_h = num_slots * (self.slot_height + self.slot_padding) - self.slot_padding;
-        start_y = (C.SCREEN_HEIGHT // 2) - (total_h // 2) + 30
-        for i, info in enumerate(self.save_slots_info): rect = pygame.Rect((C.SCREEN_WIDTH - self.slot_width) // 2,
-                                                                           start_y + i * (
-                                                                                       self.slot_height + self.slot_padding),
-                                                                           self.slot_width,
-                                                                           self.slot_height);self.slot_rects.append(
-            rect)
         self.selected_slot_index = 0
+        self.scroll_offset = 0
+        self._layout_slots()
+
+    def _layout_slots(self):
+        """Rects for the visible window of slots; slot_rects[i] belongs to slot index scroll_offset + i."""
+        self.slot_rects = []
+        visible = self.save_slots_info[self.scroll_offset:self.scroll_offset + self.visible_rows]
+        for i in range(len(visible)):
+            self.slot_rects.append(pygame.Rect((C.SCREEN_WIDTH - self.slot_width) // 2,
+                                               self.list_top + i * (self.slot_height + self.slot_padding),
+                                               self.slot_width, self.slot_height))
+
+    def _select(self, index: int):
+        if not self.save_slots_info: return
+        self.selected_slot_index = index % len(self.save_slots_info)
+        if self.selected_slot_index < self.scroll_offset:
+            self.scroll_offset = self.selected_slot_index
+        elif self.selected_slot_index >= self.scroll_offset + self.visible_rows:
+            self.scroll_offset = self.selected_slot_index - self.visible_rows + 1
+        self._layout_slots()
+
+    def _scroll(self, rows: int):
+        max_offset = max(0, len(self.save_slots_info) - self.visible_rows)
+        self.scroll_offset = max(0, min(max_offset, self.scroll_offset + rows))
+        self.selected_slot_index = max(self.scroll_offset,
+                                       min(self.selected_slot_index, self.scroll_offset + self.visible_rows - 1))
+        self._layout_slots()
 
     def handle_events(self, events: list[pygame.event.Event]):
         for e_event in events:
             if e_event.type == pygame.KEYDOWN:
                 if e_event.key == pygame.K_ESCAPE:
                     self._go_back()
-                elif e_event.key == pygame.K_UP and self.slot_rects:
-                    self.selected_slot_index = (self.selected_slot_index - 1 + len(self.slot_rects)) % len(
-                        self.slot_rects)
-                elif e_event.key == pygame.K_DOWN and self.slot_rects:
-                    self.selected_slot_index = (self.selected_slot_index + 1) % len(self.slot_rects)
+                elif e_event.key == pygame.K_UP:
+                    self._select(self.selected_slot_index - 1)
+                elif e_event.key == pygame.K_DOWN:
+                    self._select(self.selected_slot_index + 1)
                 elif e_event.key == pygame.K_RETURN or e_event.key == pygame.K_SPACE:
-                    self._load_selected_slot()
+                    self._activate_selected_slot()
+            elif e_event.type == pygame.MOUSEWHEEL:
+                self._scroll(-e_event.y)
             elif e_event.type == pygame.MOUSEBUTTONDOWN and e_event.button == 1:
                 sm_pos = self.game.get_scaled_mouse_pos(e_event.pos)
                 if self.back_button_rect.collidepoint(sm_pos): self._go_back();return
                 for i, r in enumerate(self.slot_rects):
-                    if r.collidepoint(sm_pos): self.selected_slot_index = i;self._load_selected_slot();return
+                    if r.collidepoint(sm_pos):
+                        self.selected_slot_index = self.scroll_offset + i;self._activate_selected_slot();return
             elif e_event.type == pygame.MOUSEMOTION:
                 sm_pos = self.game.get_scaled_mouse_pos(e_event.pos)
                 for i, r in enumerate(self.slot_rects):
-                    if r.collidepoint(sm_pos): self.selected_slot_index = i;break
+                    if r.collidepoint(sm_pos): self.selected_slot_index = self.scroll_offset + i;break
 
     def _go_back(self):
-        prev_state = "MENU";
-        stored_prev_state = getattr(self.game.state_manager, 'previous_active_state_key_for_load_game', None)
-        if stored_prev_state:
-            prev_state = stored_prev_state
-        print(f"[DEBUG] LoadGameState: Going back to {prev_state}")
-        self.game.state_manager.set_state(prev_state)
+        if len(self.game.state_manager.state_stack) > 1:
+            print("[DEBUG] LoadGameState: Going back to the suspended state")
+            self.game.state_manager.pop_state()
+        else:
+            print("[DEBUG] LoadGameState: Going back to MENU")
+            self.game.state_manager.set_state("MENU")
+
+    def _activate_selected_slot(self):
+        if self.save_mode:
+            self._save_to_selected_slot()
+        else:
+            self._load_selected_slot()
+
+    def _save_to_selected_slot(self):
+        if 0 <= self.selected_slot_index < len(self.save_slots_info):
+            slot = self.save_slots_info[self.selected_slot_index]["slot"]
+            print(f"[DEBUG] LoadGameState: Saving to slot {slot}")
+            self.game.save_game(slot)
+            self._go_back()
 
     def _load_selected_slot(self):
         if 0 <= self.selected_slot_index < len(self.save_slots_info):
             info = self.save_slots_info[self.selected_slot_index]
             if info["exists"]:
                 print(f"[DEBUG] LoadGameState: Attempting to load slot {info['slot']}")
-                save_path = self.game.get_save_file_path(info["slot"]);
-                loaded_data = None
-                if save_path.exists():
-                    try:
-                        with open(save_path, 'r') as f:
-                            loaded_data = json.load(f)
-                    except Exception as e:
-                        print(f"[ERROR] Could not parse slot {info['slot']}: {e}")
+                loaded_data = self.game.load_save_data(info["slot"])
                 if loaded_data and "player_data" in loaded_data:
                     self.game.shared_game_data["current_save_slot"] = info["slot"]
                     self.game.state_manager.set_state("GAMEPLAY", loaded_data)
@@ -767,32 +754,38 @@ class LoadGameState(BaseState):
 
     def draw(self, surface: pygame.Surface):
         surface.fill((35, 30, 45));
-        ts = self.font_title.render("Load Saved Game", True, self.text_color);
+        ts = render_text(self.font_title, "Save Game" if self.save_mode else "Load Saved Game", True, self.text_color);
         tr = ts.get_rect(center=(C.SCREEN_WIDTH // 2, C.SCREEN_HEIGHT // 5));
         surface.blit(ts, tr)
         for i, rect in enumerate(self.slot_rects):
-            info = self.save_slots_info[i];
-            is_sel = (i == self.selected_slot_index);
-            bg_col = self.slot_hl_color if is_sel and info["exists"] else self.slot_bg_color;
-            txt_col = self.highlight_text_color if is_sel and info["exists"] else self.text_color
+            info = self.save_slots_info[self.scroll_offset + i];
+            is_sel = (self.scroll_offset + i == self.selected_slot_index);
+            selectable = info["exists"] or self.save_mode
+            bg_col = self.slot_hl_color if is_sel and selectable else self.slot_bg_color;
+            txt_col = self.highlight_text_color if is_sel and selectable else self.text_color
             if not info["exists"]: txt_col = self.empty_slot_text_color
             pygame.draw.rect(surface, bg_col, rect, 0, 5);
             pygame.draw.rect(surface, self.slot_border_color, rect, 2, 5)
-            slot_txt = f"Slot {info['slot']}: {info['player_name']} (Lvl: {info['level']}) - Map: {info['map_id']}";
-            if not info["exists"]: slot_txt = f"Slot {info['slot']}: ----- EMPTY -----"
-            txt_s = self.font_slots.render(slot_txt, True, txt_col);
+            slot_label = "Autosave" if info['slot'] == C.AUTOSAVE_SLOT else f"Slot {info['slot']}"
+            slot_txt = f"{slot_label}: {info['player_name']} (Lvl: {info['level']}) - Map: {info['map_id']}";
+            if not info["exists"]: slot_txt = f"{slot_label}: ----- EMPTY -----"
+            txt_s = render_text(self.font_slots, slot_txt, True, txt_col);
             txt_r = txt_s.get_rect(midleft=(rect.left + 25, rect.centery));
             surface.blit(txt_s, txt_r)
+            if info.get("saved_at"):
+                time_s = render_text(self.font_small, time.strftime("%Y-%m-%d %H:%M", time.localtime(info["saved_at"])),
+                                                True, self.empty_slot_text_color)
+                surface.blit(time_s, time_s.get_rect(midright=(rect.right - 20, rect.centery)))
+        if self.scroll_offset > 0 or self.scroll_offset + self.visible_rows < len(self.save_slots_info):
+            range_txt = (f"{self.scroll_offset + 1}-{self.scroll_offset + len(self.slot_rects)}"
+                         f" / {len(self.save_slots_info)}")
+            range_s = render_text(self.font_small, range_txt, True, self.empty_slot_text_color)
+            surface.blit(range_s, range_s.get_rect(midright=(C.SCREEN_WIDTH - 75, self.back_button_rect.centery)))
         bb_col = (80, 30, 30);
         bb_bc = (120, 70, 70);
-        sm_pos = self.game.get_scaled_mouse_pos(pygame.mouse.get_pos())
+        sm_pos = self.game.get_logical_mouse_pos()
         if self.back_button_rect.collidepoint(sm_pos): bb_col = (110, 40, 40);bb_bc = (150, 90, 90)
         pygame.draw.rect(surface, bb_col, self.back_button_rect, 0, 5);
         pygame.draw.rect(surface, bb_bc, self.back_button_rect, 2, 5);
-        bt_txt = self.font_slots.render("Back", True, self.text_color);
+        bt_txt = render_text(self.font_slots, "Back", True, self.text_color);
         surface.blit(bt_txt, bt_txt.get_rect(center=self.back_button_rect.center))
-
-    def on_exit(self):
-        super().on_exit()
-        if hasattr(self.game.state_manager, 'previous_active_state_key_for_load_game'):
-            self.game.state_manager.previous_active_state_key_for_load_game = None
\ No newline at end of file
@@ -0,0 +1,204 @@
+# rsc_engine/ground_items.py
+"""Items lying on the ground: per-tile piles in a sparse dict, drawn only inside the camera."""
+from typing import TYPE_CHECKING, Dict, List, Optional, Set, Tuple, Any
+
+import pygame
+
+from rsc_engine import constants as C
+from rsc_engine.timers import Timer
+from rsc_engine.utils import iso_to_screen, screen_to_iso
+
+if TYPE_CHECKING:
+    from rsc_engine.game import Game
+
+Tile = Tuple[int, int]
+
+
+class GroundStack:
+    """One stack in a pile. Stackable items of one kind share a single stack per tile."""
+    __slots__ = ("item_id", "quantity", "expires_at", "timer")
+
+    def __init__(self, item_id: str, quantity: int, expires_at: float):
+        self.item_id = item_id
+        self.quantity = quantity
+        self.expires_at = expires_at
+        self.timer: Optional[Timer] = None
+
+    def __repr__(self):
+        return f"GroundStack({self.item_id!r}, {self.quantity}, expires_at={self.expires_at:.1f})"
+
+
+class GroundItems:
+    """Ground-item layer of the current map.
+
+    Piles live in a sparse dict keyed by tile, so an empty map costs nothing and dropped items never
+    become sprites in `game.entities`. Tiles with piles are also indexed by chunk
+    (`C.SPAWN_REGION_SIZE` tiles square), which lets `draw` visit only the chunks under the camera.
+
+    Despawning runs on the game's timer wheel (`game.timers`): every stack has one timer, which is
+    replaced when another drop merges into the stack, so nothing is ticked per item.
+    """
+
+    def __init__(self, game: "Game", despawn_after: float = C.GROUND_ITEM_DESPAWN,
+                 max_stacks_per_tile: int = C.GROUND_PILE_MAX_STACKS):
+        self.game = game
+        self.despawn_after = despawn_after
+        self.max_stacks_per_tile = max_stacks_per_tile
+        self.chunk_size = C.SPAWN_REGION_SIZE
+
+        self.piles: Dict[Tile, List[GroundStack]] = {}
+        self.chunks: Dict[Tile, Set[Tile]] = {}
+
+    def clear(self):
+        for pile in self.piles.values():
+            for stack in pile:
+                if stack.timer is not None:
+                    self.game.timers.cancel(stack.timer)
+        self.piles = {}
+        self.chunks = {}
+
+    def _chunk_of(self, tile: Tile) -> Tile:
+        return tile[0] // self.chunk_size, tile[1] // self.chunk_size
+
+    def _schedule(self, tile: Tile, stack: GroundStack):
+        if stack.timer is not None:
+            self.game.timers.cancel(stack.timer)
+        stack.timer = self.game.timers.schedule_at(stack.expires_at, self._remove_stack, tile, stack)
+
+    def _remove_stack(self, tile: Tile, stack: GroundStack):
+        pile = self.piles.get(tile)
+        if pile is None or stack not in pile: return
+        if stack.timer is not None:
+            self.game.timers.cancel(stack.timer)
+            stack.timer = None
+        pile.remove(stack)
+        if not pile:
+            del self.piles[tile]
+            chunk = self._chunk_of(tile)
+            tiles = self.chunks[chunk]
+            tiles.discard(tile)
+            if not tiles:
+                del self.chunks[chunk]
+
+    def drop(self, ix: int, iy: int, item_id: str, quantity: int = 1) -> bool:
+        """Put items on tile (ix, iy). Stackables merge into the tile's existing stack."""
+        item_def = self.game.item_manager.get_item_definition(item_id)
+        if item_def is None:
+            print(f"[ERROR] GroundItems: Attempted to drop non-existent item ID '{item_id}'")
+            return False
+        if quantity <= 0: return False
+
+        tile = (ix, iy)
+        expires_at = self.game.timers.now + self.despawn_after
+        pile = self.piles.get(tile)
+        if pile is None:
+            pile = self.piles[tile] = []
+            self.chunks.setdefault(self._chunk_of(tile), set()).add(tile)
+
+        if item_def.stackable:
+            for stack in pile:
+                if stack.item_id == item_id:
+                    # Na ziemi stos nie ma limitu max_stack; limit obowiązuje dopiero w ekwipunku
+                    stack.quantity += quantity
+                    stack.expires_at = expires_at
+                    pile.remove(stack)
+                    pile.append(stack)  # na wierzch stosu
+                    self._schedule(tile, stack)
+                    return True
+            new_stacks = [GroundStack(item_id, quantity, expires_at)]
+        else:
+            new_stacks = [GroundStack(item_id, 1, expires_at) for _ in range(quantity)]
+
+        for stack in new_stacks:
+            pile.append(stack)
+            self._schedule(tile, stack)
+        while len(pile) > self.max_stacks_per_tile:
+            self._remove_stack(tile, pile[0])  # najstarszy stos znika pierwszy
+        return True
+
+    def pile_at(self, ix: int, iy: int) -> List[GroundStack]:
+        """Stacks on tile (ix, iy), bottom to top (empty list if there are none)."""
+        return self.piles.get((ix, iy), [])
+
+    def take(self, ix: int, iy: int, stack: GroundStack) -> bool:
+        """Move `stack` from tile (ix, iy) into the inventory; all or nothing."""
+        if stack not in self.pile_at(ix, iy) or self.game.inventory is None:
+            return False
+        if not self.game.inventory.apply_batch(add=[(stack.item_id, stack.quantity)]):
+            if self.game.ui and hasattr(self.game.ui, 'show_dialogue'):
+                self.game.ui.show_dialogue("System", ["Your inventory is too full."])
+            print(f"[INFO] GroundItems: No room in inventory for {stack.quantity}x {stack.item_id}")
+            return False
+        self._remove_stack((ix, iy), stack)
+        return True
+
+    def get_context_menu_options(self, ix: int, iy: int, player: Any) -> List[Dict[str, Any]]:
+        """"Take ..." entries for the pile on tile (ix, iy), topmost stack first."""
+        options = []
+        item_manager = self.game.item_manager
+        for stack in reversed(self.pile_at(ix, iy)):
+            item_def = item_manager.get_item_definition(stack.item_id)
+            name = item_def.name if item_def else stack.item_id
+            text = f"Take {name}" if stack.quantity == 1 else f"Take {name} ({stack.quantity})"
+            options.append({
+                "text": text,
+                "action": lambda ignored_target, s=stack: self._walk_and_take(ix, iy, s, player),
+                "target": None
+            })
+        return options
+
+    def _walk_and_take(self, ix: int, iy: int, stack: GroundStack, player: Any):
+        if (player.ix, player.iy) == (ix, iy):
+            self.take(ix, iy, stack)
+        else:
+            self.game.player_walk_to_and_act((ix, iy), lambda: self.take(ix, iy, stack))
+
+    def snapshot_state(self) -> Dict[str, Any]:
+        """Copy of the piles for `WorldSnapshot`; despawn times are kept relative to now."""
+        now = self.game.timers.now
+        return {tile: [(s.item_id, s.quantity, s.expires_at - now) for s in pile]
+                for tile, pile in self.piles.items()}
+
+    def restore_state(self, state: Dict[str, Any]):
+        self.clear()
+        now = self.game.timers.now
+        for tile, pile in state.items():
+            stacks = [GroundStack(item_id, quantity, now + remaining) for item_id, quantity, remaining in pile]
+            self.piles[tile] = stacks
+            self.chunks.setdefault(self._chunk_of(tile), set()).add(tile)
+            for stack in stacks:
+                self._schedule(tile, stack)
+
+    def _visible_chunks(self, camera_rect: pygame.Rect) -> List[Tile]:
+        # Ekran to romb w układzie kafelków: bierzemy prostokąt obejmujący jego rogi (z zapasem na ikonę)
+        margin = C.ITEM_ICON_SIZE
+        corners = [screen_to_iso(x, y) for x in (camera_rect.left - margin, camera_rect.right + margin)
+                   for y in (camera_rect.top - margin, camera_rect.bottom + margin)]
+        min_cx, min_cy = self._chunk_of((min(c[0] for c in corners), min(c[1] for c in corners)))
+        max_cx, max_cy = self._chunk_of((max(c[0] for c in corners), max(c[1] for c in corners)))
+        if len(self.chunks) < (max_cx - min_cx + 1) * (max_cy - min_cy + 1):
+            return [chunk for chunk in self.chunks
+                    if min_cx <= chunk[0] <= max_cx and min_cy <= chunk[1] <= max_cy]
+        return [(cx, cy) for cx in range(min_cx, max_cx + 1) for cy in range(min_cy, max_cy + 1)
+                if (cx, cy) in self.chunks]
+
+    def draw_commands(self, camera) -> list:
+        """Blit commands for the top stack of every pile inside the camera, centred where an entity would stand."""
+        commands = []
+        if not self.piles: return commands
+        camera_rect = camera.rect
+        item_manager = self.game.item_manager
+        half = C.ITEM_ICON_SIZE // 2
+        for chunk in self._visible_chunks(camera_rect):
+            for ix, iy in self.chunks[chunk]:
+                sx, sy = iso_to_screen(ix, iy)
+                sx -= camera_rect.x + half
+                sy -= camera_rect.y + half
+                if -C.ITEM_ICON_SIZE < sx < C.SCREEN_WIDTH and -C.ITEM_ICON_SIZE < sy < C.SCREEN_HEIGHT:
+                    icon = item_manager.get_item_icon(self.piles[(ix, iy)][-1].item_id)
+                    if icon is not None:
+                        commands.append((icon, (sx, sy)))
+        return commands
+
+    def draw(self, surface: pygame.Surface, camera):
+        surface.blits(self.draw_commands(camera), doreturn=False)
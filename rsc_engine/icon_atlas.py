@@ -0,0 +1,61 @@
+# rsc_engine/icon_atlas.py
+"""Texture atlas for fixed-size icons."""
+from typing import Dict, List, Optional, Tuple
+
+import pygame
+
+from rsc_engine import constants as C
+
+
+class IconAtlas:
+    """Packs icons into a few large pages of equal square cells and hands out subsurfaces.
+
+    Every icon is scaled once (keeping its aspect ratio) and centred in its cell, so callers blit
+    the returned subsurface at a fixed offset. Pages are created as they fill up.
+    """
+
+    def __init__(self, cell_size: int = C.ITEM_ICON_SIZE, page_cells: int = C.ICON_ATLAS_PAGE_CELLS):
+        self.cell_size = cell_size
+        self.page_cells = page_cells
+        self.pages: List[pygame.Surface] = []
+        self._icons: Dict[str, pygame.Surface] = {}
+        self._next_cell = 0
+
+    def __contains__(self, key: str) -> bool:
+        return key in self._icons
+
+    def get(self, key: str) -> Optional[pygame.Surface]:
+        return self._icons.get(key)
+
+    def alias(self, key: str, existing_key: str) -> pygame.Surface:
+        """Let `key` share the cell of `existing_key` (e.g. every missing icon uses one placeholder)."""
+        self._icons[key] = self._icons[existing_key]
+        return self._icons[key]
+
+    def _allocate_cell(self) -> Tuple[pygame.Surface, pygame.Rect]:
+        cells_per_page = self.page_cells * self.page_cells
+        page_index, cell = divmod(self._next_cell, cells_per_page)
+        if page_index == len(self.pages):
+            side = self.page_cells * self.cell_size
+            page = pygame.Surface((side, side), pygame.SRCALPHA)
+            if pygame.display.get_surface() is not None:
+                page = page.convert_alpha()
+            page.fill((0, 0, 0, 0))
+            self.pages.append(page)
+        self._next_cell += 1
+        row, col = divmod(cell, self.page_cells)
+        return self.pages[page_index], pygame.Rect(col * self.cell_size, row * self.cell_size,
+                                                   self.cell_size, self.cell_size)
+
+    def add(self, key: str, image: pygame.Surface) -> pygame.Surface:
+        """Scale `image` into a new cell and return the cell as a subsurface of its page."""
+        page, cell_rect = self._allocate_cell()
+        width, height = image.get_size()
+        scale = min(self.cell_size / width, self.cell_size / height) if width and height else 1
+        scaled_size = (max(1, round(width * scale)), max(1, round(height * scale)))
+        if scaled_size != (width, height):
+            image = pygame.transform.smoothscale(image, scaled_size)
+        page.blit(image, image.get_rect(center=cell_rect.center))
+        icon = page.subsurface(cell_rect)
+        self._icons[key] = icon
+        return icon
@@ -1,42 +1,42 @@
 # rsc_engine/inventory.py
+import heapq
 import pygame
-from typing import TYPE_CHECKING, List, Optional, Dict, Any
+from dataclasses import dataclass, field
+from typing import TYPE_CHECKING, Callable, Iterable, List, Mapping, Optional, Dict, Any, Set, Tuple
+
+from rsc_engine.items_manager import ItemDefinition
 
 if TYPE_CHECKING:
     from rsc_engine.game import Game  # Dla dostępu do item_manager
 
 
 class Item:
+    __slots__ = ("game", "item_id", "definition", "quantity")
+
     def __init__(self, game: "Game", item_id: str, quantity: int = 1):
         self.game = game  # Referencja do głównego obiektu gry
         self.item_id = item_id
 
-        # Pobierz definicję, aby sprawdzić, czy przedmiot istnieje i jest stackowalny
+        # Skompilowana definicja; właściwości przedmiotu czytają ją bezpośrednio
         definition = self.game.item_manager.get_item_definition(self.item_id)
         if not definition:
             raise ValueError(f"Item with ID '{item_id}' not found in definitions.")
+        self.definition: ItemDefinition = definition
 
-        self._stackable = definition.get("stackable", False)
-        self._max_stack = definition.get("max_stack", 1) if self._stackable else 1
-
-        if not self._stackable and quantity > 1:
+        if not definition.stackable and quantity > 1:
             print(
                 f"[WARNING] Item '{self.item_id}' is not stackable but quantity {quantity} was provided. Setting quantity to 1.")
             self.quantity = 1
-        elif quantity > self._max_stack:
+        elif quantity > definition.max_stack:
             print(
-                f"[WARNING] Quantity {quantity} for item '{self.item_id}' exceeds max stack {self._max_stack}. Setting to max stack.")
-            self.quantity = self._max_stack
+                f"[WARNING] Quantity {quantity} for item '{self.item_id}' exceeds max stack {definition.max_stack}. Setting to max stack.")
+            self.quantity = definition.max_stack
         else:
             self.quantity = quantity
 
-    @property
-    def definition(self) -> Optional[Dict[str, Any]]:
-        return self.game.item_manager.get_item_definition(self.item_id)
-
     @property
     def name(self) -> str:
-        return self.definition.get("name", "Unknown Item") if self.definition else "Unknown Item"
+        return self.definition.name
 
     @property
     def icon(self) -> Optional[pygame.Surface]:
@@ -45,37 +45,142 @@ class Item:
 
     @property
     def stackable(self) -> bool:
-        return self._stackable
+        return self.definition.stackable
 
     @property
     def max_stack(self) -> int:
-        return self._max_stack
+        return self.definition.max_stack
 
     @property
     def description(self) -> str:
-        return self.definition.get("description", "") if self.definition else ""
+        return self.definition.description
 
     @property
     def type(self) -> str:
-        return self.definition.get("type", "misc") if self.definition else "misc"
+        return self.definition.type
 
     @property
-    def allowed_actions(self) -> List[str]:
-        return self.definition.get("allowed_actions", ["examine", "drop"]) if self.definition else ["examine", "drop"]
+    def allowed_actions(self) -> Tuple[str, ...]:
+        return self.definition.allowed_actions
 
-    def get_effects(self) -> Optional[dict]:
-        return self.definition.get("effects") if self.definition else None
+    def get_effects(self) -> Optional[Mapping[str, Any]]:
+        return self.definition.effects
 
     def __repr__(self):
         return f"Item(id='{self.item_id}', name='{self.name}', quantity={self.quantity})"
 
 
+@dataclass
+class _BatchPlan:
+    """Slot-level changes computed (and validated) before anything in the inventory is touched."""
+    takes: List[Tuple[int, int]] = field(default_factory=list)  # (slot index, quantity removed)
+    fills: List[Tuple[int, int]] = field(default_factory=list)  # (slot index, quantity added to the stack)
+    new_stacks: List[Tuple[str, int]] = field(default_factory=list)  # (item_id, quantity) for free slots
+
+
+def _merge_quantities(items: Iterable[Tuple[str, int]]) -> Dict[str, int]:
+    merged: Dict[str, int] = {}
+    for item_id, quantity in items:
+        if quantity > 0:
+            merged[item_id] = merged.get(item_id, 0) + quantity
+    return merged
+
+
 class Inventory:
+    """Grid of item slots.
+
+    Besides the `slots` grid it keeps an `item_id -> slot indices` index and a min-heap of free slot
+    indices (slot index = row * cols + col), so adding, removing and counting touch only the stacks
+    involved instead of scanning the whole grid. Every change to `slots` must go through
+    `_set_slot` / `_clear_slot` to keep them in sync.
+    """
+
     def __init__(self, game: "Game", rows: int = 4, cols: int = 5):  # Dodaj 'game'
         self.game = game  # Potrzebne do tworzenia instancji Item
         self.rows = rows
         self.cols = cols
         self.slots: List[List[Optional[Item]]] = [[None for _ in range(cols)] for _ in range(rows)]
+        self._stacks: Dict[str, Set[int]] = {}
+        self._open_stacks: Dict[str, Set[int]] = {}  # stosy stackowalnych przedmiotów, które mają jeszcze miejsce
+        self._free_heap: List[int] = list(range(rows * cols))  # posortowana lista jest poprawnym kopcem
+        self._in_free_heap: Set[int] = set(self._free_heap)
+        self.free_slot_count = rows * cols
+
+        # Powiadomienia o zmianach: version rośnie przy każdej zmianie, listenery dostają jedno wywołanie na operację
+        self.version = 0
+        self.listeners: List[Callable[["Inventory"], None]] = []
+
+    def add_listener(self, listener: Callable[["Inventory"], None]):
+        self.listeners.append(listener)
+
+    def _notify(self):
+        self.version += 1
+        for listener in self.listeners:
+            listener(self)
+
+    # --- Indeksy ---
+
+    def _set_slot(self, index: int, item: Item):
+        r, c = divmod(index, self.cols)
+        if self.slots[r][c] is not None:
+            self._clear_slot(index)
+        self.slots[r][c] = item
+        self._stacks.setdefault(item.item_id, set()).add(index)
+        self._update_open_stack(index, item)
+        self.free_slot_count -= 1
+        # Wpis w kopcu wolnych slotów (jeśli jest) staje się nieaktualny i zostanie pominięty przy pobraniu
+
+    def _clear_slot(self, index: int) -> Optional[Item]:
+        r, c = divmod(index, self.cols)
+        item = self.slots[r][c]
+        if item is None:
+            return None
+        self.slots[r][c] = None
+        stack_slots = self._stacks[item.item_id]
+        stack_slots.discard(index)
+        if not stack_slots:
+            del self._stacks[item.item_id]
+        open_slots = self._open_stacks.get(item.item_id)
+        if open_slots is not None:
+            open_slots.discard(index)
+            if not open_slots:
+                del self._open_stacks[item.item_id]
+        self.free_slot_count += 1
+        if index not in self._in_free_heap:
+            heapq.heappush(self._free_heap, index)
+            self._in_free_heap.add(index)
+        return item
+
+    def _update_open_stack(self, index: int, item: Item):
+        """Call after changing the quantity of the stack in slot `index`."""
+        if item.stackable and item.quantity < item.max_stack:
+            self._open_stacks.setdefault(item.item_id, set()).add(index)
+        else:
+            open_slots = self._open_stacks.get(item.item_id)
+            if open_slots is not None:
+                open_slots.discard(index)
+                if not open_slots:
+                    del self._open_stacks[item.item_id]
+
+    def _pop_free_slot(self) -> Optional[int]:
+        """Lowest free slot index (the same slot a row-major scan would find), or None if full."""
+        while self._free_heap:
+            index = heapq.heappop(self._free_heap)
+            self._in_free_heap.discard(index)
+            r, c = divmod(index, self.cols)
+            if self.slots[r][c] is None:
+                return index
+        return None
+
+    def stack_slots(self, item_id: str) -> List[int]:
+        """Slot indices holding `item_id`, in row-major order."""
+        return sorted(self._stacks.get(item_id, ()))
+
+    def count(self, item_id: str) -> int:
+        """Total quantity of `item_id` across all its stacks."""
+        return sum(self.slots[i // self.cols][i % self.cols].quantity for i in self._stacks.get(item_id, ()))
+
+    # --- Operacje ---
 
     def add_item(self, item_id: str, quantity: int = 1) -> bool:
         if not self.game.item_manager.item_exists(item_id):
@@ -83,43 +188,36 @@ class Inventory:
             return False
 
         item_def = self.game.item_manager.get_item_definition(item_id)
-        is_stackable = item_def.get("stackable", False)
-        max_stack_size = item_def.get("max_stack", 1) if is_stackable else 1
+        is_stackable = item_def.stackable
+        max_stack_size = item_def.max_stack
+
+        added = self._add_item(item_id, quantity, is_stackable, max_stack_size)
+        self._notify()  # także po częściowym dodaniu
+        return added
 
+    def _add_item(self, item_id: str, quantity: int, is_stackable: bool, max_stack_size: int) -> bool:
         # 1. Spróbuj dodać do istniejącego stosu, jeśli stackowalny
         if is_stackable:
-            for r in range(self.rows):
-                for c in range(self.cols):
-                    slot_item = self.slots[r][c]
-                    if slot_item and slot_item.item_id == item_id and slot_item.quantity < slot_item.max_stack:
-                        can_add_to_stack = slot_item.max_stack - slot_item.quantity
-                        add_amount = min(quantity, can_add_to_stack)
-                        slot_item.quantity += add_amount
-                        quantity -= add_amount
-                        print(
-                            f"[INFO] Added {add_amount} of '{item_id}' to existing stack. Remaining to add: {quantity}")
-                        if quantity == 0:
-                            return True
-
-        # 2. Jeśli pozostała ilość lub przedmiot nie jest stackowalny, znajdź wolny slot
-        # (lub nowy slot dla reszty stackowalnego przedmiotu)
-        while quantity > 0:  # Pętla na wypadek, gdyby ilość przekraczała max_stack dla nowego slotu
-            found_slot_for_new_item = False
-            for r in range(self.rows):
-                for c in range(self.cols):
-                    if self.slots[r][c] is None:
-                        add_this_time = min(quantity, max_stack_size)
-                        self.slots[r][c] = Item(self.game, item_id, add_this_time)
-                        print(f"[INFO] Placed {add_this_time} of '{item_id}' in new slot ({r},{c}).")
-                        quantity -= add_this_time
-                        found_slot_for_new_item = True
-                        if quantity == 0:
-                            return True  # Wszystko dodane
-            if not found_slot_for_new_item and quantity > 0:  # Brak miejsca na resztę
+            for index in sorted(self._open_stacks.get(item_id, ())):
+                slot_item = self.slots[index // self.cols][index % self.cols]
+                add_amount = min(quantity, slot_item.max_stack - slot_item.quantity)
+                slot_item.quantity += add_amount
+                quantity -= add_amount
+                self._update_open_stack(index, slot_item)
+                if quantity == 0:
+                    return True
+
+        # 2. Reszta (lub przedmiot niestackowalny) trafia do kolejnych wolnych slotów
+        while quantity > 0:
+            index = self._pop_free_slot()
+            if index is None:  # Brak miejsca na resztę
                 print(f"[WARNING] Inventory full. Could not add remaining {quantity} of '{item_id}'.")
                 return False  # Nie udało się dodać wszystkiego
+            add_this_time = min(quantity, max_stack_size)
+            self._set_slot(index, Item(self.game, item_id, add_this_time))
+            quantity -= add_this_time
 
-        return True  # Powinno być osiągnięte, jeśli quantity == 0 na początku
+        return True
 
     def remove_item_from_slot(self, row: int, col: int, quantity: int = 1) -> Optional[Item]:
         """Usuwa określoną ilość przedmiotu ze slotu lub cały przedmiot/stos."""
@@ -127,14 +225,13 @@ class Inventory:
             slot_item = self.slots[row][col]
             if slot_item:
                 if not slot_item.stackable or quantity >= slot_item.quantity:
-                    removed_item = slot_item  # Zwróć cały obiekt przedmiotu
-                    self.slots[row][col] = None
-                    print(f"[INFO] Removed item '{removed_item.name}' (all) from slot ({row},{col}).")
+                    removed_item = self._clear_slot(row * self.cols + col)  # Zwróć cały obiekt przedmiotu
+                    self._notify()
                     return removed_item
                 else:  # Stackowalny, usuń część
                     slot_item.quantity -= quantity
-                    print(
-                        f"[INFO] Removed {quantity} of '{slot_item.name}' from slot ({row},{col}). Remaining: {slot_item.quantity}")
+                    self._update_open_stack(row * self.cols + col, slot_item)
+                    self._notify()
                     # Zwróć nowy obiekt Item z usuniętą ilością, jeśli potrzebne do np. upuszczenia
                     return Item(self.game, slot_item.item_id, quantity)
         return None
@@ -142,4 +239,136 @@ class Inventory:
     def get_item(self, row: int, col: int) -> Optional[Item]:
         if 0 <= row < self.rows and 0 <= col < self.cols:
             return self.slots[row][col]
-        return None
\ No newline at end of file
+        return None
+
+    def place_item(self, row: int, col: int, item_id: str, quantity: int = 1) -> bool:
+        """Put an item directly into an empty slot (used when restoring a save)."""
+        if not (0 <= row < self.rows and 0 <= col < self.cols) or self.slots[row][col] is not None:
+            return False
+        if not self.game.item_manager.item_exists(item_id):
+            print(f"[ERROR] Inventory: Attempted to place non-existent item ID '{item_id}'")
+            return False
+        self._set_slot(row * self.cols + col, Item(self.game, item_id, quantity))
+        self._notify()
+        return True
+
+    # --- Operacje wsadowe ---
+
+    def _plan_batch(self, add: Dict[str, int], remove: Dict[str, int]) -> Tuple[Optional[_BatchPlan], str]:
+        """Validate a batch and work out every slot it touches. Returns (plan, "") or (None, reason)."""
+        plan = _BatchPlan()
+        planned_qty: Dict[int, int] = {}  # ilości stosów po zaplanowanych zmianach
+        emptied = 0
+
+        for item_id, quantity in remove.items():
+            if self.count(item_id) < quantity:
+                return None, f"not enough '{item_id}' ({self.count(item_id)} < {quantity})"
+            # Zabieramy od ostatnich stosów, żeby nie robić dziur na początku plecaka
+            for index in sorted(self._stacks[item_id], reverse=True):
+                stack_qty = self.slots[index // self.cols][index % self.cols].quantity
+                take = min(quantity, stack_qty)
+                plan.takes.append((index, take))
+                planned_qty[index] = stack_qty - take
+                if take == stack_qty:
+                    emptied += 1
+                quantity -= take
+                if quantity == 0:
+                    break
+
+        new_slots_needed = 0
+        for item_id, quantity in add.items():
+            if not self.game.item_manager.item_exists(item_id):
+                return None, f"unknown item ID '{item_id}'"
+            max_stack = self.game.item_manager.get_item_definition(item_id).max_stack
+            if max_stack > 1:
+                candidates = set(self._open_stacks.get(item_id, ()))
+                candidates.update(i for i in self._stacks.get(item_id, ()) if i in planned_qty)
+                for index in sorted(candidates):
+                    stack_qty = planned_qty.get(index, self.slots[index // self.cols][index % self.cols].quantity)
+                    if stack_qty == 0 or stack_qty >= max_stack:
+                        continue  # opróżniony w tej partii albo pełny
+                    fill = min(quantity, max_stack - stack_qty)
+                    plan.fills.append((index, fill))
+                    planned_qty[index] = stack_qty + fill
+                    quantity -= fill
+                    if quantity == 0:
+                        break
+            while quantity > 0:
+                stack = min(quantity, max_stack)
+                plan.new_stacks.append((item_id, stack))
+                quantity -= stack
+                new_slots_needed += 1
+
+        if new_slots_needed > self.free_slot_count + emptied:
+            return None, f"needs {new_slots_needed} free slot(s), only {self.free_slot_count + emptied} available"
+        return plan, ""
+
+    def _commit_batch(self, plan: _BatchPlan):
+        for index, take in plan.takes:
+            item = self.slots[index // self.cols][index % self.cols]
+            if take >= item.quantity:
+                self._clear_slot(index)
+            else:
+                item.quantity -= take
+                self._update_open_stack(index, item)
+        for index, fill in plan.fills:
+            item = self.slots[index // self.cols][index % self.cols]
+            item.quantity += fill
+            self._update_open_stack(index, item)
+        for item_id, quantity in plan.new_stacks:
+            self._set_slot(self._pop_free_slot(), Item(self.game, item_id, quantity))
+
+    def apply_batch(self, add: Iterable[Tuple[str, int]] = (), remove: Iterable[Tuple[str, int]] = ()) -> bool:
+        """Add and remove many items as one transaction.
+
+        `add` and `remove` are (item_id, quantity) pairs; removals are applied first, so slots they
+        free can take the added items. The whole batch is validated (item IDs, quantities to remove,
+        free space) before anything changes: either all of it is applied and listeners are notified
+        once, or nothing is and False is returned.
+        """
+        plan, reason = self._plan_batch(_merge_quantities(add), _merge_quantities(remove))
+        if plan is None:
+            print(f"[WARNING] Inventory: Batch rejected, {reason}.")
+            return False
+        self._commit_batch(plan)
+        self._notify()
+        return True
+
+    def stacks(self) -> List[Tuple[str, int]]:
+        """(item_id, quantity) of every stack, in slot order."""
+        return [(item.item_id, item.quantity) for row in self.slots for item in row if item]
+
+    def transfer_to(self, target: "Inventory", items: Optional[Iterable[Tuple[str, int]]] = None) -> bool:
+        """Move items (default: everything) into another inventory, all or nothing."""
+        items = _merge_quantities(self.stacks() if items is None else items)
+        remove_plan, reason = self._plan_batch({}, items)
+        if remove_plan is not None:
+            add_plan, reason = target._plan_batch(items, {})
+        if remove_plan is None or add_plan is None:
+            print(f"[WARNING] Inventory: Transfer rejected, {reason}.")
+            return False
+        self._commit_batch(remove_plan)
+        target._commit_batch(add_plan)
+        self._notify()
+        target._notify()
+        return True
+
+    def get_save_data(self) -> List[Dict[str, Any]]:
+        return [{"row": r, "col": c, "item_id": item.item_id, "quantity": item.quantity}
+                for r, row in enumerate(self.slots)
+                for c, item in enumerate(row) if item]
+
+    def snapshot_slots(self) -> List[List[Optional[tuple]]]:
+        """(item, quantity) per slot, for an in-memory world snapshot; items are kept, not copied."""
+        return [[(item, item.quantity) if item else None for item in row] for row in self.slots]
+
+    def restore_slots(self, snapshot: List[List[Optional[tuple]]]):
+        for index in range(self.rows * self.cols):
+            self._clear_slot(index)
+        for r, row in enumerate(snapshot):
+            for c, entry in enumerate(row):
+                if entry:
+                    item, quantity = entry
+                    item.quantity = quantity
+                    self._set_slot(r * self.cols + c, item)
+        self._notify()
@@ -1,61 +1,140 @@
 # rsc_engine/item_manager.py
 import pygame
-import json
+from dataclasses import dataclass
 from pathlib import Path
-from typing import Dict, Optional, Any
+from types import MappingProxyType
+from typing import Dict, Optional, Any, List, Mapping, Tuple
 
 # Załóżmy, że stałe C są dostępne (lub przekaż ścieżkę do assets inaczej)
 from rsc_engine import constants as C
+from rsc_engine.data_cache import DataError, load_data
+from rsc_engine.icon_atlas import IconAtlas
+
+
+_PLACEHOLDER_KEY = "__placeholder__"
+DEFAULT_ALLOWED_ACTIONS = ("examine", "drop")
+_KNOWN_FIELDS = {"name", "description", "icon_file", "stackable", "max_stack", "type", "slot", "effects",
+                 "allowed_actions"}
+
+
+@dataclass(frozen=True)
+class ItemDefinition:
+    """One compiled entry of items.json. Immutable and shared by every Item of that ID."""
+    __slots__ = ("item_id", "name", "description", "icon_file", "stackable", "max_stack", "type", "slot",
+                 "effects", "allowed_actions")
+    item_id: str
+    name: str
+    description: str
+    icon_file: Optional[str]
+    stackable: bool
+    max_stack: int  # 1 dla przedmiotów niestackowalnych
+    type: str
+    slot: Optional[str]
+    effects: Optional[Mapping[str, Any]]
+    allowed_actions: Tuple[str, ...]
+
+    @classmethod
+    def compile(cls, item_id: str, raw: Any) -> Tuple[Optional["ItemDefinition"], List[str]]:
+        """Validate a raw JSON entry. Returns (definition, []) or (None, list of problems)."""
+        if not isinstance(raw, dict):
+            return None, [f"definition must be an object, got {type(raw).__name__}"]
+        errors = []
+        name = raw.get("name")
+        if not isinstance(name, str) or not name:
+            errors.append("'name' must be a non-empty string")
+        stackable = raw.get("stackable", False)
+        if not isinstance(stackable, bool):
+            errors.append("'stackable' must be true or false")
+        max_stack = raw.get("max_stack", 1)
+        if not isinstance(max_stack, int) or isinstance(max_stack, bool) or (stackable is True and max_stack < 1):
+            errors.append("'max_stack' must be a positive integer for stackable items")
+        for key in ("description", "icon_file", "type", "slot"):
+            if key in raw and not isinstance(raw[key], str):
+                errors.append(f"'{key}' must be a string")
+        effects = raw.get("effects")
+        if effects is not None and not isinstance(effects, dict):
+            errors.append("'effects' must be an object")
+        actions = raw.get("allowed_actions", list(DEFAULT_ALLOWED_ACTIONS))
+        if not isinstance(actions, list) or not all(isinstance(a, str) for a in actions):
+            errors.append("'allowed_actions' must be a list of strings")
+        if errors:
+            return None, errors
+
+        unknown = set(raw) - _KNOWN_FIELDS
+        if unknown:
+            print(f"[WARNING] ItemManager: Item '{item_id}' has unknown field(s) {sorted(unknown)}, ignored")
+        return cls(item_id=item_id, name=name, description=raw.get("description", ""),
+                   icon_file=raw.get("icon_file"), stackable=stackable,
+                   max_stack=max_stack if stackable else 1, type=raw.get("type", "misc"), slot=raw.get("slot"),
+                   effects=MappingProxyType(dict(effects)) if effects is not None else None,
+                   allowed_actions=tuple(actions)), []
 
 
 class ItemManager:
     def __init__(self):
-        self.item_definitions: Dict[str, Dict[str, Any]] = {}
-        self.item_icons: Dict[str, pygame.Surface] = {}
+        self.item_definitions: Dict[str, ItemDefinition] = {}
+        self.icon_atlas = IconAtlas(C.ITEM_ICON_SIZE)
         # Ścieżka do katalogu z ikonami przedmiotów
         self.icons_base_path = C.ASSETS / "items"  # Zakładamy, że ikony są w rsc_engine/assets/items/
         self._load_item_definitions()
 
     def _load_item_definitions(self):
         # Ścieżka do pliku JSON z definicjami przedmiotów
-        definitions_path = C.ASSETS / "data" / "items.json"  # Użyj C.ASSETS z constants.py
+        definitions_path = C.DATA / "items.json"  # rsc_engine/data/items.json
         try:
-            with open(definitions_path, 'r') as f:
-                self.item_definitions = json.load(f)
-            print(f"[INFO] ItemManager: Loaded {len(self.item_definitions)} item definitions from {definitions_path}")
+            raw_definitions = load_data(definitions_path)  # z pamięci podręcznej danych, jeśli plik się nie zmienił
         except FileNotFoundError:
             print(f"[ERROR] ItemManager: Item definitions file not found at {definitions_path}")
-        except json.JSONDecodeError:
+            return
+        except DataError:
             print(f"[ERROR] ItemManager: Error decoding JSON from {definitions_path}")
+            return
+        if not isinstance(raw_definitions, dict):
+            print(f"[ERROR] ItemManager: {definitions_path} must map item IDs to definitions")
+            return
+
+        for item_id, raw in raw_definitions.items():
+            definition, errors = ItemDefinition.compile(item_id, raw)
+            if definition is None:
+                # Błędne definicje odrzucamy już przy starcie, a nie przy pierwszym użyciu przedmiotu
+                print(f"[ERROR] ItemManager: Invalid definition of item '{item_id}': {'; '.join(errors)}")
+                continue
+            self.item_definitions[item_id] = definition
+        print(f"[INFO] ItemManager: Loaded {len(self.item_definitions)} item definitions from {definitions_path}")
 
-    def get_item_definition(self, item_id: str) -> Optional[Dict[str, Any]]:
+    def get_item_definition(self, item_id: str) -> Optional[ItemDefinition]:
         return self.item_definitions.get(item_id)
 
     def get_item_icon(self, item_id: str) -> Optional[pygame.Surface]:
-        if item_id in self.item_icons:
-            return self.item_icons[item_id]
+        """Icon of the item as a subsurface of the icon atlas, already scaled to `C.ITEM_ICON_SIZE`.
+
+        Icons are packed lazily on first use (or all at once by `preload_icons`); a missing icon
+        shares one placeholder cell.
+        """
+        icon = self.icon_atlas.get(item_id)
+        if icon is not None:
+            return icon
 
         definition = self.get_item_definition(item_id)
-        if definition and "icon_file" in definition:
-            icon_filename = definition["icon_file"]
-            icon_path = self.icons_base_path / icon_filename
+        if definition and definition.icon_file:
+            icon_path = self.icons_base_path / definition.icon_file
             try:
-                icon_surface = pygame.image.load(str(icon_path)).convert_alpha()
-                # Można dodać skalowanie ikon, jeśli potrzebne
-                # icon_surface = pygame.transform.smoothscale(icon_surface, (DESIRED_ICON_WIDTH, DESIRED_ICON_HEIGHT))
-                self.item_icons[item_id] = icon_surface
-                return icon_surface
-            except pygame.error as e:
-                print(f"[ERROR] ItemManager: Could not load icon '{icon_filename}' for item '{item_id}': {e}")
-
-        # Zwróć placeholder, jeśli ikona nie została znaleziona lub nie ma definicji
-        placeholder_size = (32, 32)  # Domyślny rozmiar
-        if "DESIRED_ICON_WIDTH" in globals(): placeholder_size = (DESIRED_ICON_WIDTH, DESIRED_ICON_HEIGHT)
-        placeholder = pygame.Surface(placeholder_size, pygame.SRCALPHA)
-        placeholder.fill((128, 128, 128, 100))  # Szary placeholder
-        pygame.draw.rect(placeholder, (200, 200, 200), placeholder.get_rect(), 1)
-        self.item_icons[item_id] = placeholder  # Cache placeholder, aby nie tworzyć go za każdym razem
-        return placeholder
+                return self.icon_atlas.add(item_id, pygame.image.load(str(icon_path)).convert_alpha())
+            except (pygame.error, FileNotFoundError) as e:
+                print(f"[ERROR] ItemManager: Could not load icon '{definition.icon_file}' for item '{item_id}': {e}")
+
+        if _PLACEHOLDER_KEY not in self.icon_atlas:
+            size = self.icon_atlas.cell_size
+            placeholder = pygame.Surface((size, size), pygame.SRCALPHA)
+            placeholder.fill((128, 128, 128, 100))  # Szary placeholder
+            pygame.draw.rect(placeholder, (200, 200, 200), placeholder.get_rect(), 1)
+            self.icon_atlas.add(_PLACEHOLDER_KEY, placeholder)
+        return self.icon_atlas.alias(item_id, _PLACEHOLDER_KEY)
+
+    def preload_icons(self):
+        """Pack the icon of every defined item into the atlas ahead of time."""
+        for item_id in self.item_definitions:
+            self.get_item_icon(item_id)
 
     def item_exists(self, item_id: str) -> bool:
         return item_id in self.item_definitions
\ No newline at end of file
@@ -0,0 +1,144 @@
+# rsc_engine/metrics.py
+"""Process-wide performance counters, gauges and histograms, with an optional JSON Lines export.
+
+Hot paths fetch their metric once, at import time, and then only bump it:
+
+    _paths_computed = metrics.counter("paths_computed")
+    ...
+    _paths_computed.inc()
+
+Counters and histograms hold what happened since the previous `snapshot`, so each exported
+record covers one interval (one second by default) and records of different builds or of
+different parts of a long session can be compared directly. Gauges hold a current value.
+
+`MetricsWriter` appends one record per interval to a `.jsonl` file; `Game.run` drives it when
+started with a metrics path (`python run_game.py --metrics metrics.jsonl`).
+"""
+import bisect
+import json
+import time
+from pathlib import Path
+from typing import Any, Dict, Optional, Sequence
+
+from rsc_engine import constants as C
+
+
+class Counter:
+    __slots__ = ("value",)
+
+    def __init__(self):
+        self.value = 0
+
+    def inc(self, n: int = 1):
+        self.value += n
+
+
+class Gauge:
+    __slots__ = ("value",)
+
+    def __init__(self):
+        self.value = 0
+
+    def set(self, value: float):
+        self.value = value
+
+
+class Histogram:
+    """Counts of observed values per bucket; bucket i holds values <= bounds[i], the last one the rest."""
+    __slots__ = ("bounds", "counts", "count", "total", "min", "max")
+
+    def __init__(self, bounds: Sequence[float]):
+        self.bounds = tuple(sorted(bounds))
+        self.reset()
+
+    def reset(self):
+        self.counts = [0] * (len(self.bounds) + 1)
+        self.count = 0
+        self.total = 0.0
+        self.min: Optional[float] = None
+        self.max: Optional[float] = None
+
+    def observe(self, value: float):
+        self.counts[bisect.bisect_left(self.bounds, value)] += 1
+        self.count += 1
+        self.total += value
+        if self.min is None or value < self.min: self.min = value
+        if self.max is None or value > self.max: self.max = value
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {"count": self.count, "sum": round(self.total, 6), "min": self.min, "max": self.max,
+                "bounds": list(self.bounds), "counts": list(self.counts)}
+
+
+class MetricsRegistry:
+    def __init__(self):
+        self.counters: Dict[str, Counter] = {}
+        self.gauges: Dict[str, Gauge] = {}
+        self.histograms: Dict[str, Histogram] = {}
+
+    def counter(self, name: str) -> Counter:
+        counter = self.counters.get(name)
+        if counter is None:
+            counter = self.counters[name] = Counter()
+        return counter
+
+    def gauge(self, name: str) -> Gauge:
+        gauge = self.gauges.get(name)
+        if gauge is None:
+            gauge = self.gauges[name] = Gauge()
+        return gauge
+
+    def histogram(self, name: str, bounds: Sequence[float] = C.METRICS_DEFAULT_BOUNDS) -> Histogram:
+        histogram = self.histograms.get(name)
+        if histogram is None:
+            histogram = self.histograms[name] = Histogram(bounds)
+        return histogram
+
+    def snapshot(self, reset: bool = True) -> Dict[str, Any]:
+        """Current values as plain data; with `reset` counters and histograms start a new interval."""
+        record = {"counters": {name: c.value for name, c in sorted(self.counters.items())},
+                  "gauges": {name: g.value for name, g in sorted(self.gauges.items())},
+                  "histograms": {name: h.to_dict() for name, h in sorted(self.histograms.items())}}
+        if reset:
+            for counter in self.counters.values():
+                counter.value = 0
+            for histogram in self.histograms.values():
+                histogram.reset()
+        return record
+
+
+metrics = MetricsRegistry()
+
+
+class MetricsWriter:
+    """Appends one JSON record of `registry` per `interval` seconds of wall time to `path`."""
+
+    def __init__(self, path: Path, interval: float = C.METRICS_INTERVAL, registry: MetricsRegistry = metrics):
+        self.path = Path(path)
+        self.interval = interval
+        self.registry = registry
+        self.records = 0
+        self.started = self._last_flush = time.perf_counter()
+        registry.snapshot(reset=True)  # to, co policzono przed startem (ładowanie), nie wchodzi do pierwszego rekordu
+        self._file = open(self.path, "a", encoding="utf-8")
+
+    def poll(self):
+        now = time.perf_counter()
+        if now - self._last_flush >= self.interval:
+            self.flush(now)
+
+    def flush(self, now: Optional[float] = None):
+        now = time.perf_counter() if now is None else now
+        record = {"time": round(time.time(), 3), "elapsed": round(now - self.started, 3),
+                  "interval": round(now - self._last_flush, 3)}
+        record.update(self.registry.snapshot(reset=True))
+        self._file.write(json.dumps(record, separators=(",", ":")) + "\n")
+        self._file.flush()
+        self._last_flush = now
+        self.records += 1
+
+    def close(self):
+        if self._file.closed: return
+        self.flush()
+        self._file.close()
+        print(f"[INFO] MetricsWriter: Wrote {self.records} record(s) to {self.path}")
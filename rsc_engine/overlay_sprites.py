@@ -0,0 +1,41 @@
+# rsc_engine/overlay_sprites.py
+"""Pre-rendered sprites for the per-entity world overlays: shadows, the target tile highlight and HP bars.
+
+These used to be drawn with `pygame.draw` every frame, and the alpha of the shadow colour was
+silently dropped (`pygame.draw` does not blend on the display surface). Here each shape is
+rendered once into an `SRCALPHA` surface, so drawing it is a blit with real alpha blending.
+HP bars are cached per fill bucket (`C.HP_BAR_BUCKETS` steps from empty to full).
+"""
+from typing import Dict
+
+import pygame
+
+from rsc_engine import constants as C
+
+
+class OverlaySprites:
+    def __init__(self):
+        self.shadow = pygame.Surface((C.TILE_WIDTH // 2, C.TILE_HEIGHT // 2), pygame.SRCALPHA)
+        pygame.draw.ellipse(self.shadow, C.SHADOW_COLOR, self.shadow.get_rect())
+
+        w, h = C.TILE_WIDTH, C.TILE_HEIGHT
+        self.tile_highlight = pygame.Surface((w, h), pygame.SRCALPHA)
+        pygame.draw.polygon(self.tile_highlight, C.TARGET_HIGHLIGHT_COLOR,
+                            [(w // 2, 0), (w, h // 2), (w // 2, h), (0, h // 2)])
+
+        self._hp_bars: Dict[int, pygame.Surface] = {}
+
+    def hp_bar(self, hp: int, max_hp: int) -> pygame.Surface:
+        """HP bar sprite (`C.HP_BAR_WIDTH` x `C.HP_BAR_HEIGHT`) for `hp` out of `max_hp`."""
+        bucket = int(C.HP_BAR_BUCKETS * max(0, min(hp, max_hp)) / max_hp) if max_hp > 0 else 0
+        if bucket == 0 and hp > 0:
+            bucket = 1  # żywa postać nie może mieć pustego paska
+        bar = self._hp_bars.get(bucket)
+        if bar is None:
+            bar = pygame.Surface((C.HP_BAR_WIDTH, C.HP_BAR_HEIGHT))
+            bar.fill((50, 50, 50))
+            fill_w = C.HP_BAR_WIDTH * bucket // C.HP_BAR_BUCKETS
+            bar.fill((200, 0, 0), (0, 0, fill_w, C.HP_BAR_HEIGHT))
+            pygame.draw.rect(bar, (180, 180, 180), bar.get_rect(), 1)
+            self._hp_bars[bucket] = bar
+        return bar
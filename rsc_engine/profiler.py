@@ -0,0 +1,109 @@
+# rsc_engine/profiler.py
+"""Frame-phase profiler with an on-screen overlay (toggled with F3 in gameplay).
+
+`Game.run` and `GameplayState.draw` report how long each phase of a frame took (`PHASES`) and
+the overlay shows rolling averages and maxima over the last `window` frames, frame time
+percentiles, entity counts and what the render queue submitted. The time the frame limiter
+(`Clock.tick`) sleeps is shown separately as "idle" and is not part of the frame time.
+
+When the profiler is off, callers skip the extra `perf_counter` calls: they check `enabled`
+once per phase and do nothing else.
+"""
+import time
+from collections import deque
+from typing import Deque, Dict, List, Optional
+
+import pygame
+
+from rsc_engine import constants as C
+from rsc_engine.fonts import get_font
+from rsc_engine.render_queue import LAYERS
+
+
+def percentile(sorted_values: List[float], q: float) -> float:
+    if not sorted_values: return 0.0
+    return sorted_values[min(len(sorted_values) - 1, int(len(sorted_values) * q))]
+
+
+class FrameProfiler:
+    PHASES = ("events", "update", "tilemap", "entities", "ui", "scale", "flip")
+
+    def __init__(self, window: int = C.PROFILER_WINDOW, refresh: float = C.PROFILER_REFRESH):
+        self.enabled = False
+        self.window = window
+        self.refresh = refresh  # co ile sekund przerysować nakładkę (liczby zmieniają się co klatkę)
+        self.history: Dict[str, Deque[float]] = {phase: deque(maxlen=window) for phase in self.PHASES}
+        self.frame_times: Deque[float] = deque(maxlen=window)
+        self.idle_times: Deque[float] = deque(maxlen=window)
+        self._idle = 0.0
+        self.layer_times: List[float] = [0.0] * len(LAYERS)  # wypełnia RenderQueue.flush
+        self.counts: Dict[str, int] = {}
+        self._frame: Dict[str, float] = dict.fromkeys(self.PHASES, 0.0)
+
+        self.font: Optional[pygame.font.Font] = None
+        self._panel: Optional[pygame.Surface] = None
+        self._panel_built_at = 0.0
+
+    def toggle(self):
+        self.enabled = not self.enabled
+        for samples in self.history.values():
+            samples.clear()
+        self.frame_times.clear()
+        self.idle_times.clear()
+        self._frame = dict.fromkeys(self.PHASES, 0.0)
+        self._idle = 0.0
+        self._panel = None
+        print(f"[INFO] FrameProfiler: {'enabled' if self.enabled else 'disabled'}")
+
+    def add(self, phase: str, seconds: float):
+        self._frame[phase] += seconds
+
+    def add_idle(self, seconds: float):
+        self._idle += seconds
+
+    def set_count(self, name: str, value: int):
+        self.counts[name] = value
+
+    def end_frame(self):
+        total = 0.0
+        for phase, seconds in self._frame.items():
+            self.history[phase].append(seconds)
+            total += seconds
+        self.frame_times.append(total)
+        self.idle_times.append(self._idle)
+        self._frame = dict.fromkeys(self.PHASES, 0.0)
+        self._idle = 0.0
+
+    def _render_panel(self) -> pygame.Surface:
+        if self.font is None:
+            self.font = get_font("Consolas", 12)
+        frames = sorted(self.frame_times)
+        lines = [f"frame ms  p50 {percentile(frames, 0.5) * 1000:6.2f}  p95 {percentile(frames, 0.95) * 1000:6.2f}"
+                 f"  p99 {percentile(frames, 0.99) * 1000:6.2f}  ({len(frames)} frames)",
+                 f"{'phase':<9}{'avg ms':>8}{'max ms':>8}"]
+        for phase in self.PHASES:
+            samples = self.history[phase]
+            avg = sum(samples) / len(samples) if samples else 0.0
+            lines.append(f"{phase:<9}{avg * 1000:8.2f}{max(samples, default=0.0) * 1000:8.2f}")
+        idle = self.idle_times
+        lines.append(f"{'(idle)':<9}{sum(idle) / len(idle) * 1000 if idle else 0.0:8.2f}"
+                     f"{max(idle, default=0.0) * 1000:8.2f}")
+        lines.append("  ".join(f"{name} {value}" for name, value in self.counts.items()))
+
+        # Liczby zmieniają się co klatkę, więc renderujemy bez pamięci podręcznej tekstów
+        rendered = [self.font.render(line, True, (220, 255, 220)) for line in lines]
+        line_height = self.font.get_linesize()
+        panel = pygame.Surface((max(s.get_width() for s in rendered) + 12, line_height * len(rendered) + 10),
+                               pygame.SRCALPHA)
+        panel.fill((0, 0, 0, 170))
+        for i, surface in enumerate(rendered):
+            panel.blit(surface, (6, 5 + i * line_height))
+        return panel
+
+    def draw(self, surface: pygame.Surface):
+        if not self.enabled: return
+        now = time.perf_counter()
+        if self._panel is None or now - self._panel_built_at >= self.refresh:
+            self._panel = self._render_panel()
+            self._panel_built_at = now
+        surface.blit(self._panel, (surface.get_width() - self._panel.get_width() - 10, 50))
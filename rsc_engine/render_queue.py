@@ -0,0 +1,85 @@
+# rsc_engine/render_queue.py
+"""Frame render queue: draw commands collected per layer and submitted in batches.
+
+During `draw` the world and the UI add `(surface, position)` commands to a layer instead of
+blitting right away; `flush` then submits every layer, in `LAYERS` order, with one
+`Surface.blits(..., doreturn=False)` call per run of consecutive blits. That keeps the per-blit
+work in C and gives a single place that knows how much was drawn in a frame.
+
+Anything that is not a blit (`pygame.draw` primitives, ...) can be queued with `call`; it runs in
+its place within the layer and splits the surrounding blits into two batches.
+"""
+import time
+from typing import Any, Callable, Iterable, List, Optional, Tuple
+
+import pygame
+
+from rsc_engine.metrics import metrics
+
+_blits = metrics.counter("blits")
+_draw_calls = metrics.counter("draw_calls")
+
+LAYER_TERRAIN, LAYER_SHADOWS, LAYER_HIGHLIGHTS, LAYER_ENTITIES, LAYER_OVERLAYS, LAYER_UI = range(6)
+LAYERS = ("terrain", "shadows", "highlights", "entities", "overlays", "ui")
+
+BlitCommand = Tuple[pygame.Surface, Any]
+
+
+class RenderQueue:
+    def __init__(self):
+        # Warstwa -> segmenty: lista komend blit albo krotka (funkcja, argumenty)
+        self._layers: List[list] = [[] for _ in LAYERS]
+        # Statystyki ostatniego flush()
+        self.blits = 0  # narysowane powierzchnie
+        self.draw_calls = 0  # wywołania Surface.blits plus funkcje z call()
+        self.layer_blits: List[int] = [0] * len(LAYERS)
+
+    def add(self, layer: int, surface: pygame.Surface, position: Any):
+        segments = self._layers[layer]
+        if segments and segments[-1].__class__ is list:
+            segments[-1].append((surface, position))
+        else:
+            segments.append([(surface, position)])
+
+    def extend(self, layer: int, commands: Iterable[BlitCommand]):
+        segments = self._layers[layer]
+        if segments and segments[-1].__class__ is list:
+            segments[-1].extend(commands)
+        else:
+            segments.append(list(commands))
+
+    def call(self, layer: int, func: Callable, *args: Any):
+        """Run `func(*args)` at this point of `layer` when the queue is flushed."""
+        self._layers[layer].append((func, args))
+
+    def clear(self):
+        for segments in self._layers:
+            segments.clear()
+
+    def flush(self, surface: pygame.Surface, layer_times: Optional[List[float]] = None):
+        """Submit every queued command to `surface`, layer by layer, and empty the queue.
+
+        If `layer_times` is given, the seconds spent on each layer are written into it.
+        """
+        blits = draw_calls = 0
+        layer_blits = self.layer_blits
+        for layer, segments in enumerate(self._layers):
+            if layer_times is not None: started = time.perf_counter()
+            count = 0
+            for segment in segments:
+                if segment.__class__ is list:
+                    if not segment: continue
+                    surface.blits(segment, doreturn=False)
+                    count += len(segment)
+                else:
+                    func, args = segment
+                    func(*args)
+                draw_calls += 1
+            layer_blits[layer] = count
+            if layer_times is not None: layer_times[layer] = time.perf_counter() - started
+            blits += count
+            segments.clear()
+        self.blits = blits
+        self.draw_calls = draw_calls
+        _blits.inc(blits)
+        _draw_calls.inc(draw_calls)
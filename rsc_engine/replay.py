@@ -0,0 +1,130 @@
+# rsc_engine/replay.py
+"""Input recording and replay, so a reported stutter can be re-run frame by frame as a benchmark.
+
+A replay file is gzip-compressed JSON Lines. The first line is a header (format version, RNG seed,
+window size, FPS); every following line is one frame:
+
+    [dt, [mouse x, mouse y], [logical mouse x, logical mouse y], [[event type, {attributes}], ...]]
+
+`dt` is the exact value the game loop used, so the replay steps the simulation identically.
+"""
+import gzip
+import json
+import statistics
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+import pygame
+
+REPLAY_VERSION = 1
+
+_PLAIN_TYPES = (int, float, str, bool, type(None))
+
+
+def _encode_value(value: Any) -> Any:
+    if isinstance(value, _PLAIN_TYPES):
+        return value
+    if isinstance(value, (tuple, list)) and all(isinstance(v, _PLAIN_TYPES) for v in value):
+        return list(value)
+    raise TypeError
+
+
+def _encode_event(event: pygame.event.Event) -> List[Any]:
+    attrs = {}
+    for name, value in event.dict.items():
+        try:
+            attrs[name] = _encode_value(value)
+        except TypeError:
+            continue  # np. obiekt okna SDL; handlery gry z niego nie korzystają
+    return [event.type, attrs] if attrs else [event.type]
+
+
+def _decode_event(data: List[Any]) -> pygame.event.Event:
+    attrs = {name: tuple(value) if isinstance(value, list) else value
+             for name, value in (data[1] if len(data) > 1 else {}).items()}
+    return pygame.event.Event(data[0], attrs)
+
+
+@dataclass
+class ReplayFrame:
+    dt: float
+    mouse_pos: Tuple[int, int]
+    logical_mouse_pos: Tuple[int, int]
+    events: List[pygame.event.Event]
+
+
+class ReplayRecorder:
+    """Appends one line per frame to a replay file."""
+
+    def __init__(self, path: Path, seed: int, window_size: Tuple[int, int], fps: int):
+        self.path = Path(path)
+        self.frames = 0
+        self._file = gzip.open(self.path, "wt", encoding="utf-8")
+        self._write({"version": REPLAY_VERSION, "seed": seed, "window": list(window_size), "fps": fps})
+        print(f"[INFO] Replay: Recording to {self.path} (seed {seed})")
+
+    def _write(self, data: Any):
+        self._file.write(json.dumps(data, separators=(",", ":")))
+        self._file.write("\n")
+
+    def record_frame(self, dt: float, events: List[pygame.event.Event], mouse_pos: Tuple[int, int],
+                     logical_mouse_pos: Tuple[int, int]):
+        self._write([dt, list(mouse_pos), list(logical_mouse_pos), [_encode_event(e) for e in events]])
+        self.frames += 1
+
+    def close(self):
+        self._file.close()
+        print(f"[INFO] Replay: Recorded {self.frames} frames to {self.path}")
+
+
+class ReplayPlayer:
+    """Reads a replay file frame by frame."""
+
+    def __init__(self, path: Path):
+        self.path = Path(path)
+        self._file = gzip.open(self.path, "rt", encoding="utf-8")
+        header = json.loads(self._file.readline() or "{}")
+        if header.get("version") != REPLAY_VERSION:
+            self._file.close()
+            raise ValueError(f"{self.path} is not a replay file of version {REPLAY_VERSION}")
+        self.seed: int = header["seed"]
+        self.window_size: Tuple[int, int] = tuple(header["window"])
+        self.fps: int = header["fps"]
+        self.frames = 0
+
+    def next_frame(self) -> Optional[ReplayFrame]:
+        line = self._file.readline()
+        if not line:
+            return None
+        dt, mouse_pos, logical_mouse_pos, events = json.loads(line)
+        self.frames += 1
+        return ReplayFrame(dt, tuple(mouse_pos), tuple(logical_mouse_pos), [_decode_event(e) for e in events])
+
+    def close(self):
+        self._file.close()
+
+
+class FrameTimingDump:
+    """Per-frame phase timings of a replay, written as CSV, plus a percentile summary."""
+
+    PHASES = ("events", "update", "draw", "present")
+
+    def __init__(self, path: Path):
+        self.path = Path(path)
+        self.rows: List[Tuple[float, ...]] = []
+
+    def add(self, dt: float, event_count: int, phase_times: Dict[str, float]):
+        self.rows.append((dt, event_count) + tuple(phase_times[p] for p in self.PHASES))
+
+    def write(self):
+        with open(self.path, "w", encoding="utf-8") as f:
+            f.write("frame,dt_ms,events," + ",".join(f"{p}_ms" for p in self.PHASES) + ",total_ms\n")
+            for i, (dt, event_count, *phases) in enumerate(self.rows):
+                f.write(f"{i},{dt * 1000:.3f},{event_count},"
+                        + ",".join(f"{t * 1000:.3f}" for t in phases) + f",{sum(phases) * 1000:.3f}\n")
+        totals = sorted(sum(row[2:]) * 1000 for row in self.rows)
+        if totals:
+            p95 = totals[min(len(totals) - 1, int(len(totals) * 0.95))]
+            print(f"[INFO] Replay: {len(totals)} frames, frame time median {statistics.median(totals):.2f} ms, "
+                  f"p95 {p95:.2f} ms, max {totals[-1]:.2f} ms. Timings written to {self.path}")
@@ -0,0 +1,318 @@
+# rsc_engine/save_format.py
+"""Save file formats: the versioned binary format and the legacy JSON layout (game_version 0.1.1).
+
+Binary layout (little-endian), schema version 2:
+
+    header      magic "RSCS", schema version u16, flags u16, timestamp u64,
+                string count u32, NPC count u32, inventory count u32
+    --- everything below is compressed as one stream when flags has FLAG_ZLIB or FLAG_LZMA ---
+    strings     u16 byte length + UTF-8 bytes, one per entry; records refer to strings by index
+    world       game_version index u32, current_map_id index u32
+    player      name u32, map_id u32, level, start_ix, start_iy, max_hp, current_hp, xp (i32 each)
+    npcs        entity_id u32, name u32, type u32, ix, iy, hp, max_hp, level (i32 each), flags u8
+    inventory   row u16, col u16, item_id u32, quantity i32
+
+Version 1 is the same layout with flags always 0 (never compressed). Unknown flag bits, or both
+compression flags at once, are rejected rather than guessed at. The payload is written and
+read as a stream (gzip/xz containers over zlib/lzma, `CHUNK_SIZE` at a time, records in batches of
+`RECORD_BATCH`), so neither the compressed file nor the packed records are ever held whole in memory.
+
+Both formats decode to the same dict as the JSON files ("player_data", "npc_states", "inventory",
+"current_map_id", "timestamp", "game_version"). `convert_save.py` in the project root converts a
+save between formats (the output extension picks the format).
+"""
+import gzip
+import io
+import json
+import lzma
+import struct
+import zlib
+from pathlib import Path
+from typing import Any, BinaryIO, Dict, Iterable, Iterator, List, Tuple
+
+from rsc_engine import constants as C
+
+MAGIC = b"RSCS"
+SCHEMA_VERSION = 2
+BINARY_SUFFIX = ".sav"
+JSON_SUFFIX = ".json"
+
+HEADER = struct.Struct("<4sHHQIII")
+STRING_LEN = struct.Struct("<H")
+WORLD = struct.Struct("<II")
+PLAYER = struct.Struct("<IIiiiiii")
+NPC = struct.Struct("<IIIiiiiiB")
+INVENTORY_SLOT = struct.Struct("<HHIi")
+
+NPC_ALIVE = 0x01
+NPC_SHOW_HP_BAR = 0x02
+NPC_CHASING = 0x04
+NPC_HOSTILE_FIELDS = 0x08  # rekord ma pola show_hp_bar/is_chasing (HostileNPC)
+
+FLAG_ZLIB = 0x0001
+FLAG_LZMA = 0x0002
+COMPRESSION_FLAGS = {"none": 0, "zlib": FLAG_ZLIB, "lzma": FLAG_LZMA}
+KNOWN_FLAGS = FLAG_ZLIB | FLAG_LZMA
+
+CHUNK_SIZE = 64 * 1024
+RECORD_BATCH = 1024
+
+
+class SaveFormatError(ValueError):
+    """Raised when a save file is truncated, corrupted or written by a newer schema."""
+
+
+class _StringTable:
+    def __init__(self):
+        self.strings: List[str] = []
+        self._index: Dict[str, int] = {}
+
+    def add(self, value: Any) -> int:
+        value = str(value)
+        index = self._index.get(value)
+        if index is None:
+            index = len(self.strings)
+            self.strings.append(value)
+            self._index[value] = index
+        return index
+
+
+class ChecksumWriter:
+    """Binary stream wrapper that keeps a CRC32 and byte count of everything written through it."""
+
+    def __init__(self, fp: BinaryIO):
+        self.fp = fp
+        self.crc = 0
+        self.size = 0
+
+    def write(self, data: bytes) -> int:
+        self.crc = zlib.crc32(data, self.crc)
+        self.size += len(data)
+        return self.fp.write(data)
+
+    def flush(self):
+        self.fp.flush()
+
+
+def file_crc32(path: Path) -> int:
+    crc = 0
+    with open(path, "rb") as f:
+        while True:
+            chunk = f.read(CHUNK_SIZE)
+            if not chunk:
+                return crc
+            crc = zlib.crc32(chunk, crc)
+
+
+def _compressed_writer(fp: BinaryIO, flags: int, level: int) -> BinaryIO:
+    if flags & FLAG_ZLIB:
+        return gzip.GzipFile(fileobj=fp, mode="wb", compresslevel=level, mtime=0)
+    if flags & FLAG_LZMA:
+        return lzma.LZMAFile(fp, mode="wb", preset=level)
+    return fp
+
+
+def _decompressed_reader(fp: BinaryIO, flags: int) -> BinaryIO:
+    if flags & FLAG_ZLIB:
+        return io.BufferedReader(gzip.GzipFile(fileobj=fp, mode="rb"), CHUNK_SIZE)
+    if flags & FLAG_LZMA:
+        return io.BufferedReader(lzma.LZMAFile(fp, mode="rb"), CHUNK_SIZE)
+    return fp
+
+
+def _write_batched(fp: BinaryIO, records: Iterable[bytes]):
+    batch = []
+    for record in records:
+        batch.append(record)
+        if len(batch) >= RECORD_BATCH:
+            fp.write(b"".join(batch))
+            batch.clear()
+    if batch:
+        fp.write(b"".join(batch))
+
+
+def _npc_flags(npc: Dict[str, Any]) -> int:
+    flags = NPC_ALIVE if npc.get("is_alive", True) else 0
+    if "show_hp_bar" in npc or "is_chasing" in npc:
+        flags |= NPC_HOSTILE_FIELDS
+        if npc.get("show_hp_bar"): flags |= NPC_SHOW_HP_BAR
+        if npc.get("is_chasing"): flags |= NPC_CHASING
+    return flags
+
+
+def write_binary(data: Dict[str, Any], fp: BinaryIO, compression: str = C.SAVE_COMPRESSION,
+                 level: int = C.SAVE_COMPRESSION_LEVEL):
+    """Write a save dict in the binary format to a binary stream.
+
+    `compression` is "none", "zlib" or "lzma"; `level` is the zlib level or lzma preset (0-9).
+    """
+    if compression not in COMPRESSION_FLAGS:
+        raise SaveFormatError(f"Unknown save compression '{compression}'")
+    flags = COMPRESSION_FLAGS[compression]
+    player = data["player_data"]
+    npc_states = data.get("npc_states", [])
+    inventory = data.get("inventory", [])
+
+    # Pierwsze przejście buduje tylko tablicę napisów; rekordy są pakowane dopiero przy zapisie
+    strings = _StringTable()
+    game_version_idx = strings.add(data.get("game_version", ""))
+    map_idx = strings.add(data.get("current_map_id", player.get("map_id", "default_map")))
+    name_idx = strings.add(player.get("name", ""))
+    player_map_idx = strings.add(player.get("map_id", "default_map"))
+    for npc in npc_states:
+        strings.add(npc["entity_id"]); strings.add(npc.get("name", "")); strings.add(npc.get("type", ""))
+    for slot in inventory:
+        strings.add(slot["item_id"])
+
+    fp.write(HEADER.pack(MAGIC, SCHEMA_VERSION, flags, int(data.get("timestamp", 0)),
+                         len(strings.strings), len(npc_states), len(inventory)))
+    out = _compressed_writer(fp, flags, level)
+    try:
+        def string_records() -> Iterator[bytes]:
+            for value in strings.strings:
+                encoded = value.encode("utf-8")
+                if len(encoded) > 0xFFFF:
+                    raise SaveFormatError(f"String too long for the save string table ({len(encoded)} bytes)")
+                yield STRING_LEN.pack(len(encoded)) + encoded
+
+        _write_batched(out, string_records())
+        out.write(WORLD.pack(game_version_idx, map_idx))
+        out.write(PLAYER.pack(name_idx, player_map_idx,
+                              player.get("level", 1), player.get("start_ix", 5), player.get("start_iy", 5),
+                              player.get("max_hp", 100), player.get("current_hp", 100), player.get("xp", 0)))
+        _write_batched(out, (NPC.pack(strings.add(npc["entity_id"]), strings.add(npc.get("name", "")),
+                                      strings.add(npc.get("type", "")), npc.get("ix", 0), npc.get("iy", 0),
+                                      npc.get("hp", 0), npc.get("max_hp", 0), npc.get("level", 1), _npc_flags(npc))
+                             for npc in npc_states))
+        _write_batched(out, (INVENTORY_SLOT.pack(slot["row"], slot["col"], strings.add(slot["item_id"]),
+                                                 slot["quantity"])
+                             for slot in inventory))
+    finally:
+        if out is not fp:
+            out.close()  # kończy strumień kompresji; nie zamyka pliku pod spodem
+
+
+def encode_binary(data: Dict[str, Any], compression: str = C.SAVE_COMPRESSION,
+                  level: int = C.SAVE_COMPRESSION_LEVEL) -> bytes:
+    buffer = io.BytesIO()
+    write_binary(data, buffer, compression, level)
+    return buffer.getvalue()
+
+
+def _read_exact(fp: BinaryIO, size: int) -> bytes:
+    chunk = fp.read(size)
+    if len(chunk) != size:
+        raise SaveFormatError("Save file is truncated")
+    return chunk
+
+
+def _iter_records(fp: BinaryIO, record: struct.Struct, count: int) -> Iterator[Tuple]:
+    while count > 0:
+        batch = min(count, RECORD_BATCH)
+        yield from record.iter_unpack(_read_exact(fp, record.size * batch))
+        count -= batch
+
+
+def _read_v1(fp: BinaryIO, timestamp: int, string_count: int, npc_count: int, inventory_count: int) -> Dict[str, Any]:
+    strings = []
+    for _ in range(string_count):
+        (length,) = STRING_LEN.unpack(_read_exact(fp, STRING_LEN.size))
+        try:
+            strings.append(_read_exact(fp, length).decode("utf-8"))
+        except UnicodeDecodeError as e:
+            raise SaveFormatError(f"Save string table is not valid UTF-8: {e}")
+
+    try:
+        game_version_idx, map_idx = WORLD.unpack(_read_exact(fp, WORLD.size))
+        name_idx, player_map_idx, level, start_ix, start_iy, max_hp, current_hp, xp = \
+            PLAYER.unpack(_read_exact(fp, PLAYER.size))
+        player_data = {"name": strings[name_idx], "level": level, "start_ix": start_ix, "start_iy": start_iy,
+                       "max_hp": max_hp, "current_hp": current_hp, "xp": xp, "map_id": strings[player_map_idx]}
+
+        npc_states = []
+        for fields in _iter_records(fp, NPC, npc_count):
+            entity_idx, npc_name_idx, type_idx, ix, iy, hp, npc_max_hp, npc_level, flags = fields
+            npc = {"entity_id": strings[entity_idx], "name": strings[npc_name_idx], "ix": ix, "iy": iy, "hp": hp,
+                   "max_hp": npc_max_hp, "is_alive": bool(flags & NPC_ALIVE), "level": npc_level,
+                   "type": strings[type_idx]}
+            if flags & NPC_HOSTILE_FIELDS:
+                npc["show_hp_bar"] = bool(flags & NPC_SHOW_HP_BAR)
+                npc["is_chasing"] = bool(flags & NPC_CHASING)
+            npc_states.append(npc)
+
+        inventory = [{"row": row, "col": col, "item_id": strings[item_idx], "quantity": quantity}
+                     for row, col, item_idx, quantity in _iter_records(fp, INVENTORY_SLOT, inventory_count)]
+        return {"player_data": player_data, "npc_states": npc_states, "inventory": inventory,
+                "current_map_id": strings[map_idx], "timestamp": timestamp,
+                "game_version": strings[game_version_idx]}
+    except IndexError:
+        raise SaveFormatError("Save file refers to a string outside its string table")
+
+
+# Wersja 2 ma układ wersji 1; różni się tylko tym, że flagi nagłówka mogą włączać kompresję
+_BINARY_READERS = {1: _read_v1, 2: _read_v1}
+
+
+def read_binary(fp: BinaryIO) -> Dict[str, Any]:
+    magic, version, flags, timestamp, string_count, npc_count, inventory_count = \
+        HEADER.unpack(_read_exact(fp, HEADER.size))
+    if magic != MAGIC:
+        raise SaveFormatError("Not a binary save file (bad magic)")
+    reader = _BINARY_READERS.get(version)
+    if reader is None:
+        raise SaveFormatError(f"Unsupported save schema version {version} (newest known: {SCHEMA_VERSION})")
+    if version == 1:
+        flags = 0
+    if flags & ~KNOWN_FLAGS:
+        raise SaveFormatError(f"Unknown save header flags 0x{flags & ~KNOWN_FLAGS:04x}")
+    if flags == KNOWN_FLAGS:
+        raise SaveFormatError("Save header has both zlib and lzma compression flags set")
+    try:
+        return reader(_decompressed_reader(fp, flags), timestamp, string_count, npc_count, inventory_count)
+    except (EOFError, lzma.LZMAError, zlib.error, gzip.BadGzipFile) as e:
+        raise SaveFormatError(f"Could not decompress save payload: {e}")
+
+
+def read_json(fp: BinaryIO) -> Dict[str, Any]:
+    """Legacy pretty-printed JSON save (game_version 0.1.1)."""
+    try:
+        data = json.load(io.TextIOWrapper(fp, encoding="utf-8"))
+    except (json.JSONDecodeError, UnicodeDecodeError) as e:
+        raise SaveFormatError(f"Could not decode JSON save: {e}")
+    if not isinstance(data, dict) or "player_data" not in data:
+        raise SaveFormatError("JSON save is missing 'player_data'")
+    data.setdefault("npc_states", [])
+    data.setdefault("inventory", [])
+    return data
+
+
+def read_save(path: Path) -> Dict[str, Any]:
+    """Read a save file in any supported format, detected by its first bytes."""
+    with open(path, "rb") as fp:
+        magic = fp.read(len(MAGIC))
+        fp.seek(0)
+        if magic == MAGIC:
+            return read_binary(fp)
+        return read_json(fp)
+
+
+def encode_json(data: Dict[str, Any]) -> bytes:
+    return json.dumps(data, indent=4, ensure_ascii=False).encode("utf-8")
+
+
+def encode_for_path(data: Dict[str, Any], path: Path) -> bytes:
+    return encode_json(data) if Path(path).suffix == JSON_SUFFIX else encode_binary(data)
+
+
+def write_for_path(data: Dict[str, Any], path: Path, fp: BinaryIO):
+    """Stream `data` to `fp` in the format picked by the extension of `path`."""
+    if Path(path).suffix == JSON_SUFFIX:
+        fp.write(encode_json(data))
+    else:
+        write_binary(data, fp)
+
+
+def convert(src: Path, dst: Path):
+    data = read_save(src)
+    with open(dst, "wb") as f:
+        write_for_path(data, dst, f)
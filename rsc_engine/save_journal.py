@@ -0,0 +1,317 @@
+# rsc_engine/save_journal.py
+"""Append-only save journal: small change records on top of a binary base snapshot.
+
+Each slot has its base save (`save_slot_N.sav`) and a journal next to it (`save_slot_N.journal`).
+A journaled save diffs the snapshot against the last persisted state and appends only the changed
+player, world, NPC and inventory-slot records (an NPC missing from the snapshot gets a removal
+record, an emptied inventory slot a record with an empty item ID). When the journal grows past
+`C.SAVE_JOURNAL_COMPACT_BYTES` it is compacted: the current state becomes a fresh base and the
+journal is reset.
+
+Journal layout (little-endian):
+
+    header      magic "RSCJ", version u16, CRC32 of the base file u32, base file size u64
+    records     payload length u32, CRC32 of payload u32, kind u8, payload
+
+The header ties the journal to one exact base file, so after a compaction (or a full save) a stale
+journal is never replayed over the new base. Every save ends with a commit record and its records
+are applied only once the commit is read, so a save torn off at the tail (or a record with a bad
+CRC) is dropped as a whole. A journal of any other `JOURNAL_VERSION` counts as stale and is discarded.
+"""
+import os
+import struct
+import zlib
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+from rsc_engine import constants as C
+from rsc_engine.save_format import (SaveFormatError, STRING_LEN, NPC_ALIVE, NPC_SHOW_HP_BAR, NPC_CHASING,
+                                    NPC_HOSTILE_FIELDS, ChecksumWriter, file_crc32, read_binary, write_binary)
+from rsc_engine.saves import SaveSnapshot, atomic_writer, write_atomic
+
+JOURNAL_MAGIC = b"RSCJ"
+JOURNAL_VERSION = 2
+JOURNAL_SUFFIX = ".journal"
+
+JOURNAL_HEADER = struct.Struct("<4sHIQ")
+FRAME = struct.Struct("<IIB")
+
+RECORD_WORLD = 1
+RECORD_PLAYER = 2
+RECORD_NPC = 3
+RECORD_INVENTORY_SLOT = 4
+RECORD_NPC_REMOVED = 5
+RECORD_COMMIT = 6
+
+_WORLD_FIELDS = struct.Struct("<Q")
+_PLAYER_FIELDS = struct.Struct("<iiiiii")
+_NPC_FIELDS = struct.Struct("<iiiiiB")
+_INVENTORY_FIELDS = struct.Struct("<HHi")
+
+
+def journal_path_for(base_path: Path) -> Path:
+    return Path(base_path).with_suffix(JOURNAL_SUFFIX)
+
+
+def _pack_str(value: Any) -> bytes:
+    encoded = str(value).encode("utf-8")
+    return STRING_LEN.pack(len(encoded)) + encoded
+
+
+def _unpack_str(payload: bytes, offset: int) -> Tuple[str, int]:
+    (length,) = STRING_LEN.unpack_from(payload, offset)
+    offset += STRING_LEN.size
+    return payload[offset:offset + length].decode("utf-8"), offset + length
+
+
+# --- Indeksowany stan świata (łatwy do porównywania rekord po rekordzie) ---
+
+def _index_state(data: Dict[str, Any]) -> Dict[str, Any]:
+    return {
+        "world": {"current_map_id": data.get("current_map_id", "default_map"),
+                  "timestamp": data.get("timestamp", 0), "game_version": data.get("game_version", "")},
+        "player": dict(data["player_data"]),
+        "npcs": {npc["entity_id"]: dict(npc) for npc in data.get("npc_states", [])},
+        "inventory": {(slot["row"], slot["col"]): dict(slot) for slot in data.get("inventory", [])},
+    }
+
+
+def _state_to_data(state: Dict[str, Any]) -> Dict[str, Any]:
+    return {"player_data": dict(state["player"]),
+            "npc_states": [dict(npc) for npc in state["npcs"].values()],
+            "inventory": [dict(slot) for _, slot in sorted(state["inventory"].items())],
+            **state["world"]}
+
+
+# --- Kodowanie rekordów ---
+
+def _frame(kind: int, payload: bytes) -> bytes:
+    return FRAME.pack(len(payload), zlib.crc32(payload), kind) + payload
+
+
+def _encode_world(world: Dict[str, Any]) -> bytes:
+    return _frame(RECORD_WORLD, _pack_str(world["current_map_id"]) + _pack_str(world["game_version"])
+                  + _WORLD_FIELDS.pack(int(world["timestamp"])))
+
+
+def _encode_player(player: Dict[str, Any]) -> bytes:
+    return _frame(RECORD_PLAYER, _pack_str(player.get("name", "")) + _pack_str(player.get("map_id", "default_map"))
+                  + _PLAYER_FIELDS.pack(player.get("level", 1), player.get("start_ix", 5), player.get("start_iy", 5),
+                                        player.get("max_hp", 100), player.get("current_hp", 100), player.get("xp", 0)))
+
+
+def _encode_npc(npc: Dict[str, Any]) -> bytes:
+    flags = NPC_ALIVE if npc.get("is_alive", True) else 0
+    if "show_hp_bar" in npc or "is_chasing" in npc:
+        flags |= NPC_HOSTILE_FIELDS
+        if npc.get("show_hp_bar"): flags |= NPC_SHOW_HP_BAR
+        if npc.get("is_chasing"): flags |= NPC_CHASING
+    return _frame(RECORD_NPC, _pack_str(npc["entity_id"]) + _pack_str(npc.get("name", "")) + _pack_str(npc.get("type", ""))
+                  + _NPC_FIELDS.pack(npc.get("ix", 0), npc.get("iy", 0), npc.get("hp", 0), npc.get("max_hp", 0),
+                                     npc.get("level", 1), flags))
+
+
+def _encode_npc_removed(entity_id: str) -> bytes:
+    return _frame(RECORD_NPC_REMOVED, _pack_str(entity_id))
+
+
+def _encode_inventory_slot(row: int, col: int, slot: Optional[Dict[str, Any]]) -> bytes:
+    # Pusty item_id oznacza opróżniony slot
+    item_id, quantity = (slot["item_id"], slot["quantity"]) if slot else ("", 0)
+    return _frame(RECORD_INVENTORY_SLOT, _INVENTORY_FIELDS.pack(row, col, quantity) + _pack_str(item_id))
+
+
+def _diff(old: Dict[str, Any], new: Dict[str, Any]) -> List[bytes]:
+    records = []
+    if old["world"] != new["world"]:
+        records.append(_encode_world(new["world"]))
+    if old["player"] != new["player"]:
+        records.append(_encode_player(new["player"]))
+    for entity_id, npc in new["npcs"].items():
+        if old["npcs"].get(entity_id) != npc:
+            records.append(_encode_npc(npc))
+    # NPC, którego nie ma w nowym stanie (np. odrodził się jako zaparkowany), musi zniknąć także z dziennika
+    for entity_id in old["npcs"].keys() - new["npcs"].keys():
+        records.append(_encode_npc_removed(entity_id))
+    for key in old["inventory"].keys() | new["inventory"].keys():
+        slot = new["inventory"].get(key)
+        if old["inventory"].get(key) != slot:
+            records.append(_encode_inventory_slot(key[0], key[1], slot))
+    return records
+
+
+# Zdekodowany rekord: (sekcja stanu, klucz albo None dla całej sekcji, wartość albo None = usunięcie)
+Change = Tuple[str, Any, Optional[Dict[str, Any]]]
+
+
+def _decode_record(kind: int, payload: bytes) -> Change:
+    if kind == RECORD_WORLD:
+        map_id, offset = _unpack_str(payload, 0)
+        game_version, offset = _unpack_str(payload, offset)
+        (timestamp,) = _WORLD_FIELDS.unpack_from(payload, offset)
+        return "world", None, {"current_map_id": map_id, "timestamp": timestamp, "game_version": game_version}
+    if kind == RECORD_PLAYER:
+        name, offset = _unpack_str(payload, 0)
+        map_id, offset = _unpack_str(payload, offset)
+        level, start_ix, start_iy, max_hp, current_hp, xp = _PLAYER_FIELDS.unpack_from(payload, offset)
+        return "player", None, {"name": name, "level": level, "start_ix": start_ix, "start_iy": start_iy,
+                                "max_hp": max_hp, "current_hp": current_hp, "xp": xp, "map_id": map_id}
+    if kind == RECORD_NPC:
+        entity_id, offset = _unpack_str(payload, 0)
+        name, offset = _unpack_str(payload, offset)
+        npc_type, offset = _unpack_str(payload, offset)
+        ix, iy, hp, max_hp, level, flags = _NPC_FIELDS.unpack_from(payload, offset)
+        npc = {"entity_id": entity_id, "name": name, "ix": ix, "iy": iy, "hp": hp, "max_hp": max_hp,
+               "is_alive": bool(flags & NPC_ALIVE), "level": level, "type": npc_type}
+        if flags & NPC_HOSTILE_FIELDS:
+            npc["show_hp_bar"] = bool(flags & NPC_SHOW_HP_BAR)
+            npc["is_chasing"] = bool(flags & NPC_CHASING)
+        return "npcs", entity_id, npc
+    if kind == RECORD_NPC_REMOVED:
+        entity_id, _ = _unpack_str(payload, 0)
+        return "npcs", entity_id, None
+    if kind == RECORD_INVENTORY_SLOT:
+        row, col, quantity = _INVENTORY_FIELDS.unpack_from(payload, 0)
+        item_id, _ = _unpack_str(payload, _INVENTORY_FIELDS.size)
+        slot = {"row": row, "col": col, "item_id": item_id, "quantity": quantity} if item_id else None
+        return "inventory", (row, col), slot
+    raise SaveFormatError(f"Unknown journal record kind {kind}")
+
+
+def _apply_changes(state: Dict[str, Any], changes: List[Change]):
+    for section, key, value in changes:
+        if key is None:
+            state[section] = value
+        elif value is None:
+            state[section].pop(key, None)
+        else:
+            state[section][key] = value
+
+
+def _replay(state: Dict[str, Any], journal: bytes, base_crc: int, base_size: int) -> Tuple[bool, int]:
+    """Apply the committed journal records to `state`.
+
+    Returns (journal belongs to this base, offset just past the last committed save).
+    """
+    if len(journal) < JOURNAL_HEADER.size:
+        return False, 0
+    magic, version, journal_base_crc, journal_base_size = JOURNAL_HEADER.unpack_from(journal, 0)
+    if magic != JOURNAL_MAGIC or version != JOURNAL_VERSION \
+            or journal_base_crc != base_crc or journal_base_size != base_size:
+        return False, 0
+
+    offset = committed = JOURNAL_HEADER.size
+    pending: List[Change] = []  # rekordy zapisu, którego commit jeszcze nie przyszedł
+    while offset + FRAME.size <= len(journal):
+        length, crc, kind = FRAME.unpack_from(journal, offset)
+        payload = journal[offset + FRAME.size:offset + FRAME.size + length]
+        if len(payload) != length or zlib.crc32(payload) != crc:
+            break  # urwany zapis na końcu dziennika
+        offset += FRAME.size + length
+        if kind != RECORD_COMMIT:
+            try:
+                pending.append(_decode_record(kind, payload))
+            except (struct.error, UnicodeDecodeError, SaveFormatError):
+                break
+        if kind == RECORD_COMMIT:
+            _apply_changes(state, pending)
+            pending = []
+            committed = offset
+    return True, committed
+
+
+def _read_base_and_journal(base_path: Path) -> Tuple[int, int, Dict[str, Any], bool, int]:
+    """Returns (base CRC32, base size, state, journal matches the base, end of the valid journal)."""
+    with open(base_path, "rb") as f:
+        state = _index_state(read_binary(f))
+        base_size = os.fstat(f.fileno()).st_size
+    base_crc = file_crc32(base_path)
+    journal_path = journal_path_for(base_path)
+    journal = b""
+    if journal_path.exists():
+        with open(journal_path, "rb") as f:
+            journal = f.read()
+    matches, valid_end = _replay(state, journal, base_crc, base_size)
+    return base_crc, base_size, state, matches, valid_end
+
+
+def read_save_with_journal(base_path: Path) -> Dict[str, Any]:
+    """Read a binary base save and replay its journal (if one exists and belongs to this base)."""
+    _, _, state, _, _ = _read_base_and_journal(base_path)
+    return _state_to_data(state)
+
+
+class SaveJournal:
+    """Journaled writer for one save slot.
+
+    Not thread-safe: all writes for a slot must come from the same thread (the SaveWriter worker).
+    """
+
+    def __init__(self, base_path: Path, compact_bytes: int = C.SAVE_JOURNAL_COMPACT_BYTES):
+        self.base_path = Path(base_path)
+        self.journal_path = journal_path_for(self.base_path)
+        self.compact_bytes = compact_bytes
+        self._state: Optional[Dict[str, Any]] = None  # ostatni stan utrwalony na dysku (baza + dziennik)
+        self._journal_size = 0
+        self.base_crc: Optional[int] = None
+
+    def _write_base(self, state: Dict[str, Any]):
+        with atomic_writer(self.base_path) as f:
+            base = ChecksumWriter(f)
+            write_binary(_state_to_data(state), base)
+        write_atomic(self.journal_path, JOURNAL_HEADER.pack(JOURNAL_MAGIC, JOURNAL_VERSION, base.crc, base.size))
+        self._state = state
+        self._journal_size = JOURNAL_HEADER.size
+        self.base_crc = base.crc
+
+    def _load_state(self) -> bool:
+        if not self.base_path.exists():
+            return False
+        try:
+            base_crc, base_size, state, matches, valid_end = _read_base_and_journal(self.base_path)
+        except (OSError, SaveFormatError) as e:
+            print(f"[WARNING] SaveJournal: Could not read {self.base_path} ({e}), a full save will be written")
+            return False
+        if not matches:
+            write_atomic(self.journal_path, JOURNAL_HEADER.pack(JOURNAL_MAGIC, JOURNAL_VERSION, base_crc, base_size))
+            valid_end = JOURNAL_HEADER.size
+        elif valid_end != self.journal_path.stat().st_size:
+            # Odcinamy urwany ogon, żeby nowe rekordy nie trafiły za uszkodzoną ramkę
+            with open(self.journal_path, "r+b") as f:
+                f.truncate(valid_end)
+        self._state = state
+        self._journal_size = valid_end
+        self.base_crc = base_crc
+        return True
+
+    def write_full(self, snapshot: SaveSnapshot):
+        """Write the whole snapshot as a new base and start an empty journal."""
+        self._write_base(_index_state(snapshot.to_dict()))
+
+    def append(self, snapshot: SaveSnapshot) -> int:
+        """Append the records that changed since the last save. Returns the number of records written."""
+        if self._state is None and not self._load_state():
+            self.write_full(snapshot)
+            return 0
+
+        new_state = _index_state(snapshot.to_dict())
+        records = _diff(self._state, new_state)
+        if records:
+            data = b"".join(records) + _frame(RECORD_COMMIT, b"")
+            with open(self.journal_path, "ab") as f:
+                f.write(data)
+                f.flush()
+                os.fsync(f.fileno())
+            self._journal_size += len(data)
+        self._state = new_state
+
+        if self._journal_size > self.compact_bytes:
+            self.compact()
+        return len(records)
+
+    def compact(self):
+        """Fold the journal into a fresh base snapshot."""
+        if self._state is None and not self._load_state():
+            return
+        print(f"[INFO] SaveJournal: Compacting {self.journal_path} ({self._journal_size} bytes)")
+        self._write_base(self._state)
@@ -0,0 +1,284 @@
+# rsc_engine/saves.py
+"""Save snapshots and the background writer that puts them on disk."""
+import json
+import os
+import queue
+import tempfile
+import threading
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass
+from pathlib import Path
+from types import MappingProxyType
+from typing import Any, BinaryIO, Callable, Dict, Iterator, List, Mapping, Optional, Tuple
+
+from rsc_engine.save_format import write_for_path
+
+GAME_VERSION = "0.1.1"
+INDEX_FILENAME = "slots_index.json"
+
+
+def _freeze(data: Dict[str, Any]) -> Mapping[str, Any]:
+    return MappingProxyType(dict(data))
+
+
+def _share_records(records: List[Dict[str, Any]], previous: Tuple[Mapping[str, Any], ...],
+                   key: Callable[[Mapping[str, Any]], Any]) -> Tuple[Mapping[str, Any], ...]:
+    """Copy-on-write: reuse the frozen record of `previous` when it equals the new one."""
+    frozen_by_key = {key(record): record for record in previous}
+    shared = []
+    for record in records:
+        old = frozen_by_key.get(key(record))
+        shared.append(old if old is not None and old == record else _freeze(record))
+    return tuple(shared)
+
+
+@dataclass(frozen=True)
+class SaveSnapshot:
+    """Immutable copy of everything a save slot stores, captured on the main thread.
+
+    Only plain values are kept (no sprites or game objects), so it can be handed to another thread.
+    """
+    slot_number: int
+    path: Path
+    player_data: Mapping[str, Any]
+    npc_states: Tuple[Mapping[str, Any], ...]
+    current_map_id: str
+    timestamp: int
+    inventory: Tuple[Mapping[str, Any], ...] = ()
+    game_version: str = GAME_VERSION
+
+    @classmethod
+    def capture(cls, slot_number: int, path: Path, player_data: Dict[str, Any],
+                npc_states: List[Dict[str, Any]], current_map_id: str, timestamp: int,
+                inventory: Optional[List[Dict[str, Any]]] = None) -> "SaveSnapshot":
+        """Freeze every given record (the game itself captures through `SaveRecordCache`)."""
+        return cls(slot_number=slot_number, path=Path(path), player_data=_freeze(player_data),
+                   npc_states=tuple(_freeze(npc) for npc in npc_states),
+                   current_map_id=current_map_id, timestamp=timestamp,
+                   inventory=tuple(_freeze(slot) for slot in inventory or []))
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "player_data": dict(self.player_data),
+            "npc_states": [dict(npc) for npc in self.npc_states],
+            "inventory": [dict(slot) for slot in self.inventory],
+            "current_map_id": self.current_map_id,
+            "timestamp": self.timestamp,
+            "game_version": self.game_version
+        }
+
+
+class SaveRecordCache:
+    """Frozen NPC and inventory records of the previous capture, refreshed only where something changed.
+
+    The game reports what changed since the last capture (`SpawnManager.take_npc_changes`,
+    `Inventory.version`), so a capture freezes only those records and shares the frozen ones, and
+    even the NPC tuple itself, with the previous snapshot. Its cost follows the number of changes,
+    not the size of the world.
+    """
+
+    def __init__(self):
+        self.npcs: Dict[str, Mapping[str, Any]] = {}
+        self._npc_records: Optional[Tuple[Mapping[str, Any], ...]] = ()
+        self.inventory: Tuple[Mapping[str, Any], ...] = ()
+        self._inventory_key: Any = None
+
+    def update_npcs(self, changes: Dict[str, Optional[Dict[str, Any]]], reset: bool = False):
+        """Apply NPC states by entity ID (None = the NPC has no saved state any more).
+
+        With `reset` the changes hold every NPC and replace the cached records.
+        """
+        if reset:
+            old_records, self.npcs, self._npc_records = self.npcs, {}, None
+        else:
+            old_records = self.npcs
+        for entity_id, state in changes.items():
+            old = old_records.get(entity_id)
+            if state is None:
+                if self.npcs.pop(entity_id, None) is not None:
+                    self._npc_records = None
+            elif old is None or old != state:
+                self.npcs[entity_id] = _freeze(state)
+                self._npc_records = None
+            elif reset:
+                self.npcs[entity_id] = old
+
+    def update_inventory(self, key: Any, get_records: Callable[[], List[Dict[str, Any]]]):
+        """Re-read the inventory records only if `key` (e.g. inventory identity and version) changed."""
+        if key != self._inventory_key:
+            self.inventory = _share_records(get_records(), self.inventory, lambda r: (r["row"], r["col"]))
+            self._inventory_key = key
+
+    def snapshot(self, slot_number: int, path: Path, player_data: Dict[str, Any], current_map_id: str,
+                 timestamp: int) -> SaveSnapshot:
+        if self._npc_records is None:
+            self._npc_records = tuple(self.npcs.values())
+        return SaveSnapshot(slot_number=slot_number, path=Path(path), player_data=_freeze(player_data),
+                            npc_states=self._npc_records, current_map_id=current_map_id, timestamp=timestamp,
+                            inventory=self.inventory)
+
+
+def write_save(snapshot: SaveSnapshot, fp: BinaryIO):
+    """Binary format for `.sav` slots, legacy JSON for `.json` ones."""
+    write_for_path(snapshot.to_dict(), snapshot.path, fp)
+
+
+@contextmanager
+def atomic_writer(path: Path) -> Iterator[BinaryIO]:
+    """Stream into a temp file next to `path`; on success fsync it and atomically replace `path` with it.
+
+    A crash at any point leaves either the old file or the new one, never a half-written slot.
+    """
+    path = Path(path)
+    fd, tmp_name = tempfile.mkstemp(prefix=f".{path.name}.", suffix=".tmp", dir=str(path.parent))
+    try:
+        with os.fdopen(fd, "wb") as f:
+            yield f
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_name, path)
+    except BaseException:
+        try:
+            os.unlink(tmp_name)
+        except OSError:
+            pass
+        raise
+
+    # Utrwalenie wpisu katalogu po os.replace (tylko POSIX)
+    if hasattr(os, "O_DIRECTORY"):
+        try:
+            dir_fd = os.open(str(path.parent), os.O_RDONLY | os.O_DIRECTORY)
+            try:
+                os.fsync(dir_fd)
+            finally:
+                os.close(dir_fd)
+        except OSError:
+            pass
+
+
+def write_atomic(path: Path, data: bytes):
+    with atomic_writer(path) as f:
+        f.write(data)
+
+
+@dataclass(frozen=True)
+class SaveResult:
+    slot_number: int
+    path: Path
+    error: Optional[BaseException] = None
+    elapsed: float = 0.0
+
+    @property
+    def ok(self) -> bool:
+        return self.error is None
+
+
+class SaveWriter:
+    """Serializes and writes save snapshots on a background thread.
+
+    Completion callbacks are not called from the worker thread; they are queued and delivered by
+    `poll()`, which the game loop calls once per frame, so they may safely touch pygame and the UI.
+    """
+
+    def __init__(self, encoder: Callable[[SaveSnapshot, BinaryIO], None] = write_save):
+        self.encoder = encoder
+        self._jobs: "queue.Queue[Optional[Tuple[SaveSnapshot, Optional[Callable[[SaveResult], None]], Callable[[SaveSnapshot], Any]]]]" = queue.Queue()
+        self._completed: "queue.Queue[Tuple[Optional[Callable[[SaveResult], None]], SaveResult]]" = queue.Queue()
+        self._thread: Optional[threading.Thread] = None
+
+    def _ensure_worker(self):
+        if self._thread is None or not self._thread.is_alive():
+            self._thread = threading.Thread(target=self._worker, name="SaveWriter", daemon=True)
+            self._thread.start()
+
+    def write_full(self, snapshot: SaveSnapshot):
+        with atomic_writer(snapshot.path) as f:
+            self.encoder(snapshot, f)
+
+    def submit(self, snapshot: SaveSnapshot, on_done: Optional[Callable[[SaveResult], None]] = None,
+               write: Optional[Callable[[SaveSnapshot], Any]] = None):
+        """Queue a snapshot. `write` runs on the worker thread; by default the whole slot file is replaced."""
+        self._ensure_worker()
+        self._jobs.put((snapshot, on_done, write or self.write_full))
+
+    def _worker(self):
+        while True:
+            job = self._jobs.get()
+            if job is None:
+                self._jobs.task_done()
+                return
+            snapshot, on_done, write = job
+            started = time.perf_counter()
+            try:
+                write(snapshot)
+                result = SaveResult(snapshot.slot_number, snapshot.path, elapsed=time.perf_counter() - started)
+            except Exception as e:
+                result = SaveResult(snapshot.slot_number, snapshot.path, error=e,
+                                    elapsed=time.perf_counter() - started)
+            self._completed.put((on_done, result))
+            self._jobs.task_done()
+
+    def poll(self):
+        """Deliver finished saves to their callbacks. Call from the main thread."""
+        while True:
+            try:
+                on_done, result = self._completed.get_nowait()
+            except queue.Empty:
+                return
+            if on_done:
+                on_done(result)
+
+    def shutdown(self):
+        """Finish every queued save, stop the worker and deliver the remaining callbacks."""
+        if self._thread is not None and self._thread.is_alive():
+            self._jobs.put(None)
+            self._thread.join()
+        self._thread = None
+        self.poll()
+
+
+class SaveSlotIndex:
+    """Sidecar metadata for every save slot (`saves/slots_index.json`).
+
+    Each entry holds what the slot list shows (player name, level, map, save time) plus the size,
+    mtime and checksum of the slot files, so the Load Game screen never has to open a save payload.
+    Updated from the SaveWriter worker after every write, read from the main thread. Entries that
+    lack any of `REQUIRED_KEYS` (hand-edited or partly written index) are dropped when the index is
+    read, so their slots are parsed and re-indexed like slots without an entry.
+    """
+    REQUIRED_KEYS = ("file", "stamp", "player_name", "level", "map_id")
+
+    def __init__(self, save_dir: Path):
+        self.path = Path(save_dir) / INDEX_FILENAME
+        self._entries: Optional[Dict[int, Dict[str, Any]]] = None
+        self._lock = threading.Lock()
+
+    def _load(self) -> Dict[int, Dict[str, Any]]:
+        if self._entries is None:
+            try:
+                with open(self.path, 'r', encoding='utf-8') as f:
+                    self._entries = {int(slot): entry for slot, entry in json.load(f).items()
+                                     if isinstance(entry, dict) and all(key in entry for key in self.REQUIRED_KEYS)}
+            except FileNotFoundError:
+                self._entries = {}
+            except (OSError, ValueError, AttributeError) as e:
+                print(f"[WARNING] SaveSlotIndex: Could not read {self.path} ({e}), it will be rebuilt")
+                self._entries = {}
+        return self._entries
+
+    def slots(self) -> List[int]:
+        with self._lock:
+            return sorted(self._load())
+
+    def get(self, slot_number: int) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            entry = self._load().get(slot_number)
+            return dict(entry) if entry else None
+
+    def update(self, slot_number: int, entry: Dict[str, Any]):
+        with self._lock:
+            entries = self._load()
+            entries[slot_number] = entry
+            data = json.dumps({str(slot): e for slot, e in sorted(entries.items())}, indent=2, ensure_ascii=False)
+            write_atomic(self.path, data.encode("utf-8"))
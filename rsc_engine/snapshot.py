@@ -0,0 +1,78 @@
+# rsc_engine/snapshot.py
+"""In-memory world snapshots: capture the running world and restore it in place (e.g. "retry fight")."""
+import copy
+import time
+from dataclasses import dataclass
+from typing import TYPE_CHECKING, Any, Dict, List, Optional, Tuple
+
+import pygame
+
+if TYPE_CHECKING:
+    from rsc_engine.game import Game
+    from rsc_engine.entity import Entity
+    from rsc_engine.tilemap import TileMap
+
+# Atrybuty, których nie kopiujemy: przynależność do grup sprite'ów i zasoby współdzielone
+_SHARED_ATTRS = frozenset({"game", "image", "_Sprite__g"})
+
+
+def _copy_value(value: Any) -> Any:
+    # Referencje do encji, grafik i callbacków zostają; kopiujemy tylko kontenery i Recty
+    if isinstance(value, pygame.Rect):
+        return value.copy()
+    if isinstance(value, (list, dict, set)):
+        return copy.copy(value)
+    return value
+
+
+def _entity_state(entity: "Entity") -> Dict[str, Any]:
+    return {name: _copy_value(value) for name, value in vars(entity).items() if name not in _SHARED_ATTRS}
+
+
+@dataclass
+class WorldSnapshot:
+    """State of the live world, keeping references to the same game objects.
+
+    Entities are restored in place (their attributes are reset), so sprites and their images are
+    reused rather than reloaded. Only valid within the gameplay session it was captured in: after
+    GameplayState.on_enter rebuilds the world, `Game.restore_world_snapshot` refuses it.
+    """
+    entity_group: pygame.sprite.Group
+    tilemap: "TileMap"
+    entities: List[Tuple["Entity", Dict[str, Any]]]
+    inventory_slots: Any
+    camera_rect: pygame.Rect
+    spawn_state: Optional[Dict[str, Any]]
+    ground_state: Optional[Dict[str, Any]]
+    captured_at: float
+
+    @classmethod
+    def capture(cls, game: "Game") -> "WorldSnapshot":
+        return cls(entity_group=game.entities, tilemap=game.tilemap,
+                   entities=[(entity, _entity_state(entity)) for entity in game.entities],
+                   inventory_slots=game.inventory.snapshot_slots() if game.inventory else None,
+                   camera_rect=game.camera.rect.copy(),
+                   spawn_state=game.spawn_manager.snapshot_state() if game.spawn_manager else None,
+                   ground_state=game.ground_items.snapshot_state() if game.ground_items else None,
+                   captured_at=time.perf_counter())
+
+    def is_valid_for(self, game: "Game") -> bool:
+        return game.entities is self.entity_group
+
+    def restore(self, game: "Game"):
+        game.tilemap = self.tilemap
+        game.entities.empty()
+        for entity, state in self.entities:
+            shared = {name: value for name, value in vars(entity).items() if name in _SHARED_ATTRS}
+            entity.__dict__.clear()
+            entity.__dict__.update(shared)
+            entity.__dict__.update({name: _copy_value(value) for name, value in state.items()})
+            game.entities.add(entity)
+        if self.inventory_slots is not None and game.inventory:
+            game.inventory.restore_slots(self.inventory_slots)
+        game.camera.rect.update(self.camera_rect)
+        if self.spawn_state is not None and game.spawn_manager:
+            game.spawn_manager.restore_state(self.spawn_state)
+        if self.ground_state is not None and game.ground_items:
+            game.ground_items.restore_state(self.ground_state)
+        game.damage_splats.clear()
@@ -0,0 +1,348 @@
+# rsc_engine/spawns.py
+"""Data-driven NPC spawn tables with lazy, region-based instantiation."""
+import pygame
+from pathlib import Path
+from typing import TYPE_CHECKING, Optional, List, Dict, Any, Set, Tuple
+
+from rsc_engine import constants as C
+from rsc_engine.data_cache import DataError, load_data
+from rsc_engine.entity import NPC, FriendlyNPC, HostileNPC
+from rsc_engine.timers import Timer
+from rsc_engine.utils import screen_to_iso
+
+if TYPE_CHECKING:
+    from rsc_engine.game import Game
+
+NPC_CLASSES = {"FriendlyNPC": FriendlyNPC, "HostileNPC": HostileNPC}
+SPAWNS_PATH = C.DATA / "npc_spawns.json"
+
+
+def npc_state_dict(entity: NPC) -> Dict[str, Any]:
+    """Serializable state of a single NPC (same layout as the `npc_states` entries in save files)."""
+    npc_data = {
+        "entity_id": entity.entity_id,
+        "name": entity.name,
+        "ix": entity.ix,
+        "iy": entity.iy,
+        "hp": entity.hp,
+        "max_hp": entity.max_hp,
+        "is_alive": entity.is_alive,
+        "level": entity.level,
+        "type": entity.__class__.__name__
+    }
+    if isinstance(entity, HostileNPC):
+        npc_data["show_hp_bar"] = entity.show_hp_bar
+        npc_data["is_chasing"] = entity.is_chasing
+    return npc_data
+
+
+class SpawnManager:
+    """Owns the NPC spawn table of the current map.
+
+    Spawn points are indexed by map region (`C.SPAWN_REGION_SIZE` tiles square). An NPC object
+    (including its sprite) is only created when its region comes within `C.SPAWN_ACTIVATION_RADIUS`
+    regions of the player or the camera. When a region goes cold its NPCs are parked: their state is
+    kept as a plain dict and the sprite object is dropped from `game.entities`.
+
+    A dead NPC comes back at its spawn point after `respawn_time` seconds of game time (spawn table
+    field, default `C.NPC_RESPAWN_TIME`, negative disables it); the respawn is a timer on
+    `game.timers`, so it fires whether the NPC is live or parked.
+    """
+
+    def __init__(self, game: "Game", spawns_path: Path = SPAWNS_PATH):
+        self.game = game
+        self.spawns_path = Path(spawns_path)
+        self.region_size = C.SPAWN_REGION_SIZE
+        self.activation_radius = C.SPAWN_ACTIVATION_RADIUS
+
+        self._spawn_tables: Optional[Dict[str, List[Dict[str, Any]]]] = None
+        self._images: Dict[str, pygame.Surface] = {}
+
+        self.map_id: Optional[str] = None
+        self.spawn_definitions: Dict[str, Dict[str, Any]] = {}
+        self.regions: Dict[Tuple[int, int], List[str]] = {}
+        self.parked_states: Dict[str, Dict[str, Any]] = {}
+        self.live_npcs: Dict[str, NPC] = {}
+        self.active_regions: Set[Tuple[int, int]] = set()
+        self._focus_regions: Optional[Set[Tuple[int, int]]] = None
+        self._regions_to_park: Set[Tuple[int, int]] = set()  # zimne regiony, których NPC jeszcze walczą
+        # Dla zapisu gry: zaparkowane stany zmienione od ostatniego take_npc_changes (albo wszystko naraz)
+        self._save_dirty: Set[str] = set()
+        self._save_reset = True
+        self._respawn_timers: Dict[str, Timer] = {}
+
+    def _load_spawn_tables(self) -> Dict[str, List[Dict[str, Any]]]:
+        if self._spawn_tables is None:
+            try:
+                self._spawn_tables = load_data(self.spawns_path)
+                print(f"[INFO] SpawnManager: Loaded spawn tables for {len(self._spawn_tables)} map(s) "
+                      f"from {self.spawns_path}")
+            except FileNotFoundError:
+                print(f"[ERROR] SpawnManager: Spawn table file not found at {self.spawns_path}")
+                self._spawn_tables = {}
+            except DataError as e:
+                print(f"[ERROR] SpawnManager: Error decoding JSON from {self.spawns_path}: {e}")
+                self._spawn_tables = {}
+        return self._spawn_tables
+
+    def region_of(self, ix: int, iy: int) -> Tuple[int, int]:
+        return ix // self.region_size, iy // self.region_size
+
+    def load_map(self, map_id: str, saved_npc_states: Optional[List[Dict[str, Any]]] = None):
+        """Index the spawn table of `map_id`. Saved NPC states override the table entries."""
+        self.unload()
+        self.map_id = map_id
+
+        for spawn_def in self._load_spawn_tables().get(map_id, []):
+            entity_id = spawn_def.get("entity_id")
+            if not entity_id or spawn_def.get("type") not in NPC_CLASSES:
+                print(f"[WARNING] SpawnManager: Skipping invalid spawn definition in map '{map_id}': {spawn_def}")
+                continue
+            self.spawn_definitions[entity_id] = spawn_def
+
+        for npc_data in saved_npc_states or []:
+            entity_id = npc_data.get("entity_id")
+            if not entity_id: continue
+            if entity_id not in self.spawn_definitions:
+                if npc_data.get("type") not in NPC_CLASSES: continue
+                # NPC spoza tabeli spawnów (np. ze starszego zapisu) - jego stan staje się definicją
+                self.spawn_definitions[entity_id] = dict(npc_data)
+            self.parked_states[entity_id] = dict(npc_data)
+
+        for entity_id, spawn_def in self.spawn_definitions.items():
+            state = self.parked_states.get(entity_id, spawn_def)
+            region = self.region_of(state.get("ix", spawn_def["ix"]), state.get("iy", spawn_def["iy"]))
+            self.regions.setdefault(region, []).append(entity_id)
+        self._schedule_missing_respawns()
+
+        print(f"[INFO] SpawnManager: Map '{map_id}' has {len(self.spawn_definitions)} spawn point(s) "
+              f"in {len(self.regions)} region(s)")
+
+    def unload(self):
+        """Drop every live NPC and forget the current map."""
+        if self.game.entities is not None:
+            for npc in self.live_npcs.values():
+                self.game.entities.remove(npc)
+        for timer in self._respawn_timers.values():
+            self.game.timers.cancel(timer)
+        self._respawn_timers = {}
+        self.map_id = None
+        self.spawn_definitions = {}
+        self.regions = {}
+        self.parked_states = {}
+        self.live_npcs = {}
+        self.active_regions = set()
+        self._focus_regions = None
+        self._regions_to_park = set()
+        self._save_reset = True
+
+    def _focus_points(self) -> List[Tuple[int, int]]:
+        points = []
+        if self.game.player:
+            points.append((self.game.player.ix, self.game.player.iy))
+        if self.game.camera:
+            points.append(screen_to_iso(*self.game.camera.rect.center))
+        return points
+
+    def update(self):
+        """Activate regions near the player/camera and park the ones that went cold.
+
+        Cheap when nothing changes: the region sets are only recomputed when a focus point
+        (player tile or camera centre tile) crosses a region boundary. A cold region whose NPC was
+        still fighting stays active and parking it is retried every update until it succeeds.
+        """
+        if self.map_id is None: return
+        focus_regions = {self.region_of(ix, iy) for ix, iy in self._focus_points()}
+        if focus_regions == self._focus_regions:
+            if self._regions_to_park: self._park_cold_regions()
+            return
+        self._focus_regions = focus_regions
+
+        r = self.activation_radius
+        hot_regions = {(rx + dx, ry + dy)
+                       for rx, ry in focus_regions
+                       for dx in range(-r, r + 1)
+                       for dy in range(-r, r + 1)}
+
+        self._regions_to_park = self.active_regions - hot_regions
+        self._park_cold_regions()
+        for region in hot_regions - self.active_regions:
+            self.active_regions.add(region)
+            for entity_id in self.regions.get(region, []):
+                if entity_id not in self.live_npcs:
+                    self._spawn(entity_id)
+
+    def _park_cold_regions(self):
+        for region in list(self._regions_to_park):
+            if self._park_region(region):
+                self.active_regions.discard(region)
+                self._regions_to_park.discard(region)
+
+    def _park_region(self, region: Tuple[int, int]) -> bool:
+        """Park every NPC of `region`. Returns False if some NPC is busy and has to stay live."""
+        fully_parked = True
+        for entity_id in list(self.regions.get(region, [])):
+            npc = self.live_npcs.get(entity_id)
+            if npc is None: continue
+            if npc.in_combat:
+                fully_parked = False
+                continue
+            state = npc_state_dict(npc)
+            self.parked_states[entity_id] = state
+            self._save_dirty.add(entity_id)
+            del self.live_npcs[entity_id]
+            if self.game.entities is not None:
+                self.game.entities.remove(npc)
+
+            new_region = self.region_of(state["ix"], state["iy"])
+            if new_region != region:
+                self.regions[region].remove(entity_id)
+                self.regions.setdefault(new_region, []).append(entity_id)
+                if new_region in self.active_regions:
+                    self._spawn(entity_id)
+        return fully_parked
+
+    def _get_image(self, image_file: str) -> pygame.Surface:
+        image = self._images.get(image_file)
+        if image is None:
+            try:
+                img_orig = self.game._load_image(image_file)
+                image = self.game._scale_image_proportionally(img_orig, C.TARGET_CHAR_HEIGHT)
+            except (pygame.error, FileNotFoundError) as e:
+                print(f"[ERROR] SpawnManager: Could not load NPC image '{image_file}': {e}. Using placeholder.")
+                image = pygame.Surface((C.TARGET_CHAR_HEIGHT, C.TARGET_CHAR_HEIGHT), pygame.SRCALPHA)
+                image.fill((100, 100, 100, 150))
+            self._images[image_file] = image
+        return image
+
+    def _spawn(self, entity_id: str) -> Optional[NPC]:
+        spawn_def = self.spawn_definitions[entity_id]
+        state = self.parked_states.get(entity_id)
+        if state is not None and not state.get("is_alive", True):
+            return None
+
+        npc_class = NPC_CLASSES[spawn_def["type"]]
+        data = dict(spawn_def)
+        if state:
+            data.update(state)
+        default_image = "friendly_npc.png" if npc_class == FriendlyNPC else "hostile_npc.png"
+
+        npc_args = {"game": self.game, "name": data.get("name", entity_id), "ix": data["ix"], "iy": data["iy"],
+                    "image": self._get_image(spawn_def.get("image_file", default_image)),
+                    "entity_id": entity_id, "level": data.get("level", 1),
+                    "max_hp": data.get("max_hp", 30), "attack_speed": data.get("attack_speed", 2.0)}
+        if npc_class == FriendlyNPC:
+            npc_args["dialogue"] = data.get("dialogue")
+        elif npc_class == HostileNPC:
+            npc_args["attack_power"] = data.get("attack_power", 5)
+            npc_args["defense"] = data.get("defense", 1)
+            npc_args["aggro_radius"] = data.get("aggro_radius", 5)
+
+        npc = npc_class(**npc_args)
+        if state:
+            npc.hp = state.get("hp", npc.max_hp)
+        if isinstance(npc, HostileNPC):
+            # Punkt powrotu to zawsze punkt spawnu, nie ostatnia zapisana pozycja
+            npc.start_ix, npc.start_iy = spawn_def["ix"], spawn_def["iy"]
+            if state:
+                npc.show_hp_bar = state.get("show_hp_bar", False)
+                npc.is_chasing = state.get("is_chasing", False)
+
+        self.live_npcs[entity_id] = npc
+        if self.game.entities is not None:
+            self.game.entities.add(npc)
+        return npc
+
+    def schedule_respawn(self, entity_id: str):
+        """Bring NPC `entity_id` back at its spawn point after its respawn time (called when it dies)."""
+        spawn_def = self.spawn_definitions.get(entity_id)
+        if spawn_def is None: return
+        delay = spawn_def.get("respawn_time", C.NPC_RESPAWN_TIME)
+        if delay < 0: return
+        old_timer = self._respawn_timers.get(entity_id)
+        if old_timer is not None:
+            self.game.timers.cancel(old_timer)
+        self._respawn_timers[entity_id] = self.game.timers.schedule(delay, self._respawn, entity_id)
+
+    def _schedule_missing_respawns(self):
+        # Martwi NPC z wczytanego zapisu albo z przywróconej migawki, którzy nie mają jeszcze timera
+        dead = [entity_id for entity_id, state in self.parked_states.items() if not state.get("is_alive", True)]
+        dead += [entity_id for entity_id, npc in self.live_npcs.items() if not npc.is_alive]
+        for entity_id in dead:
+            if entity_id not in self._respawn_timers:
+                self.schedule_respawn(entity_id)
+
+    def _respawn(self, entity_id: str):
+        self._respawn_timers.pop(entity_id, None)
+        npc = self.live_npcs.get(entity_id)
+        if npc is not None:
+            if npc.is_alive: return  # np. przywrócony migawką świata
+            del self.live_npcs[entity_id]
+            if self.game.entities is not None:
+                self.game.entities.remove(npc)
+        elif self.parked_states.get(entity_id, {}).get("is_alive", True):
+            return
+        self.parked_states.pop(entity_id, None)
+        self._save_dirty.add(entity_id)
+
+        for ids in self.regions.values():
+            if entity_id in ids:
+                ids.remove(entity_id)
+                break
+        spawn_def = self.spawn_definitions[entity_id]
+        region = self.region_of(spawn_def["ix"], spawn_def["iy"])
+        self.regions.setdefault(region, []).append(entity_id)
+        if region in self.active_regions:
+            self._spawn(entity_id)
+        print(f"[INFO] SpawnManager: '{entity_id}' respawned")
+
+    def snapshot_state(self) -> Dict[str, Any]:
+        """Bookkeeping needed to undo spawns/parking made after a world snapshot (NPC objects are kept)."""
+        return {"map_id": self.map_id,
+                "spawn_definitions": self.spawn_definitions,
+                "regions": {region: list(ids) for region, ids in self.regions.items()},
+                "parked_states": {entity_id: dict(state) for entity_id, state in self.parked_states.items()},
+                "live_npcs": dict(self.live_npcs),
+                "active_regions": set(self.active_regions),
+                "focus_regions": set(self._focus_regions) if self._focus_regions is not None else None,
+                "regions_to_park": set(self._regions_to_park)}
+
+    def restore_state(self, state: Dict[str, Any]):
+        self.map_id = state["map_id"]
+        self.spawn_definitions = state["spawn_definitions"]
+        self.regions = {region: list(ids) for region, ids in state["regions"].items()}
+        self.parked_states = {entity_id: dict(s) for entity_id, s in state["parked_states"].items()}
+        self.live_npcs = dict(state["live_npcs"])
+        self.active_regions = set(state["active_regions"])
+        self._focus_regions = set(state["focus_regions"]) if state["focus_regions"] is not None else None
+        self._regions_to_park = set(state.get("regions_to_park", ()))
+        self._save_reset = True
+        self._schedule_missing_respawns()
+
+    def take_npc_changes(self) -> Tuple[bool, Dict[str, Optional[Dict[str, Any]]]]:
+        """NPC save states that may have changed since the previous call, for `SaveRecordCache`.
+
+        Returns (reset, changes by entity ID). After a map load or a restored world snapshot `reset`
+        is True and the changes hold every NPC. Otherwise they hold the parked states that changed
+        (None for an NPC that no longer has one) plus every live NPC: there are few of those and
+        they change all the time.
+        """
+        self._save_dirty, dirty = set(), self._save_dirty
+        if self._save_reset:
+            self._save_reset = False
+            return True, {state["entity_id"]: state for state in self.npc_states()}
+        changes = {entity_id: self.parked_states.get(entity_id) for entity_id in dirty}
+        for entity_id, npc in self.live_npcs.items():
+            changes[entity_id] = npc_state_dict(npc)
+        return False, changes
+
+    def npc_states(self) -> List[Dict[str, Any]]:
+        """States of every parked and every live NPC, for saving.
+
+        NPCs that were never instantiated are left out (the spawn table recreates them), but a parked
+        or live NPC is saved even if it still matches its spawn definition.
+        """
+        states = dict(self.parked_states)
+        for entity_id, npc in self.live_npcs.items():
+            states[entity_id] = npc_state_dict(npc)
+        return list(states.values())
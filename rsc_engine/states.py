@@ -2,6 +2,8 @@
 import pygame
 from abc import ABC, abstractmethod
 from rsc_engine import constants as C
+from rsc_engine.fonts import get_font
+from rsc_engine.text_cache import render_text
 
 # Aby uniknąć importów cyklicznych dla type hinting
 from typing import TYPE_CHECKING, Optional, List, Dict, Any, Callable
@@ -40,11 +42,25 @@ class BaseState(ABC):
         print(f"[DEBUG] Exiting state: {self.__class__.__name__}")
         return None
 
+    def on_pause(self):
+        """Called when another state is pushed on top of this one. The state keeps all of its data."""
+        print(f"[DEBUG] Pausing state: {self.__class__.__name__}")
+
+    def on_resume(self, data_from_popped_state=None):
+        """Called when the state above this one is popped and this state becomes active again."""
+        print(f"[DEBUG] Resuming state: {self.__class__.__name__} with data: {data_from_popped_state}")
+
 
 class GameStateManager:
+    """Stack of game states.
+
+    `set_state` replaces the whole stack, `push_state` suspends the active state under a new one
+    (e.g. the pause menu over gameplay) and `pop_state` resumes the state below without re-entering it.
+    """
     def __init__(self, initial_state_key: Optional[str], game: "Game"): # initial_state_key może być None
         self.game = game
         self.states: dict[str, BaseState] = {}
+        self.state_stack: list[tuple[str, BaseState]] = []
         self.active_state: BaseState | None = None
         self.active_state_key: str = ""
         self.initial_state_to_set_after_registration = initial_state_key
@@ -54,17 +70,56 @@ class GameStateManager:
         self.states[key] = state
         print(f"[DEBUG] GameStateManager: Registered state '{key}'")
 
-    def set_state(self, key: str, data_for_next_state=None):
-        if self.active_state:
-            self.active_state.on_exit()
-
-        if key in self.states:
-            print(f"[DEBUG] GameStateManager: Attempting to set state to '{key}'")
-            self.active_state_key = key
-            self.active_state = self.states[key]
-            self.active_state.on_enter(data_for_next_state)
+    def _sync_active_state(self):
+        if self.state_stack:
+            self.active_state_key, self.active_state = self.state_stack[-1]
         else:
+            self.active_state_key, self.active_state = "", None
+
+    def set_state(self, key: str, data_for_next_state=None):
+        if key not in self.states:
             print(f"[ERROR] GameStateManager: State '{key}' not found upon trying to set!")
+            return
+
+        # Wyjście ze wszystkich stanów na stosie, od góry
+        while self.state_stack:
+            _, state = self.state_stack.pop()
+            state.on_exit()
+
+        print(f"[DEBUG] GameStateManager: Attempting to set state to '{key}'")
+        self.state_stack.append((key, self.states[key]))
+        self._sync_active_state()
+        self.active_state.on_enter(data_for_next_state)
+
+    def push_state(self, key: str, data_for_next_state=None):
+        if key not in self.states:
+            print(f"[ERROR] GameStateManager: State '{key}' not found upon trying to push!")
+            return
+        if any(stacked_key == key for stacked_key, _ in self.state_stack):
+            print(f"[ERROR] GameStateManager: State '{key}' is already on the stack!")
+            return
+
+        if self.active_state:
+            self.active_state.on_pause()
+        print(f"[DEBUG] GameStateManager: Pushing state '{key}'")
+        self.state_stack.append((key, self.states[key]))
+        self._sync_active_state()
+        self.active_state.on_enter(data_for_next_state)
+
+    def pop_state(self, data_for_resumed_state=None):
+        if len(self.state_stack) < 2:
+            print("[ERROR] GameStateManager: No suspended state to return to!")
+            return
+
+        popped_key, popped_state = self.state_stack.pop()
+        popped_state.on_exit()
+        self._sync_active_state()
+        print(f"[DEBUG] GameStateManager: Popped '{popped_key}', resuming '{self.active_state_key}'")
+        self.active_state.on_resume(data_for_resumed_state)
+
+    def is_state_loaded(self, key: str) -> bool:
+        """True if the state is active or suspended somewhere on the stack."""
+        return any(stacked_key == key for stacked_key, _ in self.state_stack)
 
     def handle_events(self, events: list[pygame.event.Event]):
         if self.active_state:
@@ -79,8 +134,8 @@ class GameStateManager:
             self.active_state.draw(surface)
         else:
             surface.fill((0,0,0))
-            font = pygame.font.SysFont("Consolas", 20)
-            text = font.render("No active state or state not registered!", True, (255,0,0))
+            font = get_font("Consolas", 20)
+            text = render_text(font, "No active state or state not registered!", True, (255,0,0))
             rect = text.get_rect(center=(surface.get_width()//2, surface.get_height()//2))
             surface.blit(text, rect)
 
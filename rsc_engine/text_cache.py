@@ -0,0 +1,71 @@
+# rsc_engine/text_cache.py
+"""LRU cache of rendered text surfaces, so labels that don't change are rasterized only once.
+
+`render_text(font, text, antialias, color)` takes the same arguments as `Font.render` (font first)
+and returns a shared Surface: callers blit it but must not draw on it. Entries are keyed by
+`(font, text, antialias, color)`; fonts come from the font registry, so equal fonts are the same
+object. The least recently used surfaces are evicted once their pixel data exceeds the byte
+budget (`C.TEXT_CACHE_BYTES`).
+"""
+from collections import OrderedDict
+from typing import Any, Tuple
+
+import pygame
+
+from rsc_engine import constants as C
+from rsc_engine.metrics import metrics
+
+TextKey = Tuple[pygame.font.Font, str, bool, Tuple[int, ...]]
+
+_hits = metrics.counter("text_cache_hits")
+_misses = metrics.counter("text_cache_misses")
+
+
+class TextCache:
+    def __init__(self, max_bytes: int = C.TEXT_CACHE_BYTES):
+        self.max_bytes = max_bytes
+        self.bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self._surfaces: "OrderedDict[TextKey, pygame.Surface]" = OrderedDict()
+
+    def __len__(self):
+        return len(self._surfaces)
+
+    @staticmethod
+    def _surface_bytes(surface: pygame.Surface) -> int:
+        return surface.get_width() * surface.get_height() * surface.get_bytesize()
+
+    def render(self, font: pygame.font.Font, text: str, antialias: bool, color: Any) -> pygame.Surface:
+        key = (font, text, antialias, tuple(color))
+        surface = self._surfaces.get(key)
+        if surface is not None:
+            self._surfaces.move_to_end(key)
+            self.hits += 1
+            _hits.inc()
+            return surface
+
+        self.misses += 1
+        _misses.inc()  # każde chybienie to jedno Font.render
+        surface = font.render(text, antialias, color)
+        size = self._surface_bytes(surface)
+        if size > self.max_bytes:
+            return surface  # większy niż cały budżet - nie wypychamy dla niego wszystkiego innego
+        self._surfaces[key] = surface
+        self.bytes += size
+        while self.bytes > self.max_bytes:
+            _, evicted = self._surfaces.popitem(last=False)
+            self.bytes -= self._surface_bytes(evicted)
+        return surface
+
+    def clear(self):
+        self._surfaces.clear()
+        self.bytes = 0
+
+
+text_cache = TextCache()
+
+
+def render_text(font: pygame.font.Font, text: str, antialias: bool, color: Any) -> pygame.Surface:
+    """Cached `font.render(text, antialias, color)`; the returned Surface is shared, don't modify it."""
+    return text_cache.render(font, text, antialias, color)
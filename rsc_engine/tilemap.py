@@ -27,18 +27,23 @@ class TileMap:
             reader = csv.reader(fp)
             return [[int(cell) for cell in row] for row in reader]
 
-    def draw(self, surface: pygame.Surface, camera):
-        """Draw visible portion of the map relative to camera."""
-        rows = len(self.layout)
-        cols = len(self.layout[0])
-        for iy in range(rows):
-            for ix in range(cols):
-                tile_id = self.layout[iy][ix]
+    def draw_commands(self, camera) -> list:
+        """Blit commands `(tile surface, position)` for the visible portion of the map."""
+        commands = []
+        tile_surfaces = self.tile_surfaces
+        cam_x, cam_y = camera.rect.x, camera.rect.y
+        for iy, row in enumerate(self.layout):
+            for ix, tile_id in enumerate(row):
                 if tile_id < 0:
                     continue  # skip empty
                 screen_x, screen_y = iso_to_screen(ix, iy)
-                screen_x -= camera.rect.x
-                screen_y -= camera.rect.y
+                screen_x -= cam_x
+                screen_y -= cam_y
                 if (screen_x > -C.TILE_WIDTH and screen_y > -C.TILE_HEIGHT
                     and screen_x < C.SCREEN_WIDTH and screen_y < C.SCREEN_HEIGHT):
-                    surface.blit(self.tile_surfaces[tile_id], (screen_x, screen_y))
+                    commands.append((tile_surfaces[tile_id], (screen_x, screen_y)))
+        return commands
+
+    def draw(self, surface: pygame.Surface, camera):
+        """Draw visible portion of the map relative to camera."""
+        surface.blits(self.draw_commands(camera), doreturn=False)
@@ -0,0 +1,125 @@
+# rsc_engine/timers.py
+"""Hierarchical timer wheel on the game clock.
+
+Subsystems schedule a callback for a moment of game time instead of counting a timer down every
+frame. The wheel has `levels` levels of `2**bits` slots each; level 0 slots are one tick
+(`resolution` seconds) wide and every next level is `2**bits` times coarser. A timer is filed in
+the finest level whose range covers its deadline and is moved down a level ("cascaded") when the
+wheel gets close to it, so advancing one tick touches one level 0 slot plus, every `2**bits`
+ticks, one slot of a coarser level. The cost of `advance` therefore follows the number of timers
+that fire, not the number of timers alive.
+
+Cooldowns that are only checked by code which runs anyway (attack and movement cooldowns of
+entities) don't need a callback: they store a deadline and compare it with `TimerWheel.now`.
+"""
+from typing import Any, Callable, List
+
+from rsc_engine import constants as C
+
+
+class Timer:
+    """Handle of a scheduled callback; pass it to `TimerWheel.cancel` to drop it."""
+    __slots__ = ("deadline", "tick", "callback", "args", "cancelled")
+
+    def __init__(self, deadline: float, tick: int, callback: Callable, args: tuple):
+        self.deadline = deadline
+        self.tick = tick
+        self.callback = callback
+        self.args = args
+        self.cancelled = False
+
+    @property
+    def active(self) -> bool:
+        return not self.cancelled
+
+    def __repr__(self):
+        state = "cancelled" if self.cancelled else f"tick {self.tick}"
+        return f"Timer({getattr(self.callback, '__qualname__', self.callback)}, at {self.deadline:.3f}, {state})"
+
+
+class TimerWheel:
+    """Game clock with scheduled callbacks. `advance(dt)` is called once per gameplay tick."""
+
+    def __init__(self, resolution: float = C.TIMER_RESOLUTION, bits: int = C.TIMER_WHEEL_BITS,
+                 levels: int = C.TIMER_WHEEL_LEVELS):
+        self.resolution = resolution
+        self.bits = bits
+        self.levels = levels
+        self._mask = (1 << bits) - 1
+        self._max_delta = (1 << (bits * levels)) - 1
+
+        self.now = 0.0
+        self.current_tick = 0
+        self.pending = 0  # zaplanowane, jeszcze nie wywołane (anulowane liczą się do czasu wyjęcia ze slotu)
+        self._wheel: List[List[List[Timer]]] = [[[] for _ in range(1 << bits)] for _ in range(levels)]
+
+    def _tick_of(self, deadline: float) -> int:
+        tick = int(deadline / self.resolution)
+        if tick * self.resolution < deadline:
+            tick += 1  # timer nie może wystrzelić przed swoim terminem
+        return max(tick, self.current_tick + 1)
+
+    def _file(self, timer: Timer):
+        delta = min(timer.tick - self.current_tick, self._max_delta)
+        level = 0
+        while delta >> (self.bits * (level + 1)):
+            level += 1
+        tick = self.current_tick + delta if delta < timer.tick - self.current_tick else timer.tick
+        self._wheel[level][(tick >> (self.bits * level)) & self._mask].append(timer)
+
+    def schedule_at(self, deadline: float, callback: Callable, *args: Any) -> Timer:
+        """Call `callback(*args)` once the game clock reaches `deadline` (seconds of game time)."""
+        timer = Timer(deadline, self._tick_of(deadline), callback, args)
+        self._file(timer)
+        self.pending += 1
+        return timer
+
+    def schedule(self, delay: float, callback: Callable, *args: Any) -> Timer:
+        """Call `callback(*args)` after `delay` seconds of game time."""
+        return self.schedule_at(self.now + delay, callback, *args)
+
+    def cancel(self, timer: Timer):
+        # Leniwe usuwanie: timer zostaje w slocie i jest pomijany, gdy wheel do niego dojdzie
+        timer.cancelled = True
+
+    def _cascade(self, level: int) -> bool:
+        """Move the timers of the current slot of `level` one or more levels down.
+
+        Returns True if the coarser level has to be cascaded as well (this slot index wrapped to 0).
+        """
+        index = (self.current_tick >> (self.bits * level)) & self._mask
+        slot = self._wheel[level][index]
+        if slot:
+            self._wheel[level][index] = []
+            for timer in slot:
+                if timer.cancelled:
+                    self.pending -= 1
+                else:
+                    self._file(timer)
+        return index == 0
+
+    def advance(self, dt: float) -> int:
+        """Move the clock forward by `dt` and fire every timer that came due. Returns how many fired."""
+        self.now += dt
+        target_tick = int(self.now / self.resolution)
+        fired = 0
+        while self.current_tick < target_tick:
+            if not self.pending:
+                self.current_tick = target_tick  # nic nie czeka - przeskocz od razu
+                break
+            self.current_tick += 1
+            index = self.current_tick & self._mask
+            if index == 0:
+                level = 1
+                while level < self.levels and self._cascade(level):
+                    level += 1
+            slot = self._wheel[0][index]
+            if not slot: continue
+            self._wheel[0][index] = []
+            for timer in slot:
+                self.pending -= 1
+                if timer.cancelled: continue
+                timer.cancelled = True  # wystrzelony timer nie jest już aktywny
+                timer.callback(*timer.args)
+                fired += 1
+        return fired
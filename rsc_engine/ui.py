@@ -1,87 +1,150 @@
 # file: rsc_engine/ui.py
 import pygame
 from rsc_engine import constants as C
+from rsc_engine.fonts import get_font
+from rsc_engine.text_cache import render_text
+from rsc_engine.metrics import metrics
 from typing import List, Any, Dict, Callable, Optional  # Upewnij się, że wszystkie są zaimportowane
 from pathlib import Path
 
 ASSETS_DIR = Path(__file__).resolve().parent / "assets"
 
 
-class DamageSplat:
-    def __init__(self, value: int, center_x: int, entity_top_y: int,
-                 icon_image: Optional[pygame.Surface],
-                 font: pygame.font.Font,
-                 game_camera):
-        self.game_camera = game_camera
-        self.initial_entity_top_y = entity_top_y
-        self.initial_center_x = center_x
-
-        self.value = value
-        self.icon = icon_image
-        self.font = font
-
-        self.text_color = (255, 255, 255)
-        if self.value == 0:
-            self.text_color = (180, 180, 200)
-
-        self.text_surface = self.font.render(str(self.value), True, self.text_color)
-
-        self.lifetime = 1.2
-        self.alpha = 255
-        self.vertical_speed = 30
-        self.fade_speed = 255 / (self.lifetime if self.lifetime > 0 else 0.1)
-
-        self.current_y_offset = 0
-
-        self.icon_width = self.icon.get_width() if self.icon else 0
-        self.icon_height = self.icon.get_height() if self.icon else 0
-        self.text_width = self.text_surface.get_width()
-        self.text_height = self.text_surface.get_height()
-
-        self.base_x = self.initial_center_x - self.icon_width // 2
-        self.base_y = self.initial_entity_top_y - self.icon_height
-        self.current_icon_surface = None
-
-    def update(self, dt: float) -> bool:
-        self.lifetime -= dt
-        if self.lifetime <= 0:
-            return False
+_splat_text_hits = metrics.counter("splat_text_cache_hits")
+_splat_text_misses = metrics.counter("splat_text_cache_misses")
+_splats_alive = metrics.gauge("splats_alive")
 
-        self.current_y_offset += self.vertical_speed * dt
-        new_alpha_val = max(0, self.alpha - self.fade_speed * dt)
 
-        if self.icon:
-            if int(self.alpha) != int(new_alpha_val) or self.current_icon_surface is None:
-                self.current_icon_surface = self.icon.copy()
-                self.current_icon_surface.set_alpha(int(new_alpha_val))
-
-        self.alpha = new_alpha_val
-
-        if self.alpha < 50 and self.text_surface:
-            self.text_surface = None
-
-        return True
-
-    def draw(self, surface: pygame.Surface):
-        draw_x = self.base_x
-        draw_y = self.base_y - int(self.current_y_offset)
-
-        icon_to_draw = self.current_icon_surface if self.current_icon_surface is not None else self.icon
-
-        if icon_to_draw:
-            surface.blit(icon_to_draw, (draw_x, draw_y))
-
-        if self.text_surface:
-            text_x = draw_x + (self.icon_width - self.text_width) // 2
-            text_y = draw_y + (self.icon_height - self.text_height) // 2
-            surface.blit(self.text_surface, (text_x, text_y))
+class DamageSplat:
+    """One damage number rising over an entity; a pooled record owned by `DamageSplatPool`."""
+    __slots__ = ("value", "base_x", "base_y", "started_at", "text_surface", "generation")
+
+    def __init__(self):
+        self.value = 0
+        self.base_x = 0
+        self.base_y = 0
+        self.started_at = 0.0
+        self.text_surface: Optional[pygame.Surface] = None
+        self.generation = 0  # rośnie przy każdym ponownym użyciu, żeby spóźniony timer nie zwolnił nowego splatu
+
+
+class DamageSplatPool:
+    """Active damage splats plus a free list of records to reuse.
+
+    The faded icons are rendered once (`fade_steps` alpha levels) and the number of every damage
+    value once, so drawing a splat never copies or renders a surface. Position and fade follow from
+    the splat's age on the game clock; removal is a timer on `game.timers` (see
+    `Game.create_damage_splat`). All active splats are drawn with a single `Surface.blits` call.
+    """
+
+    def __init__(self, lifetime: float = C.DAMAGE_SPLAT_LIFETIME, fade_steps: int = C.DAMAGE_SPLAT_FADE_STEPS,
+                 vertical_speed: float = 30):
+        self.lifetime = lifetime
+        self.fade_steps = fade_steps
+        self.vertical_speed = vertical_speed
+        self.text_hide_alpha = 50  # poniżej tej przezroczystości liczba znika, zostaje sama ikona
+        self.active: List[DamageSplat] = []
+        self._free: List[DamageSplat] = []
+
+        self.font: Optional[pygame.font.Font] = None
+        self.icon_width = self.icon_height = 0
+        self.fade_frames: List[Optional[pygame.Surface]] = [None] * fade_steps
+        self.text_step_limit = fade_steps
+        self._value_text: Dict[int, pygame.Surface] = {}
+
+    def __len__(self):
+        return len(self.active)
+
+    def __iter__(self):
+        return iter(self.active)
+
+    def set_assets(self, icon_image: Optional[pygame.Surface], font: pygame.font.Font):
+        self.font = font
+        self._value_text = {}
+        self.icon_width = icon_image.get_width() if icon_image else 0
+        self.icon_height = icon_image.get_height() if icon_image else 0
+        self.fade_frames = []
+        self.text_step_limit = self.fade_steps
+        for step in range(self.fade_steps):
+            alpha = int(255 * (1 - step / self.fade_steps))
+            if alpha < self.text_hide_alpha:
+                self.text_step_limit = min(self.text_step_limit, step)
+            if icon_image is None:
+                self.fade_frames.append(None)
+                continue
+            frame = icon_image.copy()
+            frame.set_alpha(alpha)
+            self.fade_frames.append(frame)
+
+    def _text_for(self, value: int) -> pygame.Surface:
+        text = self._value_text.get(value)
+        if text is not None:
+            _splat_text_hits.inc()
+        else:
+            _splat_text_misses.inc()
+            if len(self._value_text) >= 512: self._value_text.clear()
+            color = (180, 180, 200) if value == 0 else (255, 255, 255)
+            text = self._value_text[value] = self.font.render(str(value), True, color)
+        return text
+
+    def spawn(self, value: int, center_x: int, entity_top_y: int, now: float) -> DamageSplat:
+        splat = self._free.pop() if self._free else DamageSplat()
+        splat.generation += 1
+        splat.value = value
+        splat.base_x = center_x - self.icon_width // 2
+        splat.base_y = entity_top_y - self.icon_height
+        splat.started_at = now
+        splat.text_surface = self._text_for(value)
+        self.active.append(splat)
+        _splats_alive.set(len(self.active))
+        return splat
+
+    def release(self, splat: DamageSplat, generation: int):
+        """Return `splat` to the pool, unless it has been reused since `generation` was handed out."""
+        if splat.generation != generation: return
+        try:
+            self.active.remove(splat)  # splaty żyją tyle samo, więc to zwykle pierwszy element
+        except ValueError:
+            return
+        splat.text_surface = None
+        self._free.append(splat)
+        _splats_alive.set(len(self.active))
+
+    def clear(self):
+        for splat in self.active:
+            splat.generation += 1  # timery zwolnienia tych splatów już nic nie zrobią
+            splat.text_surface = None
+        self._free.extend(self.active)
+        self.active = []
+        _splats_alive.set(0)
+
+    def draw_commands(self, now: float) -> list:
+        blits = []
+        if not self.active: return blits
+        steps, lifetime = self.fade_steps, self.lifetime
+        for splat in self.active:
+            age = max(0.0, now - splat.started_at)
+            step = min(steps - 1, int(age / lifetime * steps))
+            x = splat.base_x
+            y = splat.base_y - int(self.vertical_speed * age)
+            icon = self.fade_frames[step]
+            if icon is not None:
+                blits.append((icon, (x, y)))
+            if step < self.text_step_limit:
+                text = splat.text_surface
+                blits.append((text, (x + (self.icon_width - text.get_width()) // 2,
+                                     y + (self.icon_height - text.get_height()) // 2)))
+        return blits
+
+    def draw(self, surface: pygame.Surface, now: float):
+        surface.blits(self.draw_commands(now), doreturn=False)
 
 
 class InGameMenu:
     def __init__(self, game: "Game", ui_manager: "UI"):
         self.game = game
         self.ui_manager = ui_manager
-        self.font = pygame.font.SysFont("Consolas", 20)
+        self.font = get_font("Consolas", 20)
         self.is_visible = False
 
         self.options: List[Dict[str, Any]] = [
@@ -119,9 +182,7 @@ class InGameMenu:
 
     def _go_to_load_game(self):
         print("[DEBUG] InGameMenu: Transitioning to LOAD_GAME state.")
-        if hasattr(self.game.state_manager, 'previous_active_state_key_for_load_game'):
-            self.game.state_manager.previous_active_state_key_for_load_game = self.game.state_manager.active_state_key
-        self.game.state_manager.set_state("LOAD_GAME")
+        self.game.state_manager.push_state("LOAD_GAME")
         self.hide()
 
     def _exit_to_main_menu(self):
@@ -178,7 +239,7 @@ class InGameMenu:
             )
             self.item_rects.append({"rect": item_screen_rect, "data": option_data})
 
-            text_surf = self.font.render(option_data["text"], True, self.text_color)
+            text_surf = render_text(self.font, option_data["text"], True, self.text_color)
             text_rect_local_on_item = text_surf.get_rect(centery=self.item_height // 2, left=self.padding)
             self.menu_surface.blit(text_surf, (text_rect_local_on_item.x, current_y_local + text_rect_local_on_item.y))
             current_y_local += self.item_height
@@ -203,12 +264,13 @@ class InGameMenu:
                 return True
         return True
 
-    def draw(self, surface: pygame.Surface):
+    def compose(self) -> Optional[pygame.Surface]:
+        """The menu with the option under the mouse highlighted, or None if it is hidden."""
         if not self.is_visible or not self.menu_surface:
-            return
+            return None
 
         final_menu_to_blit = self.menu_surface.copy()
-        scaled_mouse_pos = self.game.get_scaled_mouse_pos(pygame.mouse.get_pos())
+        scaled_mouse_pos = self.game.get_logical_mouse_pos()
 
         current_y_local_highlight = self.padding
         for i, item_info in enumerate(self.item_rects):
@@ -217,20 +279,49 @@ class InGameMenu:
                 pygame.draw.rect(final_menu_to_blit, self.highlight_color_bg, highlight_rect_local)
 
                 option_data = self.options[i]
-                text_surf = self.font.render(option_data["text"], True, self.highlight_text_color)
+                text_surf = render_text(self.font, option_data["text"], True, self.highlight_text_color)
                 text_rect_local_on_item = text_surf.get_rect(left=self.padding, centery=self.item_height // 2)
                 final_menu_to_blit.blit(text_surf, (text_rect_local_on_item.x,
                                                     current_y_local_highlight + text_rect_local_on_item.y))
             current_y_local_highlight += self.item_height
+        return final_menu_to_blit
 
-        surface.blit(final_menu_to_blit, self.position)
+    def draw(self, surface: pygame.Surface):
+        menu = self.compose()
+        if menu is not None:
+            surface.blit(menu, self.position)
+
+
+class RetainedPanel:
+    """UI panel kept in its own surface and re-rendered only when its key changes.
+
+    `get(key)` returns the cached surface while `key` equals the key of the last render, so a
+    visible panel costs one blit per frame. The key must capture everything the panel shows.
+    """
+    _UNSET = object()
+
+    def __init__(self, render: Callable[[], pygame.Surface]):
+        self._render = render
+        self.key: Any = self._UNSET
+        self.surface: Optional[pygame.Surface] = None
+        self.rebuilds = 0
+
+    def get(self, key: Any) -> pygame.Surface:
+        if self.surface is None or key != self.key:
+            self.surface = self._render()
+            self.key = key
+            self.rebuilds += 1
+        return self.surface
+
+    def invalidate(self):
+        self.surface = None
 
 
 class UI:
     def __init__(self, game):
         self.game = game
-        self.font = pygame.font.SysFont("Consolas", 14)
-        self.debug_font = pygame.font.SysFont("Consolas", 12)
+        self.font = get_font("Consolas", 14)
+        self.debug_font = get_font("Consolas", 12)
 
         self.dialogue_active = False;
         self.dialogue_text_surface = None;
@@ -245,7 +336,7 @@ class UI:
         self.dialogue_padding = 15
         self.dialogue_max_width = C.SCREEN_WIDTH - 100;
         self.dialogue_line_spacing = 5
-        self.dialogue_font = pygame.font.SysFont("Consolas", 16)
+        self.dialogue_font = get_font("Consolas", 16)
 
         self.inventory_visible = False
         self.backpack_icon_size = 28
@@ -284,7 +375,7 @@ class UI:
                                                        pygame.SRCALPHA);
             self.char_info_icon_image.fill((100, 100, 180));
             pygame.draw.rect(self.char_info_icon_image, (150, 150, 200), self.char_info_icon_image.get_rect(), 2)
-            info_font = pygame.font.SysFont("Arial", 20, bold=True);
+            info_font = get_font("Arial", 20, bold=True);
             info_surf = info_font.render("i", True, (230, 230, 250));
             info_rect = info_surf.get_rect(center=self.char_info_icon_image.get_rect().center);
             self.char_info_icon_image.blit(info_surf, info_rect)
@@ -295,7 +386,7 @@ class UI:
         self.char_info_panel_bg_color = (50, 60, 50, 200);
         self.char_info_panel_border_color = (130, 140, 130)
         self.char_info_text_color = (220, 240, 220);
-        self.char_info_font = pygame.font.SysFont("Consolas", 16)
+        self.char_info_font = get_font("Consolas", 16)
 
         self.game_menu_icon_size = 28
         self.game_menu_icon_pos = (C.SCREEN_WIDTH - self.game_menu_icon_size - 10,
@@ -314,7 +405,7 @@ class UI:
                                                        pygame.SRCALPHA)
             self.game_menu_icon_image.fill((150, 150, 150))
             pygame.draw.rect(self.game_menu_icon_image, (200, 200, 200), self.game_menu_icon_image.get_rect(), 2)
-            dot_font = pygame.font.SysFont("Arial", 24, bold=True);
+            dot_font = get_font("Arial", 24, bold=True);
             dot_surf = dot_font.render("...", True, (50, 50, 50));
             dot_rect = dot_surf.get_rect(center=self.game_menu_icon_image.get_rect().center);
             dot_rect.y -= 3;
@@ -322,6 +413,17 @@ class UI:
 
         self.in_game_menu = InGameMenu(game, self)
 
+        for icon_image in (self.backpack_icon_image, self.char_info_icon_image, self.game_menu_icon_image):
+            pygame.draw.rect(icon_image, (180, 180, 180), icon_image.get_rect(), 1)
+
+        # Panele trzymane między klatkami; przebudowa tylko przy zmianie danych, z których powstają
+        self.hp_bar_rect = (health_bar_x, health_bar_y, health_bar_w, health_bar_h)
+        self.inventory_padding = 6
+        self.hp_panel = RetainedPanel(self._render_hp_bar)
+        self.char_info_panel = RetainedPanel(self._render_char_info)
+        self.inventory_panel = RetainedPanel(self._render_inventory)
+        self.dialogue_panel = RetainedPanel(self._render_dialogue)
+
     def toggle_inventory(self):
         self.inventory_visible = not self.inventory_visible
         if self.inventory_visible:
@@ -365,7 +467,7 @@ class UI:
             return
         current_line_text = self.dialogue_lines[self.current_dialogue_line_index]
         full_text = f"{self.dialogue_speaker}: {current_line_text}"
-        self.dialogue_text_surface = self.dialogue_font.render(full_text, True, self.dialogue_text_color)
+        self.dialogue_text_surface = render_text(self.dialogue_font, full_text, True, self.dialogue_text_color)
 
     def next_dialogue_line(self):
         # print("[DEBUG] UI.next_dialogue_line called.")
@@ -383,129 +485,113 @@ class UI:
         self.dialogue_text_surface = None
         if hasattr(self.game.player, 'is_in_dialogue'): self.game.player.is_in_dialogue = False
 
-    def draw(self, surface):
-        if self.game.player: p = self.game.player; x_hp, y_hp, w_hp, h_hp = 10, 10, 200, 20; pygame.draw.rect(surface,
-                                                                                                              (50, 50,
-                                                                                                               50),
-                                                                                                              (x_hp,
-                                                                                                               y_hp,
-                                                                                                               w_hp,
-                                                                                                               h_hp));
-        if self.game.player and p.max_hp > 0: fill_w = int((p.hp / p.max_hp) * w_hp); pygame.draw.rect(surface,
-                                                                                                       (200, 0, 0),
-                                                                                                       (x_hp, y_hp,
-                                                                                                        fill_w, h_hp));
-        if self.game.player:
-            pygame.draw.rect(surface, (255, 255, 255), (x_hp, y_hp, w_hp, h_hp), 2); txt = self.font.render(
-                f"HP: {p.hp}/{p.max_hp}", True, (255, 255, 255)); surface.blit(txt, (x_hp + 5, y_hp + 2));
+    def _render_hp_bar(self) -> pygame.Surface:
+        x_hp, y_hp, w_hp, h_hp = self.hp_bar_rect
+        panel = pygame.Surface((w_hp, h_hp), pygame.SRCALPHA)
+        panel.fill((50, 50, 50))
+        p = self.game.player
+        if p:
+            if p.max_hp > 0:
+                pygame.draw.rect(panel, (200, 0, 0), (0, 0, int((p.hp / p.max_hp) * w_hp), h_hp))
+            hp_text = f"HP: {p.hp}/{p.max_hp}"
         else:
-            x_hp, y_hp, w_hp, h_hp = 10, 10, 200, 20; pygame.draw.rect(surface, (50, 50, 50),
-                                                                       (x_hp, y_hp, w_hp, h_hp)); pygame.draw.rect(
-                surface, (255, 255, 255), (x_hp, y_hp, w_hp, h_hp), 2); txt = self.font.render(f"HP: --/--", True,
-                                                                                               (255, 255,
-                                                                                                255)); surface.blit(txt,
-                                                                                                                    (x_hp + 5,
-                                                                                                                     y_hp + 2))
-
-        if self.backpack_icon_image: surface.blit(self.backpack_icon_image,
-                                                  self.backpack_icon_rect.topleft); pygame.draw.rect(surface,
-                                                                                                     (180, 180, 180),
-                                                                                                     self.backpack_icon_rect,
-                                                                                                     1)
-        if self.char_info_icon_image: surface.blit(self.char_info_icon_image,
-                                                   self.char_info_icon_rect.topleft); pygame.draw.rect(surface,
-                                                                                                       (180, 180, 180),
-                                                                                                       self.char_info_icon_rect,
-                                                                                                       1)
-        if self.game_menu_icon_image: surface.blit(self.game_menu_icon_image,
-                                                   self.game_menu_icon_rect.topleft); pygame.draw.rect(surface,
-                                                                                                       (180, 180, 180),
-                                                                                                       self.game_menu_icon_rect,
-                                                                                                       1)
-
-        if self.character_info_visible and self.game.player:
-            p = self.game.player;
-            panel_x, panel_y = self.char_info_panel_pos;
-            info_panel_surf = pygame.Surface((self.char_info_panel_width, self.char_info_panel_height),
-                                             pygame.SRCALPHA);
-            info_panel_surf.fill(self.char_info_panel_bg_color);
-            pygame.draw.rect(info_panel_surf, self.char_info_panel_border_color, info_panel_surf.get_rect(), 2);
-            line1_text = f"Name: {p.name}";
-            line2_text = f"Level: {p.level}";
-            text_surf1 = self.char_info_font.render(line1_text, True, self.char_info_text_color);
-            text_surf2 = self.char_info_font.render(line2_text, True, self.char_info_text_color);
-            info_panel_surf.blit(text_surf1, (self.dialogue_padding, self.dialogue_padding));
-            info_panel_surf.blit(text_surf2,
-                                 (self.dialogue_padding, self.dialogue_padding + text_surf1.get_height() + 5));
-            surface.blit(info_panel_surf, (panel_x, panel_y))
+            hp_text = "HP: --/--"
+        pygame.draw.rect(panel, (255, 255, 255), panel.get_rect(), 2)
+        panel.blit(render_text(self.font, hp_text, True, (255, 255, 255)), (5, 2))
+        return panel
+
+    def _render_char_info(self) -> pygame.Surface:
+        p = self.game.player
+        panel = pygame.Surface((self.char_info_panel_width, self.char_info_panel_height), pygame.SRCALPHA)
+        panel.fill(self.char_info_panel_bg_color)
+        pygame.draw.rect(panel, self.char_info_panel_border_color, panel.get_rect(), 2)
+        text_surf1 = render_text(self.char_info_font, f"Name: {p.name}", True, self.char_info_text_color)
+        text_surf2 = render_text(self.char_info_font, f"Level: {p.level}", True, self.char_info_text_color)
+        panel.blit(text_surf1, (self.dialogue_padding, self.dialogue_padding))
+        panel.blit(text_surf2, (self.dialogue_padding, self.dialogue_padding + text_surf1.get_height() + 5))
+        return panel
+
+    def _render_inventory(self) -> pygame.Surface:
+        inv = self.game.inventory
+        slot_sz = C.INVENTORY_SLOT_SIZE
+        icon_offset = (slot_sz - C.ITEM_ICON_SIZE) // 2
+        padding = self.inventory_padding
+        panel = pygame.Surface((inv.cols * (slot_sz + padding) + padding, inv.rows * (slot_sz + padding) + padding),
+                               pygame.SRCALPHA)
+        panel.fill((50, 50, 50, 200))
+        pygame.draw.rect(panel, (150, 150, 150), panel.get_rect(), 2)
+        for r in range(inv.rows):
+            for c in range(inv.cols):
+                x = padding + c * (slot_sz + padding)
+                y = padding + r * (slot_sz + padding)
+                pygame.draw.rect(panel, (60, 60, 60), (x, y, slot_sz, slot_sz))
+                pygame.draw.rect(panel, (200, 200, 200), (x, y, slot_sz, slot_sz), 2)
+                item = inv.slots[r][c]
+                if not item: continue
+                try:
+                    # Ikona z atlasu ma już rozmiar komórki, więc pozycja to stałe przesunięcie
+                    panel.blit(item.icon, (x + icon_offset, y + icon_offset))
+                    if item.stackable and item.quantity > 1:
+                        quantity_surf = render_text(self.debug_font, str(item.quantity), True, (240, 240, 100))
+                        panel.blit(quantity_surf, quantity_surf.get_rect(bottomright=(x + slot_sz - 2,
+                                                                                      y + slot_sz - 2)))
+                except Exception as e:
+                    print(f"Error drawing item icon for {getattr(item, 'name', 'UnknownItem')}: {e}")
+        return panel
+
+    def _render_dialogue(self) -> pygame.Surface:
+        bg_rect_width = min(self.dialogue_max_width,
+                            self.dialogue_text_surface.get_width() + self.dialogue_padding * 2)
+        bg_rect_height = self.dialogue_height
+        panel = pygame.Surface((bg_rect_width, bg_rect_height), pygame.SRCALPHA)
+        panel.fill(self.dialogue_bg_color)
+        pygame.draw.rect(panel, self.dialogue_border_color, panel.get_rect(), 2)
+        panel.blit(self.dialogue_text_surface,
+                   (self.dialogue_padding, (bg_rect_height - self.dialogue_text_surface.get_height()) // 2))
+        continue_text = render_text(self.debug_font, "Click to continue...", True, self.dialogue_text_color)
+        panel.blit(continue_text, (bg_rect_width - continue_text.get_width() - self.dialogue_padding,
+                                   bg_rect_height - continue_text.get_height() - self.dialogue_padding // 2))
+        return panel
+
+    def draw_commands(self) -> list:
+        """Blit commands `(surface, position)` for everything the UI shows this frame."""
+        p = self.game.player
+        commands = [(self.hp_panel.get((p.hp, p.max_hp) if p else None), self.hp_bar_rect[:2])]
+
+        for icon_image, icon_rect in ((self.backpack_icon_image, self.backpack_icon_rect),
+                                      (self.char_info_icon_image, self.char_info_icon_rect),
+                                      (self.game_menu_icon_image, self.game_menu_icon_rect)):
+            if icon_image: commands.append((icon_image, icon_rect.topleft))  # ramka jest już wrysowana w ikonę
+
+        if self.character_info_visible and p:
+            commands.append((self.char_info_panel.get((p.name, p.level)), self.char_info_panel_pos))
 
         if self.inventory_visible and self.game.inventory:
-            inv = self.game.inventory;
-            slot_sz = 40;
-            padding = 6;
-            start_x_inv, start_y_inv = self.char_info_panel_pos[0], self.char_info_panel_pos[1];
+            inv = self.game.inventory
+            start_x_inv = self.char_info_panel_pos[0]
             if self.character_info_visible:
-                start_y_inv = self.char_info_panel_pos[1] + self.char_info_panel_height + 10;
+                start_y_inv = self.char_info_panel_pos[1] + self.char_info_panel_height + 10
             else:
-                start_y_inv = self.backpack_icon_rect.bottom + 10;
-            num_slots_wide = inv.cols;
-            num_slots_high = inv.rows;
-            inv_panel_width = num_slots_wide * (slot_sz + padding) + padding;
-            inv_panel_height = num_slots_high * (slot_sz + padding) + padding;
-            inv_panel_rect = pygame.Rect(start_x_inv - padding, start_y_inv - padding, inv_panel_width,
-                                         inv_panel_height);
-            inv_panel_surf = pygame.Surface((inv_panel_rect.width, inv_panel_rect.height), pygame.SRCALPHA);
-            inv_panel_surf.fill((50, 50, 50, 200));
-            pygame.draw.rect(inv_panel_surf, (150, 150, 150), inv_panel_surf.get_rect(), 2);
-            surface.blit(inv_panel_surf, inv_panel_rect.topleft);
-            for r in range(inv.rows):
-                for c in range(inv.cols):
-                    x = start_x_inv + c * (slot_sz + padding);
-                    y = start_y_inv + r * (slot_sz + padding);
-                    pygame.draw.rect(surface, (60, 60, 60), (x, y, slot_sz, slot_sz));
-                    pygame.draw.rect(surface, (200, 200, 200), (x, y, slot_sz, slot_sz), 2);
-                    if self.game.inventory and r < len(inv.slots) and c < len(inv.slots[r]):
-                        item = inv.slots[r][c];
-                        if item and hasattr(item, 'icon') and item.icon:
-                            try:
-                                icon_to_draw = item.icon
-                                icon_display_rect = icon_to_draw.get_rect(center=(x + slot_sz // 2, y + slot_sz // 2))
-                                surface.blit(icon_to_draw, icon_display_rect.topleft)
-                                if hasattr(item, 'stackable') and item.stackable and hasattr(item,
-                                                                                             'quantity') and item.quantity > 1:
-                                    quantity_font = self.debug_font
-                                    quantity_surf = quantity_font.render(str(item.quantity), True, (240, 240, 100))
-                                    q_rect = quantity_surf.get_rect(bottomright=(x + slot_sz - 2, y + slot_sz - 2))
-                                    surface.blit(quantity_surf, q_rect)
-                            except Exception as e:
-                                print(f"Error drawing item icon for {getattr(item, 'name', 'UnknownItem')}: {e}")
+                start_y_inv = self.backpack_icon_rect.bottom + 10
+            panel = self.inventory_panel.get((id(inv), inv.version))
+            commands.append((panel, (start_x_inv - self.inventory_padding, start_y_inv - self.inventory_padding)))
 
         if self.dialogue_active and self.dialogue_text_surface:
-            bg_rect_width = min(self.dialogue_max_width,
-                                self.dialogue_text_surface.get_width() + self.dialogue_padding * 2);
-            bg_rect_height = self.dialogue_height;
-            dialogue_bg_surf = pygame.Surface((bg_rect_width, bg_rect_height), pygame.SRCALPHA);
-            dialogue_bg_surf.fill(self.dialogue_bg_color);
-            pygame.draw.rect(dialogue_bg_surf, self.dialogue_border_color, dialogue_bg_surf.get_rect(), 2);
-            surface.blit(dialogue_bg_surf, self.dialogue_pos);
-            text_x = self.dialogue_pos[0] + self.dialogue_padding;
-            text_y = self.dialogue_pos[1] + (bg_rect_height - self.dialogue_text_surface.get_height()) // 2;
-            surface.blit(self.dialogue_text_surface, (text_x, text_y));
-            continue_font = self.debug_font;
-            continue_text = continue_font.render("Click to continue...", True, self.dialogue_text_color);
-            surface.blit(continue_text,
-                         (self.dialogue_pos[0] + bg_rect_width - continue_text.get_width() - self.dialogue_padding,
-                          self.dialogue_pos[
-                              1] + bg_rect_height - continue_text.get_height() - self.dialogue_padding // 2))
+            commands.append((self.dialogue_panel.get(self.dialogue_text_surface), self.dialogue_pos))
 
         if hasattr(self, 'in_game_menu') and self.in_game_menu.is_visible:
-            self.in_game_menu.draw(surface)
+            menu = self.in_game_menu.compose()
+            if menu is not None: commands.append((menu, self.in_game_menu.position))
+        return commands
+
+    def draw(self, surface):
+        surface.blits(self.draw_commands(), doreturn=False)
 
 
 class ContextMenu:
     def __init__(self, game, font_size=14, padding=5, item_height=22):
         self.game = game;
-        self.font = pygame.font.SysFont("Consolas", font_size);
+        self.font = get_font("Consolas", font_size);
         self.is_visible = False;
         self.position = (0, 0);
         self.options = [];
@@ -523,7 +609,7 @@ class ContextMenu:
         if not self.options: return 0, 0
         max_w = 0;
         for o in self.options:
-            ts = self.font.render(o["text"], True, self.text_color);
+            ts = render_text(self.font, o["text"], True, self.text_color);
             _w = ts.get_width()
             if _w > max_w: max_w = _w
         return max_w + self.padding * 2, len(self.options) * self.item_height + self.padding * 2
@@ -551,7 +637,7 @@ class ContextMenu:
             gr = pygame.Rect(self.position[0], self.position[1] + current_y_local, menu_width, self.item_height)
             self.item_rects.append({"rect": gr, "data": opt})
 
-            ts = self.font.render(opt["text"], True, self.text_color)
+            ts = render_text(self.font, opt["text"], True, self.text_color)
             text_rect_local_on_item = ts.get_rect(left=self.padding, centery=self.item_height // 2)
             self.menu_surface.blit(ts, (text_rect_local_on_item.x, current_y_local + text_rect_local_on_item.y))
             current_y_local += self.item_height
@@ -563,7 +649,7 @@ class ContextMenu:
         if not self.is_visible or not self.menu_surface: return
 
         final_menu_to_blit = self.menu_surface.copy()
-        mouse_pos = pygame.mouse.get_pos()
+        mouse_pos = self.game.get_mouse_pos()
 
         current_y_local_highlight = self.padding
         for i, item_info in enumerate(self.item_rects):
@@ -573,7 +659,7 @@ class ContextMenu:
                 pygame.draw.rect(final_menu_to_blit, self.highlight_color_bg, highlight_rect_local)
 
                 option_data = self.options[i]
-                text_surf = self.font.render(option_data["text"], True, self.highlight_text_color)
+                text_surf = render_text(self.font, option_data["text"], True, self.highlight_text_color)
                 text_rect_local_on_item = text_surf.get_rect(left=self.padding, centery=self.item_height // 2)
                 final_menu_to_blit.blit(text_surf, (text_rect_local_on_item.x,
                                                     current_y_local_highlight + text_rect_local_on_item.y))
@@ -1,7 +1,31 @@
-"""Entry point for the RuneScape Classic-style demo."""
-from rsc_engine import Game
+"""Entry point for the RuneScape Classic-style demo.
+
+    python run_game.py                                   play
+    python run_game.py --record session.replay           play and record the input
+    python run_game.py --replay session.replay [--headless] [--timing-dump frames.csv]
+    python run_game.py --metrics metrics.jsonl           also write performance counters once per second
+"""
+import argparse
+import os
 
 if __name__ == "__main__":
-    Game().run()
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--record", metavar="PATH", help="record per-frame input, mouse and dt to a replay file")
+    parser.add_argument("--replay", metavar="PATH", help="play back a recorded replay instead of live input")
+    parser.add_argument("--headless", action="store_true",
+                        help="with --replay: no window, run as fast as possible")
+    parser.add_argument("--timing-dump", metavar="PATH", help="with --replay: write per-frame timings as CSV")
+    parser.add_argument("--metrics", metavar="PATH",
+                        help="append performance counters to a JSON Lines file, one record per second")
+    args = parser.parse_args()
+    if (args.headless or args.timing_dump) and not args.replay:
+        parser.error("--headless and --timing-dump require --replay")
+    if args.headless:
+        os.environ["SDL_VIDEODRIVER"] = "dummy"  # musi być ustawione przed pygame.init()
+        os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+
+    from rsc_engine import Game
+    Game().run(record_path=args.record, replay_path=args.replay, headless=args.headless,
+               timing_dump_path=args.timing_dump, metrics_path=args.metrics)
 
     #komentarz test
@@ -0,0 +1,8 @@
+import os
+import sys
+from pathlib import Path
+
+# Testy nie otwierają okna; pygame bez wyświetlacza
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
@@ -0,0 +1,81 @@
+import json
+import os
+
+import pytest
+
+from rsc_engine.data_cache import DataCache, DataError
+
+ITEMS = {"POT001": {"name": "Potion", "stackable": True, "max_stack": 5}}
+SPAWNS = {"map": [{"entity_id": "goblin_1", "type": "HostileNPC", "ix": 3, "iy": 4}]}
+
+
+@pytest.fixture
+def data_dir(tmp_path):
+    data = tmp_path / "data"
+    (data / "maps").mkdir(parents=True)
+    (data / "items.json").write_text(json.dumps(ITEMS), encoding="utf-8")
+    (data / "npc_spawns.json").write_text(json.dumps(SPAWNS), encoding="utf-8")
+    (data / "maps" / "map.json").write_text('{"width": 10}', encoding="utf-8")
+    (data / ".font_paths.json").write_text("{}", encoding="utf-8")  # ukryty plik to pamięć podręczna, nie dane
+    return data
+
+
+def load(data_dir):
+    return DataCache(data_dir, data_dir.parent / "data.cache").load()
+
+
+def bump_mtime(path):
+    st = path.stat()
+    os.utime(path, ns=(st.st_atime_ns, st.st_mtime_ns + 5_000_000_000))
+
+
+def test_first_load_parses_every_file(data_dir):
+    cache = load(data_dir)
+    assert cache.reparsed == ["items.json", "maps/map.json", "npc_spawns.json"]
+    assert cache.documents == {"items.json": ITEMS, "maps/map.json": {"width": 10}, "npc_spawns.json": SPAWNS}
+    assert cache.errors == {} and cache.problems == {}
+
+
+def test_unchanged_sources_are_not_parsed(data_dir):
+    first = load(data_dir)
+    cache = load(data_dir)
+    assert cache.reparsed == []
+    assert cache.documents == first.documents
+
+
+def test_touched_file_with_the_same_content_is_not_parsed(data_dir):
+    first = load(data_dir)
+    bump_mtime(data_dir / "items.json")
+    cache = load(data_dir)
+    assert cache.reparsed == []
+    assert cache.documents == first.documents
+    assert load(data_dir).reparsed == []  # nowe statystyki trafiły do pamięci podręcznej
+
+
+def test_changed_file_is_parsed_again(data_dir):
+    load(data_dir)
+    (data_dir / "maps" / "map.json").write_text('{"width": 12, "height": 8}', encoding="utf-8")
+    bump_mtime(data_dir / "maps" / "map.json")
+    cache = load(data_dir)
+    assert cache.reparsed == ["maps/map.json"]
+    assert cache.documents["maps/map.json"] == {"width": 12, "height": 8}
+    assert cache.documents["items.json"] == ITEMS
+
+
+def test_broken_file_does_not_hide_the_others(data_dir):
+    load(data_dir)
+    (data_dir / "maps" / "map.json").write_text('{"width": ', encoding="utf-8")
+    (data_dir / "items.json").write_text(json.dumps({"BAD": {"stackable": "yes"}}), encoding="utf-8")
+    first = load(data_dir)
+    assert first.reparsed == ["items.json", "maps/map.json"]
+    second = load(data_dir)
+    assert second.reparsed == []
+    for cached in (first, second):  # także gdy błąd pochodzi z pamięci podręcznej
+        assert set(cached.errors) == {"maps/map.json"}
+        assert set(cached.problems) == {"items.json"}
+        assert cached.documents["npc_spawns.json"] == SPAWNS
+        assert cached.get("npc_spawns.json") == SPAWNS
+        with pytest.raises(DataError):
+            cached.get("maps/map.json")
+        with pytest.raises(FileNotFoundError):
+            cached.get("missing.json")
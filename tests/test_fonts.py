@@ -0,0 +1,17 @@
+import pytest
+
+from rsc_engine.fonts import FontRegistry
+
+
+@pytest.mark.parametrize("cached", ['[1, 2]', '{"x": 1}', '{"consolas|0": [1, false]}', '{"consolas|0": [null]}',
+                                    '"fonts"', '{"consolas|0": '])
+def test_malformed_font_cache_is_ignored(tmp_path, cached):
+    path = tmp_path / "font_paths.json"
+    path.write_text(cached, encoding="utf-8")
+    assert FontRegistry(path)._paths == {}
+
+
+def test_font_cache_keeps_default_font_entries(tmp_path):
+    path = tmp_path / "font_paths.json"
+    path.write_text('{"consolas|1": [null, true], "arial|0": ["/no/such/font.ttf", false]}', encoding="utf-8")
+    assert FontRegistry(path)._paths == {"consolas|1": (None, True)}
@@ -0,0 +1,138 @@
+import random
+from types import SimpleNamespace
+
+from rsc_engine.inventory import Inventory
+from rsc_engine.items_manager import ItemDefinition
+
+RAW_ITEMS = {
+    "POT001": {"name": "Potion", "stackable": True, "max_stack": 5},
+    "ORE001": {"name": "Ore", "stackable": True, "max_stack": 10},
+    "SWORD001": {"name": "Sword", "type": "weapon"},
+}
+
+
+class ItemDefinitions:
+    """The part of ItemManager that Inventory uses, without loading data files and icons."""
+
+    def __init__(self):
+        self.item_definitions = {item_id: ItemDefinition.compile(item_id, raw)[0]
+                                 for item_id, raw in RAW_ITEMS.items()}
+
+    def get_item_definition(self, item_id):
+        return self.item_definitions.get(item_id)
+
+    def item_exists(self, item_id):
+        return item_id in self.item_definitions
+
+
+def make_inventory(rows=3, cols=4):
+    return Inventory(SimpleNamespace(item_manager=ItemDefinitions()), rows, cols)
+
+
+def assert_indexes_match_grid(inv):
+    stacks, open_stacks, free = {}, {}, set()
+    for index in range(inv.rows * inv.cols):
+        item = inv.slots[index // inv.cols][index % inv.cols]
+        if item is None:
+            free.add(index)
+            continue
+        assert 0 < item.quantity <= item.max_stack
+        stacks.setdefault(item.item_id, set()).add(index)
+        if item.stackable and item.quantity < item.max_stack:
+            open_stacks.setdefault(item.item_id, set()).add(index)
+    assert inv._stacks == stacks
+    assert inv._open_stacks == open_stacks
+    assert inv.free_slot_count == len(free)
+    assert set(inv._free_heap) == inv._in_free_heap
+    assert free <= inv._in_free_heap  # nieaktualne wpisy są dozwolone, brakujące wolne sloty nie
+
+
+def state_of(inv):
+    return inv.get_save_data(), inv.version
+
+
+def test_indexes_follow_random_operations():
+    rng = random.Random(7)
+    inv = make_inventory()
+    for _ in range(2000):
+        action = rng.random()
+        item_id = rng.choice(list(RAW_ITEMS))
+        if action < 0.35:
+            inv.add_item(item_id, rng.randint(1, 12))
+        elif action < 0.6:
+            inv.remove_item_from_slot(rng.randrange(inv.rows), rng.randrange(inv.cols), rng.randint(1, 6))
+        elif action < 0.8:
+            # Przeniesienie całego stosu do innego (pustego) slotu
+            row, col = rng.randrange(inv.rows), rng.randrange(inv.cols)
+            item = inv.get_item(row, col)
+            to_row, to_col = rng.randrange(inv.rows), rng.randrange(inv.cols)
+            if item and inv.get_item(to_row, to_col) is None:
+                inv.remove_item_from_slot(row, col, item.quantity)
+                assert inv.place_item(to_row, to_col, item.item_id, item.quantity)
+        else:
+            inv.apply_batch(add=[(item_id, rng.randint(1, 8))],
+                            remove=[(rng.choice(list(RAW_ITEMS)), rng.randint(1, 8))])
+        assert_indexes_match_grid(inv)
+
+
+def test_new_stacks_take_the_lowest_free_slot():
+    inv = make_inventory(rows=2, cols=3)
+    inv.add_item("SWORD001", 4)
+    inv.remove_item_from_slot(0, 2)
+    inv.remove_item_from_slot(0, 1)
+    inv.add_item("POT001", 7)
+    assert inv.stack_slots("POT001") == [1, 2]
+    assert inv.count("POT001") == 7
+    assert_indexes_match_grid(inv)
+
+
+def test_apply_batch_is_all_or_nothing():
+    inv = make_inventory(rows=1, cols=3)
+    inv.add_item("POT001", 5)
+    inv.add_item("SWORD001", 1)
+    before = state_of(inv)
+
+    assert not inv.apply_batch(add=[("ORE001", 1)], remove=[("POT001", 6)])  # za mało do zabrania
+    assert not inv.apply_batch(add=[("ORE001", 25)])  # brak miejsca na trzy stosy
+    assert not inv.apply_batch(add=[("ORE001", 1), ("NOPE", 1)])
+    assert state_of(inv) == before
+    assert_indexes_match_grid(inv)
+
+    # Sloty zwolnione przez usunięcia przyjmują dodawane przedmioty w tej samej partii
+    assert inv.apply_batch(add=[("ORE001", 20)], remove=[("POT001", 5), ("SWORD001", 1)])
+    assert inv.stacks() == [("ORE001", 10), ("ORE001", 10)]
+    assert inv.version == before[1] + 1
+    assert_indexes_match_grid(inv)
+
+
+def test_failed_transfer_changes_neither_inventory():
+    source, target = make_inventory(rows=1, cols=3), make_inventory(rows=1, cols=3)
+    source.add_item("ORE001", 25)
+    target.add_item("SWORD001", 1)
+    before = state_of(source), state_of(target)
+
+    assert not source.transfer_to(target)  # trzy stosy rudy, w celu dwa wolne sloty
+    assert not source.transfer_to(target, [("POT001", 1)])
+    assert (state_of(source), state_of(target)) == before
+
+    assert source.transfer_to(target, [("ORE001", 12)])
+    assert (source.count("ORE001"), target.count("ORE001")) == (13, 12)
+    assert source.version == before[0][1] + 1 and target.version == before[1][1] + 1
+    assert_indexes_match_grid(source)
+    assert_indexes_match_grid(target)
+
+
+def test_snapshot_and_restore_round_trip():
+    inv = make_inventory()
+    inv.add_item("POT001", 7)
+    inv.add_item("SWORD001", 2)
+    inv.remove_item_from_slot(0, 0, 2)
+    snapshot = inv.snapshot_slots()
+    saved = inv.get_save_data()
+
+    inv.add_item("ORE001", 30)
+    inv.remove_item_from_slot(0, 1, 2)
+    inv.apply_batch(remove=[("SWORD001", 1)])
+    inv.restore_slots(snapshot)
+    assert inv.get_save_data() == saved
+    assert_indexes_match_grid(inv)
@@ -0,0 +1,97 @@
+import io
+import struct
+
+import pytest
+
+from rsc_engine.save_format import (FLAG_LZMA, FLAG_ZLIB, HEADER, MAGIC, RECORD_BATCH, STRING_LEN, SaveFormatError,
+                                    encode_binary, read_binary, read_save, write_binary)
+
+
+def sample_save(npc_count=3):
+    npcs = []
+    for i in range(npc_count):
+        npc = {"entity_id": f"npc_{i}", "name": "Goblin" if i % 2 else "Old Man", "ix": i, "iy": -i, "hp": i % 30,
+               "max_hp": 30, "is_alive": i % 3 != 0, "level": 1 + i % 5,
+               "type": "HostileNPC" if i % 2 else "FriendlyNPC"}
+        if i % 2:
+            npc["show_hp_bar"] = i % 4 == 1
+            npc["is_chasing"] = False
+        npcs.append(npc)
+    return {"player_data": {"name": "Bób", "level": 7, "start_ix": 5, "start_iy": 6, "max_hp": 120,
+                            "current_hp": 99, "xp": 1234, "map_id": "map"},
+            "npc_states": npcs,
+            "inventory": [{"row": 0, "col": 0, "item_id": "POT001", "quantity": 3},
+                          {"row": 2, "col": 3, "item_id": "MISC001", "quantity": 50}],
+            "current_map_id": "map", "timestamp": 123456, "game_version": "0.1.1"}
+
+
+@pytest.mark.parametrize("compression", ["none", "zlib", "lzma"])
+@pytest.mark.parametrize("npc_count", [0, 3, RECORD_BATCH * 2 + 5])
+def test_binary_round_trip(compression, npc_count):
+    data = sample_save(npc_count)
+    buffer = io.BytesIO()
+    write_binary(data, buffer, compression=compression)
+    buffer.seek(0)
+    assert read_binary(buffer) == data
+
+
+def test_compressed_saves_are_smaller():
+    data = sample_save(500)
+    plain = encode_binary(data, compression="none")
+    assert len(encode_binary(data, compression="zlib")) < len(plain)
+    assert len(encode_binary(data, compression="lzma")) < len(plain)
+
+
+def test_unknown_compression_is_rejected():
+    with pytest.raises(SaveFormatError):
+        encode_binary(sample_save(), compression="zstd")
+
+
+@pytest.mark.parametrize("compression", ["none", "zlib", "lzma"])
+def test_truncated_save_raises(compression):
+    encoded = encode_binary(sample_save(50), compression=compression)
+    for size in (HEADER.size - 1, HEADER.size + 10, len(encoded) - 1):
+        with pytest.raises(SaveFormatError):
+            read_binary(io.BytesIO(encoded[:size]))
+
+
+def test_bad_magic_and_newer_schema_raise():
+    encoded = encode_binary(sample_save())
+    with pytest.raises(SaveFormatError):
+        read_binary(io.BytesIO(b"XXXX" + encoded[4:]))
+    newer = bytearray(encoded)
+    struct.pack_into("<H", newer, len(MAGIC), 99)
+    with pytest.raises(SaveFormatError):
+        read_binary(io.BytesIO(bytes(newer)))
+
+
+def test_version_1_save_is_read_uncompressed():
+    data = sample_save()
+    v1 = bytearray(encode_binary(data, compression="none"))
+    struct.pack_into("<HH", v1, len(MAGIC), 1, 0)
+    assert read_binary(io.BytesIO(bytes(v1))) == data
+
+
+def test_read_save_detects_format(tmp_path):
+    data = sample_save()
+    binary_path = tmp_path / "slot.sav"
+    binary_path.write_bytes(encode_binary(data))
+    json_path = tmp_path / "slot.json"
+    json_path.write_text('{"player_data": {"name": "Bob"}}', encoding="utf-8")
+    assert read_save(binary_path) == data
+    assert read_save(json_path) == {"player_data": {"name": "Bob"}, "npc_states": [], "inventory": []}
+
+
+def test_corrupt_string_table_raises():
+    corrupt = bytearray(encode_binary(sample_save(), compression="none"))
+    corrupt[HEADER.size + STRING_LEN.size] = 0xFF  # pierwszy bajt pierwszego napisu; 0xFF nie występuje w UTF-8
+    with pytest.raises(SaveFormatError):
+        read_binary(io.BytesIO(bytes(corrupt)))
+
+
+@pytest.mark.parametrize("flags", [FLAG_ZLIB | FLAG_LZMA, 0x0004, FLAG_ZLIB | 0x8000])
+def test_unknown_or_conflicting_flags_raise(flags):
+    encoded = bytearray(encode_binary(sample_save(), compression="zlib"))
+    struct.pack_into("<H", encoded, len(MAGIC) + 2, flags)
+    with pytest.raises(SaveFormatError):
+        read_binary(io.BytesIO(bytes(encoded)))
@@ -0,0 +1,113 @@
+from rsc_engine.save_journal import (JOURNAL_HEADER, JOURNAL_MAGIC, JOURNAL_VERSION, RECORD_COMMIT, SaveJournal,
+                                     _diff, _frame, _index_state, read_save_with_journal)
+from rsc_engine.saves import SaveSnapshot
+
+
+def make_snapshot(path, npcs, inventory=(), hp=100, timestamp=1000):
+    player = {"name": "Bob", "level": 3, "start_ix": 5, "start_iy": 6, "max_hp": 100, "current_hp": hp,
+              "xp": 40, "map_id": "map"}
+    return SaveSnapshot.capture(slot_number=1, path=path, player_data=player, npc_states=list(npcs),
+                                current_map_id="map", timestamp=timestamp, inventory=list(inventory))
+
+
+def goblin(entity_id="goblin_1", alive=True, hp=30):
+    return {"entity_id": entity_id, "name": "Goblin", "ix": 12, "iy": 12, "hp": hp, "max_hp": 30,
+            "is_alive": alive, "level": 2, "type": "HostileNPC", "show_hp_bar": not alive, "is_chasing": False}
+
+
+def assert_round_trip(path, snapshot):
+    assert _index_state(read_save_with_journal(path)) == _index_state(snapshot.to_dict())
+
+
+def test_journal_replays_changes_on_top_of_base(tmp_path):
+    path = tmp_path / "save_slot_1.sav"
+    journal = SaveJournal(path)
+    journal.write_full(make_snapshot(path, [goblin()], [{"row": 0, "col": 0, "item_id": "POT001", "quantity": 2}]))
+
+    snapshot = make_snapshot(path, [goblin(hp=10), goblin("goblin_2")],
+                             [{"row": 0, "col": 1, "item_id": "MISC001", "quantity": 5}], hp=80, timestamp=2000)
+    assert journal.append(snapshot) > 0
+    assert_round_trip(path, snapshot)
+    assert journal.append(snapshot) == 0  # nic się nie zmieniło
+
+
+def test_journal_records_removed_npcs(tmp_path):
+    path = tmp_path / "save_slot_1.sav"
+    journal = SaveJournal(path)
+    journal.write_full(make_snapshot(path, [goblin(alive=False, hp=0), goblin("goblin_2")]))
+
+    snapshot = make_snapshot(path, [goblin("goblin_2")])
+    journal.append(snapshot)
+    assert "goblin_1" not in {npc["entity_id"] for npc in read_save_with_journal(path)["npc_states"]}
+    assert_round_trip(path, snapshot)
+
+    # Nowy obiekt dziennika czyta bazę i dziennik z dysku i dopisuje dalej
+    snapshot = make_snapshot(path, [goblin("goblin_2"), goblin()], timestamp=3000)
+    SaveJournal(path).append(snapshot)
+    assert_round_trip(path, snapshot)
+
+
+def test_compaction_keeps_the_state(tmp_path):
+    path = tmp_path / "save_slot_1.sav"
+    journal = SaveJournal(path, compact_bytes=1)
+    journal.write_full(make_snapshot(path, [goblin(), goblin("goblin_2")]))
+    snapshot = make_snapshot(path, [goblin("goblin_2", hp=5)], timestamp=2000)
+    journal.append(snapshot)  # przekracza limit i od razu kompaktuje
+    assert journal.journal_path.stat().st_size == JOURNAL_HEADER.size  # sam nagłówek
+    assert_round_trip(path, snapshot)
+
+
+def test_torn_tail_is_ignored_and_truncated(tmp_path):
+    path = tmp_path / "save_slot_1.sav"
+    journal = SaveJournal(path)
+    journal.write_full(make_snapshot(path, [goblin()]))
+    first = make_snapshot(path, [goblin(hp=20)], timestamp=2000)
+    journal.append(first)
+    valid_size = journal.journal_path.stat().st_size
+    journal.append(make_snapshot(path, [goblin(hp=10)], timestamp=3000))
+
+    data = journal.journal_path.read_bytes()
+    journal.journal_path.write_bytes(data[:-3])  # urwany ostatni rekord
+    assert_round_trip(path, first)
+
+    # Zły CRC w ostatnim rekordzie też kończy odtwarzanie
+    corrupted = bytearray(data)
+    corrupted[-1] ^= 0xFF
+    journal.journal_path.write_bytes(bytes(corrupted))
+    assert_round_trip(path, first)
+
+    second = make_snapshot(path, [goblin(hp=15)], timestamp=4000)
+    SaveJournal(path).append(second)  # ucina uszkodzony ogon, zanim dopisze
+    assert_round_trip(path, second)
+    assert journal.journal_path.stat().st_size > valid_size
+
+
+def test_journal_of_another_base_is_not_replayed(tmp_path):
+    path = tmp_path / "save_slot_1.sav"
+    journal = SaveJournal(path)
+    journal.write_full(make_snapshot(path, [goblin()]))
+    journal.append(make_snapshot(path, [goblin(hp=1)], timestamp=2000))
+    stale_journal = journal.journal_path.read_bytes()
+
+    base = make_snapshot(path, [goblin("goblin_2")], timestamp=3000)
+    journal.write_full(base)
+    journal.journal_path.write_bytes(stale_journal)  # dziennik poprzedniej bazy
+    assert_round_trip(path, base)
+
+
+def test_journal_of_another_version_is_discarded(tmp_path):
+    path = tmp_path / "save_slot_1.sav"
+    journal = SaveJournal(path)
+    base = make_snapshot(path, [goblin()])
+    journal.write_full(base)
+    header = JOURNAL_HEADER.unpack(journal.journal_path.read_bytes())
+    changed = make_snapshot(path, [goblin(hp=7)], timestamp=2000)
+    records = _diff(_index_state(base.to_dict()), _index_state(changed.to_dict()))
+    journal.journal_path.write_bytes(JOURNAL_HEADER.pack(JOURNAL_MAGIC, JOURNAL_VERSION + 1, *header[2:])
+                                     + b"".join(records) + _frame(RECORD_COMMIT, b""))
+    assert_round_trip(path, base)
+
+    latest = make_snapshot(path, [goblin(hp=3)], timestamp=3000)
+    SaveJournal(path).append(latest)
+    assert JOURNAL_HEADER.unpack_from(journal.journal_path.read_bytes())[1] == JOURNAL_VERSION
+    assert_round_trip(path, latest)
@@ -0,0 +1,46 @@
+import json
+
+from rsc_engine.saves import INDEX_FILENAME, SaveRecordCache, SaveSlotIndex
+
+
+def npc(entity_id, hp=30):
+    return {"entity_id": entity_id, "name": "Goblin", "ix": 1, "iy": 2, "hp": hp, "max_hp": 30, "is_alive": hp > 0,
+            "level": 1, "type": "HostileNPC"}
+
+
+def test_unchanged_records_are_shared_between_snapshots(tmp_path):
+    cache = SaveRecordCache()
+    cache.update_npcs({"a": npc("a"), "b": npc("b")}, reset=True)
+    cache.update_inventory(("inv", 1), lambda: [{"row": 0, "col": 0, "item_id": "POT001", "quantity": 1}])
+    first = cache.snapshot(1, tmp_path / "slot.sav", {"name": "Bob"}, "map", 1)
+
+    cache.update_npcs({})
+    cache.update_inventory(("inv", 1), lambda: 1 / 0)  # ta sama wersja - rekordy nie są czytane
+    second = cache.snapshot(1, tmp_path / "slot.sav", {"name": "Bob"}, "map", 2)
+    assert second.npc_states is first.npc_states
+    assert second.inventory is first.inventory
+
+    cache.update_npcs({"a": npc("a", hp=10), "b": npc("b")})
+    third = cache.snapshot(1, tmp_path / "slot.sav", {"name": "Bob"}, "map", 3)
+    assert [dict(r) for r in third.npc_states] == [npc("a", hp=10), npc("b")]
+    assert third.npc_states[1] is first.npc_states[1]
+
+
+def test_removed_and_reset_npcs(tmp_path):
+    cache = SaveRecordCache()
+    cache.update_npcs({"a": npc("a"), "b": npc("b")}, reset=True)
+    cache.update_npcs({"a": None})
+    assert [r["entity_id"] for r in cache.snapshot(1, tmp_path / "s.sav", {}, "map", 0).npc_states] == ["b"]
+
+    cache.update_npcs({"c": npc("c")}, reset=True)
+    assert [r["entity_id"] for r in cache.snapshot(1, tmp_path / "s.sav", {}, "map", 0).npc_states] == ["c"]
+
+
+def test_slot_index_drops_malformed_entries(tmp_path):
+    good = {"file": "save_slot_1.sav", "stamp": [[10, 1]], "player_name": "Bob", "level": 3, "map_id": "map"}
+    entries = {"1": good, "2": {"file": "save_slot_2.sav", "stamp": [[10, 1]]}, "3": ["not", "an", "entry"]}
+    (tmp_path / INDEX_FILENAME).write_text(json.dumps(entries), encoding="utf-8")
+    index = SaveSlotIndex(tmp_path)
+    assert index.slots() == [1]
+    assert index.get(1) == good
+    assert index.get(2) is None
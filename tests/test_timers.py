@@ -0,0 +1,115 @@
+import heapq
+import math
+import random
+
+import pytest
+
+from rsc_engine.timers import TimerWheel
+
+RESOLUTION = 0.25  # dokładnie reprezentowalne, więc tick terminu liczy się bez błędów zaokrągleń
+
+
+class NaiveTimers:
+    """Reference: every timer in one sorted heap, fired tick by tick."""
+
+    def __init__(self):
+        self.current_tick = 0
+        self.now = 0.0
+        self._heap = []
+        self._seq = 0
+
+    def schedule(self, delay, callback, *args):
+        deadline = self.now + delay
+        tick = max(math.ceil(deadline / RESOLUTION), self.current_tick + 1)
+        handle = [False]
+        heapq.heappush(self._heap, (tick, self._seq, handle, callback, args))
+        self._seq += 1
+        return handle
+
+    def cancel(self, handle):
+        handle[0] = True
+
+    def advance(self, dt):
+        self.now += dt
+        target_tick = int(self.now / RESOLUTION)
+        while self.current_tick < target_tick:
+            self.current_tick += 1
+            while self._heap and self._heap[0][0] == self.current_tick:
+                _, _, handle, callback, args = heapq.heappop(self._heap)
+                if not handle[0]:
+                    callback(*args)
+
+
+def run_script(clock, seed, max_delay_ticks):
+    """Drive `clock` with a seeded mix of schedules, cancels, nested schedules and advances.
+
+    Timers due in the same tick may fire in any order, so nothing here depends on that order:
+    child timers get IDs derived from their parent and a callback only cancels a timer due later.
+    Returns the fired timers as (tick, timer id) in firing order.
+    """
+    rng = random.Random(seed)
+    fired = []
+    handles = {}
+
+    def schedule(timer_id, delay):
+        expected_tick = max(math.ceil((clock.now + delay) / RESOLUTION), clock.current_tick + 1)
+        handles[timer_id] = (clock.schedule(delay, on_fire, timer_id), expected_tick)
+
+    def on_fire(timer_id):
+        fired.append((clock.current_tick, timer_id))
+        if timer_id % 10 == 0 and timer_id // 10 % 5 == 0:
+            schedule(timer_id * 10 + 1, timer_id // 10 % 7 * RESOLUTION)  # z wnętrza callbacku, także opóźnienie 0
+        if timer_id % 10 == 0 and timer_id // 10 % 11 == 0:
+            later = [i for i, (_, tick) in handles.items() if i % 10 == 0 and tick > clock.current_tick]
+            if later:
+                clock.cancel(handles[max(later)][0])
+
+    for step in range(400):
+        action = rng.random()
+        if action < 0.5:
+            schedule(step * 10, rng.randint(0, max_delay_ticks) * RESOLUTION + rng.choice((0.0, RESOLUTION / 3)))
+        elif action < 0.6 and handles:
+            clock.cancel(handles[rng.choice(sorted(handles))][0])
+        else:
+            clock.advance(rng.randint(0, 40) * RESOLUTION / 2)
+    clock.advance((max_delay_ticks + 50) * RESOLUTION)
+    return fired
+
+
+@pytest.mark.parametrize("bits,levels", [(2, 2), (2, 3), (3, 2), (6, 4)])
+@pytest.mark.parametrize("seed", range(5))
+def test_wheel_matches_sorted_reference(bits, levels, seed):
+    # Opóźnienia sięgają poza zasięg najwyższego poziomu (2**(bits*levels) ticków)
+    max_delay_ticks = 3 * (1 << (bits * levels)) if bits * levels <= 9 else 2000
+    wheel = TimerWheel(resolution=RESOLUTION, bits=bits, levels=levels)
+    fired = run_script(wheel, seed, max_delay_ticks)
+    expected = run_script(NaiveTimers(), seed, max_delay_ticks)
+
+    assert [tick for tick, _ in fired] == sorted(tick for tick, _ in fired)
+    assert sorted(fired) == sorted(expected)
+    assert len(fired) > 100
+
+
+def test_timer_fires_on_the_first_tick_at_or_after_its_deadline():
+    wheel = TimerWheel(resolution=RESOLUTION, bits=2, levels=2)
+    fired = []
+    wheel.schedule(1.1, lambda: fired.append(wheel.now))
+    wheel.advance(1.0)
+    assert fired == []
+    assert wheel.advance(RESOLUTION) == 1
+    assert fired == [1.25]
+
+
+def test_cancelled_and_fired_timers_are_inactive():
+    wheel = TimerWheel(resolution=RESOLUTION, bits=2, levels=2)
+    fired = []
+    kept = wheel.schedule(100.0, fired.append, "kept")  # poza zasięgiem koła: 400 ticków > 2**4
+    dropped = wheel.schedule(100.0, fired.append, "dropped")
+    wheel.cancel(dropped)
+    assert kept.active and not dropped.active
+    wheel.advance(99.75)
+    assert fired == []
+    wheel.advance(RESOLUTION)
+    assert fired == ["kept"]
+    assert not kept.active
+    assert wheel.pending == 0